@@ -0,0 +1,11 @@
+import pytest
+
+
+@pytest.fixture(autouse=True, scope='session')
+def temporary_file_caches(django_test_environment):
+    """Файловые кеши тестов живут во временном каталоге (как в
+    core.tests.runner.TestRunner для manage.py test)."""
+    from core.tests.utils import temporary_file_caches
+
+    with temporary_file_caches():
+        yield
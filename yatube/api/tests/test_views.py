@@ -0,0 +1,117 @@
+import json
+from http import HTTPStatus
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from mixer.backend.django import mixer
+from posts.models import Group, Post
+from yatube.settings import NOTES_NUMBER
+
+User = get_user_model()
+
+
+class ApiViewsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = mixer.blend(User, username='auth', first_name='Лев')
+        cls.group = mixer.blend(Group)
+        mixer.cycle(NOTES_NUMBER + 2).blend(
+            Post, author=cls.user, group=cls.group
+        )
+        mixer.cycle(3).blend(Post)
+        cls.post = Post.objects.filter(author=cls.user).first()
+
+    def get_json(self, url, data=None) -> dict:
+        response = self.client.get(url, data)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        return response.json()
+
+    def walk(self, url) -> list:
+        """Проходит ленту по курсорам и возвращает id всех постов."""
+        ids = []
+        data = self.get_json(url)
+        while True:
+            ids += [post['id'] for post in data['results']]
+            if data['next'] is None:
+                return ids
+            data = self.get_json(data['next'])
+
+    def test_feeds_match_html_views(self) -> None:
+        """Проверяет, что ленты API содержат те же посты, что и страницы."""
+        feeds = (
+            (reverse('api:index'), Post.objects.all()),
+            (
+                reverse('api:group_list', kwargs={'slug': self.group.slug}),
+                Post.objects.filter(group=self.group),
+            ),
+            (
+                reverse('api:profile', kwargs={'username': 'auth'}),
+                Post.objects.filter(author=self.user),
+            ),
+        )
+        for url, queryset in feeds:
+            with self.subTest(url=url):
+                expected = list(
+                    queryset.order_by('-pub_date', '-pk').values_list(
+                        'pk', flat=True
+                    )
+                )
+                self.assertEqual(self.walk(url), expected)
+
+    def test_post_serialization(self) -> None:
+        """Проверяет поля поста и число постов автора."""
+        data = self.get_json(
+            reverse('api:post_detail', kwargs={'post_id': self.post.id})
+        )
+        self.assertEqual(data['text'], self.post.text)
+        self.assertEqual(data['group'], self.group.slug)
+        self.assertEqual(
+            data['author'],
+            {
+                'username': 'auth',
+                'full_name': self.user.get_full_name(),
+                'post_count': NOTES_NUMBER + 2,
+            },
+        )
+
+    def test_page_size_is_limited(self) -> None:
+        """Проверяет параметр limit."""
+        data = self.get_json(reverse('api:index'), {'limit': 2})
+        self.assertEqual(len(data['results']), 2)
+        data = self.get_json(reverse('api:index'), {'limit': 'много'})
+        self.assertEqual(len(data['results']), NOTES_NUMBER)
+
+    def test_cursor_past_the_end(self) -> None:
+        """Проверяет ссылку next, после которой посты удалены."""
+        url = reverse('api:profile', kwargs={'username': 'auth'})
+        first = self.get_json(url)
+        shown = [post['id'] for post in first['results']]
+        Post.objects.filter(author=self.user).exclude(pk__in=shown).delete()
+        data = self.get_json(first['next'])
+        self.assertEqual([post['id'] for post in data['results']], shown)
+        self.assertIsNone(data['previous'])
+        self.assertIsNone(data['next'])
+
+    def test_export_streams_all_posts(self) -> None:
+        """Проверяет, что выгрузка отдает все посты потоком."""
+        with mock.patch('api.views.EXPORT_BATCH_SIZE', 5):
+            response = self.client.get(
+                reverse('api:export'), {'author': 'auth'}
+            )
+            self.assertTrue(response.streaming)
+            posts = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(
+            [post['id'] for post in posts],
+            list(
+                Post.objects.filter(author=self.user)
+                .order_by('-pub_date', '-pk')
+                .values_list('pk', flat=True)
+            ),
+        )
+
+    def test_api_is_read_only(self) -> None:
+        """Проверяет, что API не принимает POST-запросы."""
+        response = self.client.post(reverse('api:index'))
+        self.assertEqual(response.status_code, HTTPStatus.METHOD_NOT_ALLOWED)
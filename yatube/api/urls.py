@@ -0,0 +1,13 @@
+from django.urls import path
+
+from . import views
+
+app_name = 'api'
+
+urlpatterns = [
+    path('posts/', views.index, name='index'),
+    path('posts/export/', views.export, name='export'),
+    path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
+    path('group/<slug:slug>/', views.group_posts, name='group_list'),
+    path('profile/<str:username>/', views.profile, name='profile'),
+]
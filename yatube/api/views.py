@@ -0,0 +1,144 @@
+from django.contrib.auth import get_user_model
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.views.decorators.http import require_GET
+from posts.models import Group, Post
+from posts.utils import KeysetPaginator
+from yatube.settings import NOTES_NUMBER
+
+User = get_user_model()
+
+JSON_PARAMS = {'ensure_ascii': False}
+# Поля поста для values(): в API отдаются строки, а не объекты модели.
+POST_FIELDS = (
+    'id',
+    'text',
+    'pub_date',
+    'author__username',
+    'author__first_name',
+    'author__last_name',
+    'group__slug',
+)
+MAX_PAGE_SIZE = 100
+EXPORT_BATCH_SIZE = 1000
+
+
+def row_key(row):
+    return row['pub_date'], row['id']
+
+
+def serialize(row):
+    full_name = f'{row["author__first_name"]} {row["author__last_name"]}'
+    return {
+        'id': row['id'],
+        'text': row['text'],
+        'pub_date': row['pub_date'],
+        'author': {
+            'username': row['author__username'],
+            'full_name': full_name.strip(),
+        },
+        'group': row['group__slug'],
+    }
+
+
+def page_size(request):
+    try:
+        size = int(request.GET.get('limit', NOTES_NUMBER))
+    except ValueError:
+        size = NOTES_NUMBER
+    return max(1, min(size, MAX_PAGE_SIZE))
+
+
+def feed_response(request, rows):
+    """Отдает страницу ленты с курсорами соседних страниц."""
+    paginator = KeysetPaginator(rows, page_size(request), key=row_key)
+    page = paginator.get_page(request.GET.get('cursor'))
+
+    def link(cursor):
+        if cursor is None:
+            return None
+        query = request.GET.copy()
+        query['cursor'] = cursor
+        return request.build_absolute_uri('?' + query.urlencode())
+
+    return JsonResponse(
+        {
+            'next': link(page.next_cursor),
+            'previous': link(page.previous_cursor),
+            'results': [serialize(row) for row in page],
+        },
+        json_dumps_params=JSON_PARAMS,
+    )
+
+
+def feed_rows(**filters):
+    return Post.objects.filter(**filters).values(*POST_FIELDS)
+
+
+@require_GET
+def index(request):
+    return feed_response(request, feed_rows())
+
+
+@require_GET
+def group_posts(request, slug):
+    group = get_object_or_404(Group, slug=slug)
+    return feed_response(request, feed_rows(group=group))
+
+
+@require_GET
+def profile(request, username):
+    author = get_object_or_404(User, username=username)
+    return feed_response(request, feed_rows(author=author))
+
+
+@require_GET
+def post_detail(request, post_id):
+    row = get_object_or_404(
+        Post.objects.values(*POST_FIELDS, 'author__post_counter__post_count'),
+        pk=post_id,
+    )
+    data = serialize(row)
+    data['author']['post_count'] = (
+        row['author__post_counter__post_count'] or 0
+    )
+    data['url'] = request.build_absolute_uri(
+        reverse('posts:post_detail', kwargs={'post_id': post_id})
+    )
+    return JsonResponse(data, json_dumps_params=JSON_PARAMS)
+
+
+def stream_rows(rows):
+    """Выгружает ленту JSON-массивом пачками по EXPORT_BATCH_SIZE.
+
+    Пачки выбираются по курсору, поэтому в памяти одновременно лежит
+    не больше одной пачки, а каждый запрос к базе короткий.
+    """
+    encoder = DjangoJSONEncoder(**JSON_PARAMS)
+    paginator = KeysetPaginator(rows, EXPORT_BATCH_SIZE, key=row_key)
+    page = paginator.get_page(None)
+    yield '['
+    separator = ''
+    while True:
+        for row in page:
+            yield separator + encoder.encode(serialize(row))
+            separator = ','
+        if not page.has_next():
+            break
+        page = paginator.next_page(page)
+    yield ']'
+
+
+@require_GET
+def export(request):
+    """Потоковая выгрузка всех постов, можно с фильтрами group и author."""
+    filters = {}
+    if 'group' in request.GET:
+        filters['group__slug'] = request.GET['group']
+    if 'author' in request.GET:
+        filters['author__username'] = request.GET['author']
+    return StreamingHttpResponse(
+        stream_rows(feed_rows(**filters)), content_type='application/json'
+    )
@@ -1,5 +1,17 @@
 from django.apps import AppConfig
+from django.core import checks
+from django.db.backends.signals import connection_created
 
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self):
+        from .checks import check_session_cache
+        from .sqlite import apply_pragmas
+
+        checks.register(check_session_cache)
+
+        connection_created.connect(
+            apply_pragmas, dispatch_uid='core.sqlite.apply_pragmas'
+        )
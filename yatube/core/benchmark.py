@@ -0,0 +1,299 @@
+"""Общие инструменты для команд-бенчмарков.
+
+Бенчмарки работают с отдельной тестовой базой, которая создается
+на время замера и удаляется после него, поэтому рабочие данные
+не затрагиваются.
+"""
+import random
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from datetime import timedelta
+from http.cookies import SimpleCookie
+from io import BytesIO, StringIO
+from urllib.parse import urlencode
+from wsgiref.util import setup_testing_defaults
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import (
+    CaptureQueriesContext,
+    setup_test_environment,
+    teardown_test_environment,
+)
+from django.utils import timezone
+from faker import Faker
+
+User = get_user_model()
+
+# Верхние границы корзин гистограммы задержек, мс.
+LATENCY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+
+@contextmanager
+def benchmark_database(name=None):
+    """Создает пустую тестовую базу с примененными миграциями.
+
+    name — путь к файлу базы. Без него тестовая база SQLite живет
+    в памяти и не видна другим процессам.
+    """
+    test_settings = connection.settings_dict['TEST']
+    old_test_name = test_settings['NAME']
+    if name is not None:
+        test_settings['NAME'] = name
+    setup_test_environment(debug=False)
+    old_name = connection.creation.create_test_db(
+        verbosity=0, autoclobber=True, serialize=False
+    )
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+        test_settings['NAME'] = old_test_name
+
+
+def seed_posts(posts, authors=100, groups=20, batch_size=5000, seed=0):
+    """Заполняет базу воспроизводимым набором постов.
+
+    Посты вставляются пачками напрямую в таблицу: bulk_create
+    перезаписал бы pub_date через auto_now_add, а лентам нужны
+    даты, растянутые во времени. Тексты берутся из пула, который
+    Faker генерирует с тем же seed; выдержка и HTML отрисовываются
+    один раз на текст пула. Сигналы при такой вставке не срабатывают,
+    поэтому счетчики и поисковый индекс в конце перестраиваются
+    командами.
+    """
+    from posts.excerpts import RENDERED_FIELDS, render_text
+    from posts.models import Group, Post
+    from posts.search import is_available
+
+    rnd = random.Random(seed)
+    fake = Faker('ru_RU')
+    fake.seed_instance(seed)
+    texts = [
+        fake.paragraph(nb_sentences=rnd.randint(1, 8)) for _ in range(500)
+    ]
+    rendered = [tuple(render_text(text).values()) for text in texts]
+    User.objects.bulk_create(
+        User(
+            username=f'bench{number}',
+            first_name=fake.first_name(),
+            last_name=fake.last_name(),
+        )
+        for number in range(authors)
+    )
+    Group.objects.bulk_create(
+        Group(
+            title=f'Группа {number}',
+            slug=f'bench-{number}',
+            description=fake.sentence(),
+        )
+        for number in range(groups)
+    )
+    author_ids = list(User.objects.values_list('pk', flat=True))
+    group_ids = list(Group.objects.values_list('pk', flat=True)) + [None]
+    opts = Post._meta
+    columns = [
+        opts.get_field(name).column
+        for name in (
+            'text',
+            *RENDERED_FIELDS,
+            'pub_date',
+            'updated',
+            'author',
+            'group',
+            'image',
+            'thumbnails_ready',
+        )
+    ]
+    sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+        connection.ops.quote_name(opts.db_table),
+        ', '.join(connection.ops.quote_name(column) for column in columns),
+        ', '.join(['%s'] * len(columns)),
+    )
+    start = timezone.now() - timedelta(minutes=posts)
+    with connection.cursor() as cursor:
+        for offset in range(0, posts, batch_size):
+            rows = []
+            for number in range(offset, min(offset + batch_size, posts)):
+                pub_date = start + timedelta(minutes=number)
+                text = rnd.randrange(len(texts))
+                rows.append(
+                    (
+                        texts[text],
+                        *rendered[text],
+                        pub_date,
+                        pub_date,
+                        rnd.choice(author_ids),
+                        rnd.choice(group_ids),
+                        '',
+                        False,
+                    )
+                )
+            cursor.executemany(sql, rows)
+    call_command('recount_posts', stdout=StringIO())
+    if is_available():
+        call_command('rebuild_search_index', stdout=StringIO())
+
+
+def percentile(values, fraction):
+    """Возвращает перцентиль отсортированного по возрастанию списка."""
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, int(round(fraction * (len(values) - 1))))
+    return values[index]
+
+
+def measure(client, url, repeat=20, warmup=2, before=None):
+    """Замеряет задержку GET-запроса и число SQL-запросов к базе.
+
+    before вызывается перед каждым замером вне его времени, например
+    чтобы сбросить кеш страниц.
+    """
+    for _ in range(warmup):
+        client.get(url)
+    timings = []
+    for _ in range(repeat):
+        if before is not None:
+            before()
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = client.get(url)
+            timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return {
+        'status': response.status_code,
+        'queries': len(queries),
+        'p50': percentile(timings, 0.50),
+        'p95': percentile(timings, 0.95),
+        'p99': percentile(timings, 0.99),
+    }
+
+
+def histogram(latencies, bounds=LATENCY_BUCKETS):
+    """Раскладывает задержки в мс по корзинам с верхними границами bounds.
+
+    Возвращает пары (граница, число); последняя корзина с границей
+    None собирает все, что дольше bounds[-1].
+    """
+    counts = [0] * (len(bounds) + 1)
+    for value in latencies:
+        counts[bisect_left(bounds, value)] += 1
+    return list(zip((*bounds, None), counts))
+
+
+class WSGIResponse:
+    def __init__(self, status, headers, content):
+        self.status_code = int(status.split()[0])
+        self.headers = dict(headers)
+        self.content = content
+        cookies = SimpleCookie()
+        for name, value in headers:
+            if name.lower() == 'set-cookie':
+                cookies.load(value)
+        self.cookies = {name: morsel.value for name, morsel in cookies.items()}
+
+
+class WSGIClient:
+    """Выполняет запросы через WSGI-приложение проекта.
+
+    В отличие от django.test.Client запрос проходит тот же путь, что и
+    в боевом сервере: environ, WSGIHandler и все middleware. Cookie
+    (например, сессию из Client.force_login) передаются как есть.
+    """
+
+    def __init__(self, application=None, cookies=None):
+        if application is None:
+            from yatube.wsgi import application
+        self.application = application
+        self.cookies = dict(cookies or {})
+
+    @classmethod
+    def logged_in(cls, user):
+        from django.test import Client
+
+        client = Client()
+        client.force_login(user)
+        cookies = {
+            name: morsel.value for name, morsel in client.cookies.items()
+        }
+        return cls(cookies=cookies)
+
+    def get(self, url):
+        return self.request('GET', url)
+
+    def post(self, url, data):
+        """Отправляет форму так же, как браузер: с CSRF-cookie и токеном.
+
+        Если cookie еще нет, ее выдает GET той же страницы с формой.
+        """
+        token = self.cookies.get(settings.CSRF_COOKIE_NAME)
+        if token is None:
+            token = self.get(url).cookies.get(settings.CSRF_COOKIE_NAME)
+            if token is not None:
+                self.cookies[settings.CSRF_COOKIE_NAME] = token
+        extra = {'CONTENT_TYPE': 'application/x-www-form-urlencoded'}
+        if token is not None:
+            extra['HTTP_X_CSRFTOKEN'] = token
+        body = urlencode(data, doseq=True).encode()
+        return self.request('POST', url, body, extra)
+
+    def request(self, method, url, body=b'', extra=None):
+        path, _, query = url.partition('?')
+        environ = {
+            'REQUEST_METHOD': method,
+            'PATH_INFO': path,
+            'QUERY_STRING': query,
+            'HTTP_HOST': 'testserver',
+            'CONTENT_LENGTH': str(len(body)),
+            'wsgi.input': BytesIO(body),
+            **(extra or {}),
+        }
+        if self.cookies:
+            environ['HTTP_COOKIE'] = '; '.join(
+                f'{name}={value}' for name, value in self.cookies.items()
+            )
+        setup_testing_defaults(environ)
+        started = []
+
+        def start_response(status, headers, exc_info=None):
+            started.append((status, headers))
+
+        body = self.application(environ, start_response)
+        try:
+            content = b''.join(body)
+        finally:
+            if hasattr(body, 'close'):
+                body.close()
+        status, headers = started[0]
+        return WSGIResponse(status, headers, content)
+
+
+def compare_results(results, baseline, threshold, min_delta_ms=1.0):
+    """Сравнивает замеры с базовыми и возвращает список регрессий.
+
+    Регрессией считается рост медианной задержки больше чем на долю
+    threshold (и больше чем на min_delta_ms, чтобы не ловить шум
+    на быстрых страницах) или любой рост числа SQL-запросов.
+    """
+    regressions = []
+    for scale, routes in results.items():
+        for route, result in routes.items():
+            base = baseline.get(scale, {}).get(route)
+            if base is None:
+                continue
+            if result['queries'] > base['queries']:
+                regressions.append(
+                    f'{scale} {route}: запросов {base["queries"]} → '
+                    f'{result["queries"]}'
+                )
+            delta = result['p50'] - base['p50']
+            if delta > min_delta_ms and delta > base['p50'] * threshold:
+                regressions.append(
+                    f'{scale} {route}: p50 {base["p50"]:.2f} → '
+                    f'{result["p50"]:.2f} мс'
+                )
+    return regressions
@@ -0,0 +1,35 @@
+"""Проверки настроек проекта (manage.py check)."""
+from django.conf import settings
+from django.core.checks import Warning
+
+# Движки сессий, которые держат сессии в кеше SESSION_CACHE_ALIAS.
+CACHE_SESSION_ENGINES = (
+    'django.contrib.sessions.backends.cache',
+    'django.contrib.sessions.backends.cached_db',
+)
+LOCAL_CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def check_session_cache(app_configs, **kwargs):
+    """Кеш сессий должен быть общим для всех процессов сервера."""
+    if settings.SESSION_ENGINE not in CACHE_SESSION_ENGINES:
+        return []
+    alias = settings.SESSION_CACHE_ALIAS
+    backend = settings.CACHES.get(alias, {}).get('BACKEND')
+    if backend not in LOCAL_CACHE_BACKENDS:
+        return []
+    return [
+        Warning(
+            f'Сессии хранятся в кеше {alias!r} ({backend}), который у '
+            'каждого процесса свой: выход в одном процессе не сбросит '
+            'сессию в остальных.',
+            hint=(
+                'Укажите для SESSION_CACHE_ALIAS общий кеш (файловый, '
+                'memcached, redis) или SESSION_ENGINE signed_cookies.'
+            ),
+            id='core.W001',
+        )
+    ]
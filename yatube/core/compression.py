@@ -0,0 +1,107 @@
+"""Сжатие gzip страниц и ответов API.
+
+CompressionMiddleware сжимает ответы с типами из
+COMPRESSION_CONTENT_TYPES (HTML и JSON), если клиент принимает gzip.
+Обычный ответ сжимается целиком, если он не короче
+COMPRESSION_MIN_LENGTH байт. Тело StreamingHttpResponse (выгрузка
+api:export) сжимается по мере отдачи: в памяти лежит только состояние
+zlib, а сжатые данные уходят клиенту после каждых
+COMPRESSION_STREAM_FLUSH_BYTES байт исходного тела. Ответы, у которых уже
+есть Content-Encoding или Cache-Control: no-transform, не трогаются.
+
+Уровень сжатия задает COMPRESSION_LEVEL; соотношение времени процессора
+и размера ответов по уровням показывает manage.py benchmark_compression.
+"""
+import zlib
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+from .staticfiles import accepts_gzip
+
+DEFAULT_CONTENT_TYPES = ('text/html', 'application/json')
+
+
+def compressor(level):
+    # wbits 16 + MAX_WBITS: формат gzip (заголовок и CRC), а не zlib.
+    return zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+
+def compress_string(content, level):
+    """Сжимает тело ответа целиком."""
+    zfile = compressor(level)
+    return zfile.compress(content) + zfile.flush()
+
+
+def compress_sequence(chunks, level, flush_bytes):
+    """Сжимает поток частей тела, не собирая его в памяти.
+
+    Части приходят мелкими (по строке выгрузки), а Z_SYNC_FLUSH после
+    каждой испортил бы сжатие. Поэтому данные сбрасываются клиенту, когда
+    накопилось flush_bytes байт исходного тела, и в конце потока.
+    """
+    zfile = compressor(level)
+    pending = 0
+    for chunk in chunks:
+        data = zfile.compress(chunk)
+        pending += len(chunk)
+        if pending >= flush_bytes:
+            data += zfile.flush(zlib.Z_SYNC_FLUSH)
+            pending = 0
+        if data:
+            yield data
+    yield zfile.flush()
+
+
+def is_compressible(response):
+    """Проверяет, что ответ стоит сжимать, не глядя на запрос."""
+    if response.has_header('Content-Encoding'):
+        return False
+    if 'no-transform' in response.get('Cache-Control', '').lower():
+        return False
+    content_type = response.get('Content-Type', '').split(';')[0]
+    content_types = getattr(
+        settings, 'COMPRESSION_CONTENT_TYPES', DEFAULT_CONTENT_TYPES
+    )
+    if content_type.strip().lower() not in content_types:
+        return False
+    if response.streaming:
+        return True
+    min_length = getattr(settings, 'COMPRESSION_MIN_LENGTH', 1024)
+    return len(response.content) >= min_length
+
+
+class CompressionMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if not is_compressible(response):
+            return response
+        # Один и тот же URL отдается сжатым и нет в зависимости от
+        # Accept-Encoding: кеши должны хранить оба варианта.
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if not accepts_gzip(request.META.get('HTTP_ACCEPT_ENCODING')):
+            return response
+        level = getattr(settings, 'COMPRESSION_LEVEL', 6)
+        if response.streaming:
+            response.streaming_content = compress_sequence(
+                response.streaming_content,
+                level,
+                getattr(settings, 'COMPRESSION_STREAM_FLUSH_BYTES', 16384),
+            )
+            del response['Content-Length']
+        else:
+            compressed = compress_string(response.content, level)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+        # Сжатое тело побайтно отличается от исходного, поэтому сильный
+        # ETag становится слабым; condition() сравнивает ETag без учета W/.
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = 'gzip'
+        return response
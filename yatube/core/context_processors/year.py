@@ -1,6 +1,14 @@
 from django.utils import timezone
+from django.utils.functional import lazy
+
+
+def current_year():
+    return timezone.now().year
 
 
 def year(request):
-    """Добавляет переменную с текущим годом."""
-    return {'year': timezone.now().year}
+    """Добавляет переменную с текущим годом.
+
+    Год вычисляется только тогда, когда шаблон его выводит.
+    """
+    return {'year': lazy(current_year, int)()}
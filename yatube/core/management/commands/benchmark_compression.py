@@ -0,0 +1,108 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+from api.views import feed_rows, stream_rows
+from core.benchmark import WSGIClient, benchmark_database, seed_posts
+from core.compression import compress_sequence, compress_string
+from posts.models import Post
+
+
+def timed(func, repeat):
+    """Возвращает результат func и медиану времени вызова в мс."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return result, timings[len(timings) // 2]
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает уровни сжатия gzip на страницах и ответах API: размер '
+        'сжатого тела и время процессора на ответ. Выгрузка api:export '
+        'сжимается по частям, как в CompressionMiddleware.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=5000)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument(
+            '--levels',
+            type=int,
+            nargs='+',
+            default=list(range(1, 10)),
+            help='Уровни zlib от 1 до 9.',
+        )
+        parser.add_argument(
+            '--flush-bytes',
+            type=int,
+            default=settings.COMPRESSION_STREAM_FLUSH_BYTES,
+            help='Через сколько байт сбрасывать сжатый поток.',
+        )
+
+    def handle(self, *args, **options):
+        if any(not 1 <= level <= 9 for level in options['levels']):
+            raise CommandError('Уровни сжатия от 1 до 9.')
+        if options['repeat'] < 1 or options['flush_bytes'] < 1:
+            raise CommandError('--repeat и --flush-bytes больше нуля.')
+        with benchmark_database():
+            self.stdout.write(f'Заполнение базы: {options["posts"]} постов')
+            seed_posts(options['posts'])
+            bodies = self.get_bodies()
+            # Части выгрузки в том виде, в каком их отдает view.
+            chunks = [
+                chunk.encode(settings.DEFAULT_CHARSET)
+                for chunk in stream_rows(feed_rows())
+            ]
+        self.report(bodies, chunks, options)
+
+    def get_bodies(self):
+        client = WSGIClient()
+        post = Post.objects.latest('pub_date')
+        urls = {
+            'index': reverse('posts:index'),
+            'post_detail': reverse(
+                'posts:post_detail', kwargs={'post_id': post.pk}
+            ),
+            'api:index': reverse('api:index'),
+        }
+        return {name: client.get(url).content for name, url in urls.items()}
+
+    def report(self, bodies, chunks, options):
+        repeat = options['repeat']
+        tasks = {
+            name: (len(body), lambda body=body, level=None: compress_string(
+                body, level
+            ))
+            for name, body in bodies.items()
+        }
+        tasks['api:export'] = (
+            sum(len(chunk) for chunk in chunks),
+            lambda body=None, level=None: b''.join(
+                compress_sequence(chunks, level, options['flush_bytes'])
+            ),
+        )
+        self.stdout.write(
+            f'{"ответ":<12} {"уровень":>7} {"байт":>10} {"доля":>7} '
+            f'{"мс":>8} {"МБ/с":>8}'
+        )
+        for name, (size, compress) in tasks.items():
+            self.stdout.write(f'{name:<12} {"—":>7} {size:>10}')
+            # Выгрузка на больших базах сжимается секундами: меньше
+            # повторов, чтобы замер не растягивался.
+            runs = repeat if size < 10 ** 7 else max(1, repeat // 10)
+            for level in options['levels']:
+                compressed, median = timed(
+                    lambda: compress(level=level), runs
+                )
+                speed = size / 10 ** 6 / (median / 1000) if median else 0
+                self.stdout.write(
+                    f'{"":<12} {level:>7} {len(compressed):>10} '
+                    f'{len(compressed) / size:>7.1%} '
+                    f'{median:>8.2f} {speed:>8.1f}'
+                )
@@ -0,0 +1,75 @@
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from core.benchmark import WSGIClient, benchmark_database, measure, seed_posts
+from posts.models import Post
+
+User = get_user_model()
+
+ENGINES = (
+    'django.contrib.sessions.backends.db',
+    'django.contrib.sessions.backends.cached_db',
+    'django.contrib.sessions.backends.signed_cookies',
+)
+
+
+def anonymous_session_cookies():
+    """Cookie посетителя, у которого есть сессия, но он не вошел."""
+    store = import_module(settings.SESSION_ENGINE).SessionStore()
+    store['visited'] = True
+    store.save()
+    return {settings.SESSION_COOKIE_NAME: store.session_key}
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает число SQL-запросов и задержку страниц для анонимного '
+        'посетителя, посетителя с сессией и вошедшего пользователя при '
+        'разных SESSION_ENGINE.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=10000)
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            self.stdout.write(f'Заполнение базы: {options["posts"]} постов')
+            seed_posts(options['posts'])
+            post = Post.objects.select_related('author').latest('pub_date')
+            urls = {
+                'index': reverse('posts:index'),
+                'post_detail': reverse(
+                    'posts:post_detail', kwargs={'post_id': post.pk}
+                ),
+            }
+            for engine in ENGINES:
+                with override_settings(SESSION_ENGINE=engine):
+                    # SessionMiddleware выбирает хранилище при создании,
+                    # поэтому для каждого движка нужен новый обработчик.
+                    application = WSGIHandler()
+                    clients = {
+                        'аноним': WSGIClient(application),
+                        'аноним с сессией': WSGIClient(
+                            application, anonymous_session_cookies()
+                        ),
+                        'вошедший': WSGIClient(
+                            application,
+                            WSGIClient.logged_in(post.author).cookies,
+                        ),
+                    }
+                    self.stdout.write(engine)
+                    for visitor, client in clients.items():
+                        for name, url in urls.items():
+                            result = measure(client, url, options['repeat'])
+                            self.stdout.write(
+                                f'  {visitor:<18} {name:<12} '
+                                f'запросов: {result["queries"]}  '
+                                f'p50 {result["p50"]:7.2f} мс'
+                            )
@@ -0,0 +1,208 @@
+import json
+import platform
+import subprocess
+from importlib import import_module
+
+import django
+from django.contrib.auth import get_user_model
+from django.contrib.auth.tokens import default_token_generator
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.encoding import force_bytes
+from django.utils.http import urlencode, urlsafe_base64_encode
+
+from core.benchmark import (
+    WSGIClient,
+    benchmark_database,
+    compare_results,
+    measure,
+    seed_posts,
+)
+from posts.cache import get_cache
+from posts.models import Group, Post
+
+User = get_user_model()
+
+URL_MODULES = ('posts.urls', 'users.urls', 'about.urls')
+# Маршруты, которые без входа отвечают только редиректом на логин.
+LOGIN_REQUIRED = {
+    'posts:post_create',
+    'posts:post_edit',
+    'users:password_change',
+    'users:password_change_done',
+}
+# GET-запросы к маршрутам, которым нужны параметры, кроме пути.
+QUERY_STRINGS = {'posts:search': {'q': '{word}'}}
+
+
+def parse_scale(value):
+    """Разбирает число постов вида 10000, 10k или 1M."""
+    multipliers = {'k': 1000, 'm': 1000000}
+    suffix = value[-1:].lower()
+    try:
+        if suffix in multipliers:
+            return int(value[:-1]) * multipliers[suffix]
+        return int(value)
+    except ValueError:
+        raise CommandError(f'Неверный масштаб: {value}')
+
+
+def named_routes():
+    """Возвращает (имя, параметры пути) всех именованных маршрутов."""
+    routes = []
+    for module_name in URL_MODULES:
+        module = import_module(module_name)
+        for pattern in module.urlpatterns:
+            if pattern.name:
+                routes.append(
+                    (
+                        f'{module.app_name}:{pattern.name}',
+                        set(pattern.pattern.converters),
+                    )
+                )
+    return routes
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет временную базу постами в нескольких масштабах и '
+        'замеряет p50/p95/p99 и число SQL-запросов каждого маршрута '
+        'posts, users и about через WSGI-приложение. Основные числа '
+        'замеряются с пустым кешем страниц, то есть это стоимость view '
+        'и запросов; отдельно (warm) — повторные запросы из кеша. '
+        'Результаты пишутся в JSON и могут сравниваться с результатами '
+        'другого коммита.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scale',
+            action='append',
+            help='Число постов: 10k, 100k, 1M; можно указать несколько раз.',
+        )
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', default='benchmark.json')
+        parser.add_argument(
+            '--compare', help='JSON с результатами базового коммита.'
+        )
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=0.2,
+            help='Допустимый рост медианы, доля от базовой.',
+        )
+        parser.add_argument('--min-delta-ms', type=float, default=1.0)
+
+    def handle(self, *args, **options):
+        scales = [parse_scale(value) for value in options['scale'] or ['10k']]
+        results = {}
+        for posts in scales:
+            with benchmark_database():
+                self.stdout.write(f'Заполнение базы: {posts} постов')
+                seed_posts(posts, seed=options['seed'])
+                results[str(posts)] = self.run(options['repeat'])
+        report = {
+            'revision': git_revision(),
+            'created': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'repeat': options['repeat'],
+            'results': results,
+        }
+        with open(options['output'], 'w', encoding='utf-8') as stream:
+            json.dump(report, stream, ensure_ascii=False, indent=2)
+        self.stdout.write(f'Результаты записаны в {options["output"]}')
+        if options['compare']:
+            self.compare(results, options)
+
+    def get_urls(self):
+        post = Post.objects.select_related('author', 'group').latest(
+            'pub_date'
+        )
+        group = Group.objects.order_by('-post_count').first()
+        kwargs = {
+            'slug': group.slug,
+            'username': post.author.username,
+            'post_id': post.pk,
+            'uidb64': urlsafe_base64_encode(force_bytes(post.author.pk)),
+            'token': default_token_generator.make_token(post.author),
+        }
+        word = post.text.split()[0].strip('.,')
+        urls = {}
+        for name, converters in named_routes():
+            missing = converters - kwargs.keys()
+            if missing:
+                raise CommandError(
+                    f'Нет значений параметров {missing} для маршрута {name}.'
+                )
+            url = reverse(
+                name, kwargs={key: kwargs[key] for key in converters}
+            )
+            if name in QUERY_STRINGS:
+                url += '?' + urlencode(
+                    {
+                        key: value.format(word=word)
+                        for key, value in QUERY_STRINGS[name].items()
+                    }
+                )
+            urls[name] = url
+        return urls, post.author
+
+    def run(self, repeat):
+        urls, author = self.get_urls()
+        anonymous = WSGIClient()
+        authenticated = WSGIClient.logged_in(author)
+        results = {}
+        cache = get_cache()
+        for name, url in urls.items():
+            client = authenticated if name in LOGIN_REQUIRED else anonymous
+            # Без сброса кеша после первого замера ленты отдаются из кеша
+            # страниц, и замер показывал бы попадания, а не view.
+            cold = measure(client, url, repeat, before=cache.clear)
+            warm = measure(client, url, repeat)
+            results[name] = {
+                'url': url,
+                **cold,
+                'warm': {key: warm[key] for key in ('p50', 'p95', 'p99')},
+            }
+            self.stdout.write(
+                f'{name:<32} {cold["status"]}  '
+                f'холодный p50 {cold["p50"]:8.2f}  '
+                f'p95 {cold["p95"]:8.2f}  '
+                f'p99 {cold["p99"]:8.2f} мс  '
+                f'запросов: {cold["queries"]}  '
+                f'теплый p50 {warm["p50"]:8.2f} мс'
+            )
+        return results
+
+    def compare(self, results, options):
+        with open(options['compare'], encoding='utf-8') as stream:
+            baseline = json.load(stream)
+        regressions = compare_results(
+            results,
+            baseline['results'],
+            options['threshold'],
+            options['min_delta_ms'],
+        )
+        if regressions:
+            raise CommandError(
+                'Регрессии относительно {}:\n{}'.format(
+                    baseline.get('revision') or options['compare'],
+                    '\n'.join(regressions),
+                )
+            )
+        self.stdout.write('Регрессий не найдено.')
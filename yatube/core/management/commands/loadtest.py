@@ -0,0 +1,312 @@
+import multiprocessing
+import os
+import random
+import tempfile
+import threading
+import time
+from urllib.parse import urlencode
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import Max
+from django.urls import reverse
+
+from core.benchmark import (
+    WSGIClient,
+    benchmark_database,
+    histogram,
+    percentile,
+    seed_posts,
+)
+from posts.models import Group, Post
+
+User = get_user_model()
+
+# Доля запросов к каждому маршруту posts; меняется через --mix.
+DEFAULT_MIX = {
+    'index': 40,
+    'group_list': 15,
+    'profile': 15,
+    'post_detail': 20,
+    'search': 5,
+    'post_create': 3,
+    'post_edit': 2,
+}
+
+
+def parse_mix(values):
+    """Разбирает веса маршрутов вида post_create=10 поверх DEFAULT_MIX."""
+    mix = dict(DEFAULT_MIX)
+    for value in values or ():
+        name, _, weight = value.partition('=')
+        if name not in DEFAULT_MIX:
+            raise CommandError(f'Неизвестный маршрут: {name}')
+        try:
+            mix[name] = float(weight)
+        except ValueError:
+            raise CommandError(f'Неверный вес маршрута: {value}')
+        if mix[name] < 0:
+            raise CommandError(f'Вес маршрута меньше нуля: {value}')
+    mix = {name: weight for name, weight in mix.items() if weight > 0}
+    if not mix:
+        raise CommandError('У всех маршрутов нулевой вес.')
+    return mix
+
+
+class VirtualUser:
+    """Посетитель: читает ленты анонимно, пишет посты от своего автора.
+
+    У каждого маршрута из DEFAULT_MIX есть одноименный метод, который
+    выполняет один запрос со случайными параметрами из plan.
+    """
+
+    def __init__(self, number, plan, seed):
+        self.rnd = random.Random(seed * 1000 + number)
+        self.plan = plan
+        self.author = plan['authors'][number % len(plan['authors'])]
+        self.anonymous = WSGIClient()
+        self.client = WSGIClient(cookies=self.author['cookies'])
+        self.writes = 0
+
+    def text(self):
+        self.writes += 1
+        return f'{self.rnd.choice(self.plan["words"])} {self.writes}'
+
+    def index(self):
+        return self.anonymous.get(reverse('posts:index'))
+
+    def group_list(self):
+        slug = self.rnd.choice(self.plan['slugs'])
+        return self.anonymous.get(
+            reverse('posts:group_list', kwargs={'slug': slug})
+        )
+
+    def profile(self):
+        username = self.rnd.choice(self.plan['usernames'])
+        return self.anonymous.get(
+            reverse('posts:profile', kwargs={'username': username})
+        )
+
+    def post_detail(self):
+        post_id = self.rnd.choice(self.plan['post_ids'])
+        return self.anonymous.get(
+            reverse('posts:post_detail', kwargs={'post_id': post_id})
+        )
+
+    def search(self):
+        query = urlencode({'q': self.rnd.choice(self.plan['words'])})
+        return self.anonymous.get(f'{reverse("posts:search")}?{query}')
+
+    def post_create(self):
+        return self.client.post(
+            reverse('posts:post_create'), {'text': self.text(), 'group': ''}
+        )
+
+    def post_edit(self):
+        return self.client.post(
+            reverse(
+                'posts:post_edit',
+                kwargs={'post_id': self.author['post_id']},
+            ),
+            {'text': self.text(), 'group': ''},
+        )
+
+
+def run_user(number, plan, results):
+    """Повторяет запросы до конца замера и копит задержки по маршрутам."""
+    user = VirtualUser(number, plan, plan['seed'])
+    routes, weights = zip(*plan['mix'].items())
+    stats = {route: {'latencies': [], 'errors': 0} for route in routes}
+    try:
+        while time.monotonic() < plan['stop']:
+            route = user.rnd.choices(routes, weights)[0]
+            started = time.monotonic()
+            try:
+                failed = getattr(user, route)().status_code >= 400
+            except Exception:
+                failed = True
+            if started < plan['start']:
+                continue
+            stats[route]['latencies'].append(
+                (time.monotonic() - started) * 1000
+            )
+            stats[route]['errors'] += failed
+    finally:
+        connections.close_all()
+    results.append(stats)
+
+
+def run_process(arguments):
+    """Запускает потоки посетителей одного процесса и сливает их замеры."""
+    process, plan = arguments
+    # Дочерний процесс не должен пользоваться соединением родителя.
+    connections.close_all()
+    results = []
+    threads = [
+        threading.Thread(
+            target=run_user,
+            args=(process * plan['threads'] + number, plan, results),
+        )
+        for number in range(plan['threads'])
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return merge(results)
+
+
+def merge(results):
+    merged = {}
+    for stats in results:
+        for route, values in stats.items():
+            target = merged.setdefault(route, {'latencies': [], 'errors': 0})
+            target['latencies'].extend(values['latencies'])
+            target['errors'] += values['errors']
+    return merged
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагружает WSGI-приложение проекта пулом процессов и потоков: '
+        'заполняет временную базу, в течение --duration секунд повторяет '
+        'взвешенную смесь маршрутов posts, включая создание и '
+        'редактирование постов, и выводит пропускную способность, '
+        'гистограмму задержек и долю ошибок.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes',
+            type=int,
+            default=1,
+            help='Число процессов; больше одного — запуск через fork.',
+        )
+        parser.add_argument(
+            '--threads', type=int, default=4, help='Потоков в процессе.'
+        )
+        parser.add_argument('--duration', type=float, default=10.0)
+        parser.add_argument(
+            '--warmup',
+            type=float,
+            default=1.0,
+            help='Секунд в начале, которые не попадают в замер.',
+        )
+        parser.add_argument(
+            '--mix',
+            action='append',
+            help='Вес маршрута, например post_create=10; 0 исключает его.',
+        )
+        parser.add_argument('--posts', type=int, default=10000)
+        parser.add_argument(
+            '--authors',
+            type=int,
+            default=20,
+            help='Сколько авторов входят на сайт и пишут посты.',
+        )
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        if options['processes'] < 1 or options['threads'] < 1:
+            raise CommandError('--processes и --threads больше нуля.')
+        if options['duration'] <= 0 or options['warmup'] < 0:
+            raise CommandError('Неверная длительность замера.')
+        mix = parse_mix(options['mix'])
+        # Процессам нужна общая база, поэтому она в файле, а не в памяти.
+        with tempfile.TemporaryDirectory() as directory:
+            name = os.path.join(directory, 'loadtest.sqlite3')
+            with benchmark_database(name):
+                self.stdout.write(
+                    f'Заполнение базы: {options["posts"]} постов'
+                )
+                seed_posts(options['posts'], seed=options['seed'])
+                plan = self.get_plan(mix, options['authors'])
+                stats = self.run(plan, options)
+        self.report(stats, options)
+
+    def get_plan(self, mix, authors):
+        latest = (
+            Post.objects.values('author')
+            .annotate(post_id=Max('pk'))
+            .order_by('author')[:authors]
+        )
+        users = User.objects.in_bulk([row['author'] for row in latest])
+        texts = Post.objects.values_list('text', flat=True)[:200]
+        return {
+            'mix': mix,
+            'slugs': list(Group.objects.values_list('slug', flat=True)),
+            'usernames': [user.username for user in users.values()],
+            'post_ids': list(
+                Post.objects.order_by('-pk').values_list('pk', flat=True)[
+                    :1000
+                ]
+            ),
+            'words': sorted(
+                {text.split()[0].strip('.,') for text in texts if text}
+            ),
+            'authors': [
+                {
+                    'post_id': row['post_id'],
+                    'cookies': WSGIClient.logged_in(
+                        users[row['author']]
+                    ).cookies,
+                }
+                for row in latest
+            ],
+        }
+
+    def run(self, plan, options):
+        self.stdout.write(
+            f'Нагрузка: {options["processes"]} процессов × '
+            f'{options["threads"]} потоков, {options["duration"]:.0f} с'
+        )
+        plan['threads'] = options['threads']
+        plan['seed'] = options['seed']
+        plan['start'] = time.monotonic() + options['warmup']
+        plan['stop'] = plan['start'] + options['duration']
+        tasks = [(process, plan) for process in range(options['processes'])]
+        if options['processes'] > 1:
+            # Закрываем соединения до fork: каждый процесс откроет свое.
+            connections.close_all()
+            context = multiprocessing.get_context('fork')
+            with context.Pool(options['processes']) as pool:
+                results = pool.map(run_process, tasks)
+        else:
+            results = [run_process(tasks[0])]
+        return merge(results)
+
+    def report(self, stats, options):
+        duration = options['duration']
+        latencies = sorted(
+            value for values in stats.values() for value in values['latencies']
+        )
+        total = len(latencies)
+        errors = sum(values['errors'] for values in stats.values())
+        self.stdout.write(
+            f'Запросов: {total} ({total / duration:.1f} в секунду), '
+            f'ошибок: {errors} ({errors / max(total, 1):.2%})'
+        )
+        self.stdout.write(
+            f'{"маршрут":<12} {"запросов":>9} {"ошибок":>7} '
+            f'{"p50":>8} {"p95":>8} {"p99":>8} мс'
+        )
+        for route, values in stats.items():
+            route_latencies = sorted(values['latencies'])
+            self.stdout.write(
+                f'{route:<12} {len(route_latencies):>9} '
+                f'{values["errors"]:>7} '
+                f'{percentile(route_latencies, 0.50):>8.2f} '
+                f'{percentile(route_latencies, 0.95):>8.2f} '
+                f'{percentile(route_latencies, 0.99):>8.2f}'
+            )
+        self.stdout.write('Гистограмма задержек:')
+        buckets = histogram(latencies)
+        widest = max(count for _, count in buckets) or 1
+        for number, (bound, count) in enumerate(buckets):
+            if bound is None:
+                label = f'> {buckets[number - 1][0]} мс'
+            else:
+                label = f'≤ {bound} мс'
+            bar = '#' * round(40 * count / widest)
+            self.stdout.write(f'  {label:>10} {count:>8} {bar}')
@@ -0,0 +1,64 @@
+import sqlite3
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+def copy_database(source, target):
+    """Копирует файл SQLite целиком через backup API.
+
+    Копия согласованна: backup читает снимок базы, пока в нее
+    продолжают писать, а читатели реплики ждут окончания копирования.
+    """
+    with sqlite3.connect(source) as src, sqlite3.connect(target) as dst:
+        src.backup(dst)
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует основную базу SQLite в файлы реплик для локальной '
+        'проверки чтения из реплик. С --interval повторяет копирование, '
+        'пока не прервут.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database',
+            action='append',
+            help='Alias реплики; по умолчанию все базы, кроме основной.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            help='Повторять копирование раз в столько секунд.',
+        )
+
+    def handle(self, *args, **options):
+        aliases = options['database'] or [
+            alias for alias in connections if alias != DEFAULT_DB_ALIAS
+        ]
+        if not aliases:
+            raise CommandError('В DATABASES нет баз, кроме основной.')
+        primary = connections[DEFAULT_DB_ALIAS].settings_dict
+        if primary['ENGINE'] != 'django.db.backends.sqlite3':
+            raise CommandError('Команда копирует только базы SQLite.')
+        targets = []
+        for alias in aliases:
+            replica = connections[alias].settings_dict
+            if replica['ENGINE'] != primary['ENGINE']:
+                raise CommandError(f'Реплика {alias} не в SQLite.')
+            targets.append((alias, replica['NAME']))
+        while True:
+            started = time.monotonic()
+            for alias, name in targets:
+                copy_database(primary['NAME'], name)
+            self.stdout.write(
+                'Скопировано в {} за {:.2f} с'.format(
+                    ', '.join(alias for alias, _ in targets),
+                    time.monotonic() - started,
+                )
+            )
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
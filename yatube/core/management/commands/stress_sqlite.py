@@ -0,0 +1,147 @@
+import os
+import random
+import tempfile
+import threading
+import time
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connections, transaction
+from django.db.models import F
+from django.test.utils import override_settings
+
+from posts.models import AuthorCounter, Post
+
+User = get_user_model()
+
+ALIAS = 'stress'
+
+
+class Counter:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.values = {'reads': 0, 'writes': 0, 'errors': 0}
+
+    def add(self, name):
+        with self.lock:
+            self.values[name] += 1
+
+
+def read(author_ids):
+    list(
+        Post.objects.using(ALIAS)
+        .select_related('author', 'group')
+        .order_by('-pub_date')[:10]
+    )
+
+
+def write(author_ids):
+    # Та же последовательность записей, что при создании поста:
+    # сам пост и счетчик автора в одной транзакции.
+    author_id = random.choice(author_ids)
+    with transaction.atomic(using=ALIAS):
+        Post.objects.using(ALIAS).bulk_create(
+            [Post(text='Нагрузочный пост', author_id=author_id)]
+        )
+        AuthorCounter.objects.using(ALIAS).filter(
+            author_id=author_id
+        ).update(post_count=F('post_count') + 1)
+
+
+def worker(operation, name, author_ids, counter, deadline):
+    try:
+        while time.monotonic() < deadline:
+            try:
+                operation(author_ids)
+            except OperationalError:
+                counter.add('errors')
+            else:
+                counter.add(name)
+    finally:
+        connections[ALIAS].close()
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагружает файловую базу SQLite потоками читателей и писателей '
+        'без PRAGMA и с settings.SQLITE_PRAGMAS и сравнивает число '
+        'операций в секунду и ошибок «database is locked».'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=8)
+        parser.add_argument('--writers', type=int, default=4)
+        parser.add_argument('--seconds', type=float, default=5.0)
+        parser.add_argument('--posts', type=int, default=10000)
+
+    def handle(self, *args, **options):
+        profiles = {'по умолчанию': {}, 'SQLITE_PRAGMAS': None}
+        with tempfile.TemporaryDirectory() as directory:
+            for number, (title, pragmas) in enumerate(profiles.items()):
+                path = os.path.join(directory, f'stress-{number}.sqlite3')
+                overrides = {} if pragmas is None else {
+                    'SQLITE_PRAGMAS': pragmas
+                }
+                with override_settings(**overrides):
+                    result = self.run(path, options)
+                self.stdout.write(
+                    f'{title:<16} чтений/с {result["reads"]:8.0f}  '
+                    f'записей/с {result["writes"]:7.0f}  '
+                    f'ошибок: {result["errors"]}'
+                )
+
+    def run(self, path, options):
+        connections.databases[ALIAS] = {
+            **connections.databases['default'],
+            'NAME': path,
+            'CONN_MAX_AGE': 0,
+        }
+        connections.ensure_defaults(ALIAS)
+        try:
+            call_command('migrate', database=ALIAS, stdout=StringIO())
+            author_ids = self.seed(options['posts'])
+            connections[ALIAS].close()
+            counter = Counter()
+            deadline = time.monotonic() + options['seconds']
+            threads = [
+                threading.Thread(
+                    target=worker,
+                    args=(operation, name, author_ids, counter, deadline),
+                )
+                for operation, name, count in (
+                    (read, 'reads', options['readers']),
+                    (write, 'writes', options['writers']),
+                )
+                for _ in range(count)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            connections[ALIAS].close()
+            del connections[ALIAS]
+            del connections.databases[ALIAS]
+        return {
+            'reads': counter.values['reads'] / options['seconds'],
+            'writes': counter.values['writes'] / options['seconds'],
+            'errors': counter.values['errors'],
+        }
+
+    def seed(self, posts):
+        User.objects.using(ALIAS).bulk_create(
+            User(username=f'stress{number}') for number in range(20)
+        )
+        author_ids = list(
+            User.objects.using(ALIAS).values_list('pk', flat=True)
+        )
+        AuthorCounter.objects.using(ALIAS).bulk_create(
+            AuthorCounter(author_id=author_id) for author_id in author_ids
+        )
+        Post.objects.using(ALIAS).bulk_create(
+            Post(text='Пост', author_id=random.choice(author_ids))
+            for _ in range(posts)
+        )
+        return author_ids
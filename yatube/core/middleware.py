@@ -0,0 +1,142 @@
+"""Замер того, на что уходит время запроса.
+
+PerformanceMiddleware считает SQL-запросы и время в базе через
+execute_wrapper (работает и без DEBUG), время отрисовки шаблонов и
+время view, отдает их в заголовке Server-Timing и пишет строку JSON
+в логгер core.performance. Middleware должна стоять последней в
+MIDDLEWARE: тогда время внутри нее — это время разрешения URL и view.
+"""
+import json
+import logging
+import random
+import threading
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.template.backends.django import Template
+
+logger = logging.getLogger('core.performance')
+
+_local = threading.local()
+
+
+class RequestMetrics:
+    __slots__ = ('queries', 'db_time', 'template_time', 'template_depth')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.template_depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.queries += 1
+
+
+def current_metrics():
+    return getattr(_local, 'metrics', None)
+
+
+def timed_render(render):
+    """Оборачивает Template.render, чтобы считать время шаблонов.
+
+    Вне замеряемого запроса обертка сразу вызывает исходный метод.
+    Вложенные отрисовки не суммируются повторно.
+    """
+
+    def wrapper(self, *args, **kwargs):
+        metrics = current_metrics()
+        if metrics is None:
+            return render(self, *args, **kwargs)
+        metrics.template_depth += 1
+        started = time.perf_counter()
+        try:
+            return render(self, *args, **kwargs)
+        finally:
+            metrics.template_depth -= 1
+            if not metrics.template_depth:
+                metrics.template_time += time.perf_counter() - started
+
+    wrapper.timed = True
+    return wrapper
+
+
+def install_template_timer():
+    if not getattr(Template.render, 'timed', False):
+        Template.render = timed_render(Template.render)
+
+
+def server_timing(metrics, view_time):
+    return ', '.join(
+        [
+            f'db;dur={metrics.db_time * 1000:.1f};'
+            f'desc="{metrics.queries} queries"',
+            f'tpl;dur={metrics.template_time * 1000:.1f}',
+            f'view;dur={view_time * 1000:.1f}',
+        ]
+    )
+
+
+class PerformanceMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        install_template_timer()
+
+    def __call__(self, request):
+        rate = getattr(settings, 'PERFORMANCE_SAMPLE_RATE', 1.0)
+        if rate <= 0 or (rate < 1 and random.random() >= rate):
+            return self.get_response(request)
+        metrics = RequestMetrics()
+        _local.metrics = metrics
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(metrics))
+                response = self.get_response(request)
+        finally:
+            _local.metrics = None
+        view_time = time.perf_counter() - started
+        if getattr(settings, 'PERFORMANCE_SERVER_TIMING', True):
+            response['Server-Timing'] = server_timing(metrics, view_time)
+        if self.is_slow(metrics, view_time):
+            self.log(request, response, metrics, view_time)
+        return response
+
+    @staticmethod
+    def is_slow(metrics, view_time):
+        time_threshold = getattr(settings, 'PERFORMANCE_LOG_THRESHOLD_MS', 0)
+        query_threshold = getattr(
+            settings, 'PERFORMANCE_LOG_QUERY_THRESHOLD', None
+        )
+        if view_time * 1000 >= time_threshold:
+            return True
+        return query_threshold is not None and (
+            metrics.queries >= query_threshold
+        )
+
+    @staticmethod
+    def log(request, response, metrics, view_time):
+        match = request.resolver_match
+        logger.info(
+            json.dumps(
+                {
+                    'method': request.method,
+                    'path': request.path,
+                    'view': match.view_name if match else None,
+                    'status': response.status_code,
+                    'queries': metrics.queries,
+                    'db_ms': round(metrics.db_time * 1000, 2),
+                    'template_ms': round(metrics.template_time * 1000, 2),
+                    'view_ms': round(view_time * 1000, 2),
+                },
+                ensure_ascii=False,
+            )
+        )
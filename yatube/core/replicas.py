@@ -0,0 +1,117 @@
+"""Чтение из реплик базы данных для view, которые ничего не пишут.
+
+ReplicaMiddleware включает реплики на время GET-запроса к view из
+settings.DATABASE_REPLICA_VIEWS, а ReplicaRouter направляет чтения
+такого запроса на случайную реплику из settings.DATABASE_REPLICAS.
+Все записи и все остальные view работают с основной базой.
+
+После записи посетитель на settings.DATABASE_REPLICA_PIN_SECONDS
+секунд закрепляется за основной базой (cookie), чтобы сразу увидеть
+свой пост, даже если реплика еще не догнала основную базу.
+
+Код, который кеширует прочитанное, читает внутри primary_reads():
+иначе страница, прочитанная из отставшей реплики, попала бы в кеш уже
+после инвалидации и жила бы в нем до конца срока.
+"""
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+PIN_COOKIE = 'pin_primary'
+
+_state = threading.local()
+
+
+def get_replicas():
+    return tuple(getattr(settings, 'DATABASE_REPLICAS', ()))
+
+
+@contextmanager
+def primary_reads():
+    """Направляет чтения внутри блока в основную базу."""
+    previous = getattr(_state, 'use_replicas', False)
+    _state.use_replicas = False
+    try:
+        yield
+    finally:
+        _state.use_replicas = previous
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        replicas = get_replicas()
+        if replicas and getattr(_state, 'use_replicas', False):
+            return random.choice(replicas)
+        return None
+
+    def db_for_write(self, model, **hints):
+        _state.wrote = True
+        # Объект, прочитанный из реплики, сохраняется в основную базу;
+        # объекты других баз (например, в командах) остаются в своей.
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db is not None:
+            if instance._state.db not in get_replicas():
+                return instance._state.db
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики содержат те же данные, что и основная база.
+        databases = {DEFAULT_DB_ALIAS, *get_replicas()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Схему реплики приносит команда replicate_db вместе с данными.
+        if db in get_replicas():
+            return False
+        return None
+
+
+class ReplicaMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        _state.use_replicas = False
+        _state.wrote = False
+        try:
+            response = self.get_response(request)
+            if _state.wrote or request.method not in ('GET', 'HEAD'):
+                self.pin(response)
+        finally:
+            _state.use_replicas = False
+            _state.wrote = False
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        match = request.resolver_match
+        _state.use_replicas = (
+            request.method in ('GET', 'HEAD')
+            and match is not None
+            and match.view_name in settings.DATABASE_REPLICA_VIEWS
+            and not self.is_pinned(request)
+        )
+
+    @staticmethod
+    def is_pinned(request):
+        try:
+            return float(request.COOKIES.get(PIN_COOKIE, 0)) > time.time()
+        except ValueError:
+            return False
+
+    @staticmethod
+    def pin(response):
+        seconds = getattr(settings, 'DATABASE_REPLICA_PIN_SECONDS', 0)
+        if seconds and get_replicas():
+            response.set_cookie(
+                PIN_COOKIE,
+                str(time.time() + seconds),
+                max_age=seconds,
+                httponly=True,
+                samesite='Lax',
+            )
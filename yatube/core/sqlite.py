@@ -0,0 +1,24 @@
+"""Производственные настройки SQLite для каждого нового соединения.
+
+PRAGMA из settings.SQLITE_PRAGMAS выполняются сразу после открытия
+соединения. По умолчанию это WAL (читатели не блокируют писателя и
+наоборот), synchronous=NORMAL, отображение файла в память, увеличенный
+кеш страниц и ожидание блокировки вместо немедленного
+«database is locked».
+"""
+import re
+
+from django.conf import settings
+
+PRAGMA_NAME = re.compile(r'^[a-z_]+$')
+
+
+def apply_pragmas(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    for name, value in getattr(settings, 'SQLITE_PRAGMAS', {}).items():
+        if not PRAGMA_NAME.match(name):
+            raise ValueError(f'Неверное имя PRAGMA: {name}')
+        # Сырое соединение: эти запросы не должны попадать в счетчики
+        # запросов и логи.
+        connection.connection.execute(f'PRAGMA {name} = {value}')
@@ -0,0 +1,182 @@
+"""Раздача статики из процесса приложения.
+
+CompressedManifestStaticFilesStorage при collectstatic добавляет к именам
+файлов хеш содержимого (как ManifestStaticFilesStorage) и кладет рядом
+сжатые gzip копии текстовых файлов. StaticFilesMiddleware отдает файлы
+из STATIC_ROOT до остальных middleware: файлы с хешем в имени — с
+кешированием на год, сжатую копию — если клиент принимает gzip.
+Отдельный сервер для статики и сжатие на лету не нужны.
+"""
+import gzip
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+# Уже сжатые форматы (картинки, шрифты woff) gzip не уменьшает.
+COMPRESSIBLE_EXTENSIONS = (
+    '.css', '.js', '.json', '.map', '.svg', '.txt', '.xml', '.html',
+    '.ico', '.ttf', '.otf', '.eot',
+)
+# Сжатая копия сохраняется, только если она меньше оригинала хотя бы
+# на эту долю: иначе распаковка у клиента не окупается.
+MIN_COMPRESSION_GAIN = 0.05
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+GZIP_RE = re.compile(r'(?:^|,)\s*gzip\s*(?:;\s*q\s*=\s*([0-9.]+))?', re.I)
+
+
+def compress_file(path):
+    """Пишет path.gz, если gzip заметно уменьшает файл; иначе удаляет."""
+    with open(path, 'rb') as source:
+        content = source.read()
+    # mtime=0 делает сжатую копию одинаковой при каждом collectstatic.
+    compressed = gzip.compress(content, compresslevel=9, mtime=0)
+    gz_path = path + '.gz'
+    if len(compressed) > len(content) * (1 - MIN_COMPRESSION_GAIN):
+        if os.path.exists(gz_path):
+            os.remove(gz_path)
+        return False
+    with open(gz_path, 'wb') as target:
+        target.write(compressed)
+    return True
+
+
+def accepts_gzip(header):
+    """Проверяет, что Accept-Encoding разрешает gzip (q > 0)."""
+    match = GZIP_RE.search(header or '')
+    if match is None:
+        return False
+    try:
+        return match.group(1) is None or float(match.group(1)) > 0
+    except ValueError:
+        return False
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    def post_process(self, paths, dry_run=False, **options):
+        names = set()
+        for name, hashed_name, processed in super().post_process(
+            paths, dry_run, **options
+        ):
+            if hashed_name and not isinstance(processed, Exception):
+                names.update((name, hashed_name))
+            yield name, hashed_name, processed
+        if dry_run:
+            return
+        for name in sorted(names):
+            if name.lower().endswith(COMPRESSIBLE_EXTENSIONS):
+                compress_file(self.path(name))
+
+    def stored_name(self, name):
+        # Без collectstatic (разработка, тесты) манифеста нет: ссылаемся
+        # на файл без хеша, его отдаст staticfiles из STATICFILES_DIRS.
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            return name
+
+
+class StaticFile:
+    __slots__ = ('path', 'headers', 'gzip_path', 'gzip_headers')
+
+    def __init__(self, path, immutable):
+        self.path = path
+        stat = os.stat(path)
+        content_type, _ = mimetypes.guess_type(path)
+        self.headers = {
+            'Content-Type': content_type or 'application/octet-stream',
+            'Content-Length': str(stat.st_size),
+            'Last-Modified': http_date(stat.st_mtime),
+            'Cache-Control': (
+                IMMUTABLE_CACHE_CONTROL
+                if immutable
+                else 'public, max-age={}'.format(
+                    settings.STATIC_MAX_AGE
+                )
+            ),
+        }
+        self.gzip_path = None
+        self.gzip_headers = None
+        if os.path.isfile(path + '.gz'):
+            self.gzip_path = path + '.gz'
+            self.headers['Vary'] = 'Accept-Encoding'
+            self.gzip_headers = {
+                **self.headers,
+                'Content-Encoding': 'gzip',
+                'Content-Length': str(os.path.getsize(self.gzip_path)),
+            }
+
+    def respond(self, request):
+        headers = self.headers
+        path = self.path
+        if self.gzip_path and accepts_gzip(
+            request.META.get('HTTP_ACCEPT_ENCODING')
+        ):
+            headers = self.gzip_headers
+            path = self.gzip_path
+        if not was_modified_since(
+            request.META.get('HTTP_IF_MODIFIED_SINCE'),
+            os.stat(self.path).st_mtime,
+            int(headers['Content-Length']),
+        ):
+            response = HttpResponseNotModified()
+            for name in ('Cache-Control', 'Last-Modified', 'Vary'):
+                if name in headers:
+                    response[name] = headers[name]
+            return response
+        if request.method == 'HEAD':
+            response = HttpResponse()
+        else:
+            response = FileResponse(open(path, 'rb'))
+        for name, value in headers.items():
+            response[name] = value
+        return response
+
+
+def find_files(root, prefix, immutable_names):
+    """Собирает файлы STATIC_ROOT по URL, кроме сжатых копий и манифеста."""
+    files = {}
+    for directory, _, names in os.walk(root):
+        for name in names:
+            path = os.path.join(directory, name)
+            relative = os.path.relpath(path, root).replace(os.sep, '/')
+            if name.endswith('.gz') and os.path.isfile(path[:-3]):
+                continue
+            if relative == ManifestStaticFilesStorage.manifest_name:
+                continue
+            files[prefix + relative] = StaticFile(
+                path, relative in immutable_names
+            )
+    return files
+
+
+class StaticFilesMiddleware:
+    """Отдает собранную collectstatic статику из STATIC_ROOT.
+
+    Список файлов читается один раз при запуске процесса, поэтому после
+    collectstatic процесс сервера нужно перезапустить, как и после
+    обновления кода.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.prefix = settings.STATIC_URL
+        self.files = {}
+        root = settings.STATIC_ROOT
+        if root and os.path.isdir(root):
+            storage = CompressedManifestStaticFilesStorage()
+            immutable_names = set(storage.load_manifest().values())
+            self.files = find_files(root, self.prefix, immutable_names)
+
+    def __call__(self, request):
+        if request.method in ('GET', 'HEAD'):
+            static_file = self.files.get(request.path_info)
+            if static_file is not None:
+                return static_file.respond(request)
+        return self.get_response(request)
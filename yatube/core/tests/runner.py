@@ -0,0 +1,21 @@
+from contextlib import ExitStack
+
+from django.test.runner import DiscoverRunner
+
+from .utils import temporary_file_caches
+
+
+class TestRunner(DiscoverRunner):
+    """Запуск тестов, при котором файловые кеши живут во временном каталоге.
+
+    Для pytest то же делает conftest.py в корне репозитория.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.cleanup = ExitStack()
+        self.cleanup.enter_context(temporary_file_caches())
+
+    def teardown_test_environment(self, **kwargs):
+        self.cleanup.close()
+        super().teardown_test_environment(**kwargs)
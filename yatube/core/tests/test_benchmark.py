@@ -0,0 +1,113 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from posts.models import Post
+
+from ..benchmark import (
+    WSGIClient,
+    compare_results,
+    histogram,
+    measure,
+    percentile,
+    seed_posts,
+)
+from ..management.commands.loadtest import DEFAULT_MIX, parse_mix
+
+User = get_user_model()
+
+
+def result(p50, queries=1) -> dict:
+    return {'status': 200, 'queries': queries, 'p50': p50}
+
+
+class CompareResultsTest(SimpleTestCase):
+    def test_percentile(self) -> None:
+        """Проверяет перцентили отсортированного списка."""
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 0.5), 51)
+        self.assertEqual(percentile(values, 0.99), 99)
+        self.assertEqual(percentile([], 0.5), 0.0)
+
+    def test_regressions(self) -> None:
+        """Проверяет порог роста медианы и рост числа запросов."""
+        baseline = {
+            '10000': {
+                'posts:index': result(10.0),
+                'posts:profile': result(10.0),
+                'about:tech': result(0.5),
+                'posts:post_detail': result(5.0, queries=2),
+            }
+        }
+        results = {
+            '10000': {
+                'posts:index': result(11.5),
+                'posts:profile': result(13.0),
+                'about:tech': result(1.2),
+                'posts:post_detail': result(5.0, queries=3),
+                'posts:search': result(50.0),
+            }
+        }
+        regressions = compare_results(results, baseline, threshold=0.2)
+        self.assertEqual(len(regressions), 2)
+        self.assertIn('posts:profile', regressions[0])
+        self.assertIn('posts:post_detail', regressions[1])
+
+
+class LoadTestTest(SimpleTestCase):
+    def test_histogram(self) -> None:
+        """Проверяет раскладку задержек по корзинам гистограммы."""
+        buckets = histogram([0.5, 1, 1.5, 7, 30], bounds=(1, 5, 10))
+        self.assertEqual(buckets, [(1, 2), (5, 1), (10, 1), (None, 1)])
+
+    def test_parse_mix(self) -> None:
+        """Проверяет веса маршрутов из --mix поверх весов по умолчанию."""
+        mix = parse_mix(['post_create=10', 'search=0'])
+        self.assertEqual(mix['post_create'], 10)
+        self.assertNotIn('search', mix)
+        self.assertEqual(mix['index'], DEFAULT_MIX['index'])
+        for values in (['feed=1'], ['index=много'], ['index=-1']):
+            with self.subTest(values=values):
+                with self.assertRaises(CommandError):
+                    parse_mix(values)
+
+
+class WSGIClientTest(TestCase):
+    def test_post_form_with_csrf(self) -> None:
+        """Проверяет отправку формы через WSGI с CSRF-токеном."""
+        user = User.objects.create_user(username='loader')
+        client = WSGIClient.logged_in(user)
+        response = client.post(
+            reverse('posts:post_create'), {'text': 'Пост под нагрузкой'}
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(
+            Post.objects.filter(author=user, text='Пост под нагрузкой')
+        )
+
+
+class MeasureTest(TestCase):
+    def test_before_runs_outside_each_sample(self) -> None:
+        """Проверяет вызов before перед каждым замером, но не прогревом."""
+        calls = []
+        result = measure(
+            WSGIClient(),
+            reverse('about:tech'),
+            repeat=3,
+            warmup=1,
+            before=lambda: calls.append(1),
+        )
+        self.assertEqual(result['status'], 200)
+        self.assertEqual(len(calls), 3)
+
+
+class SeedPostsTest(TestCase):
+    def test_seed_posts(self) -> None:
+        """Проверяет, что посты вставляются со всеми колонками модели."""
+        seed_posts(30, authors=3, groups=2)
+        self.assertEqual(Post.objects.count(), 30)
+        post = Post.objects.first()
+        self.assertTrue(post.excerpt_html)
+        self.assertFalse(post.image)
+        self.assertFalse(post.thumbnails_ready)
@@ -0,0 +1,113 @@
+import gzip
+
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from ..compression import CompressionMiddleware, compress_sequence
+
+HTML = '<p>Пост</p>\n' * 500
+
+
+def get(response, **extra):
+    middleware = CompressionMiddleware(lambda request: response)
+    return middleware(RequestFactory().get('/', **extra))
+
+
+@override_settings(
+    COMPRESSION_LEVEL=6,
+    COMPRESSION_MIN_LENGTH=1024,
+    COMPRESSION_STREAM_FLUSH_BYTES=1024,
+)
+class CompressionMiddlewareTest(SimpleTestCase):
+    def test_html_and_json(self) -> None:
+        """Проверяет сжатие больших HTML и JSON."""
+        for response in (
+            HttpResponse(HTML),
+            JsonResponse({'posts': [HTML]}),
+        ):
+            with self.subTest(content_type=response['Content-Type']):
+                content = response.content
+                response = get(response, HTTP_ACCEPT_ENCODING='gzip, br')
+                self.assertEqual(response['Content-Encoding'], 'gzip')
+                self.assertEqual(response['Vary'], 'Accept-Encoding')
+                self.assertEqual(
+                    int(response['Content-Length']), len(response.content)
+                )
+                self.assertLess(len(response.content), len(content))
+                self.assertEqual(gzip.decompress(response.content), content)
+
+    def test_skipped_responses(self) -> None:
+        """Проверяет, что маленькие, сжатые и прочие ответы не сжимаются."""
+        encoded = HttpResponse(HTML)
+        encoded['Content-Encoding'] = 'br'
+        no_transform = HttpResponse(HTML)
+        no_transform['Cache-Control'] = 'public, no-transform'
+        cases = {
+            'маленький': (HttpResponse('<p>Пост</p>'), None),
+            'уже сжатый': (encoded, 'br'),
+            'no-transform': (no_transform, None),
+            'картинка': (
+                HttpResponse(HTML, content_type='image/svg+xml'),
+                None,
+            ),
+        }
+        for name, (response, encoding) in cases.items():
+            with self.subTest(name=name):
+                response = get(response, HTTP_ACCEPT_ENCODING='gzip')
+                self.assertEqual(response.get('Content-Encoding'), encoding)
+                self.assertNotIn('Vary', response)
+
+    def test_client_without_gzip(self) -> None:
+        """Проверяет несжатый ответ клиенту без gzip и заголовок Vary."""
+        for header in ('', 'br', 'gzip;q=0'):
+            with self.subTest(header=header):
+                response = get(
+                    HttpResponse(HTML), HTTP_ACCEPT_ENCODING=header
+                )
+                self.assertNotIn('Content-Encoding', response)
+                self.assertEqual(response['Vary'], 'Accept-Encoding')
+                self.assertEqual(response.content.decode(), HTML)
+
+    def test_etag_becomes_weak(self) -> None:
+        """Проверяет, что ETag сжатого ответа становится слабым."""
+        response = HttpResponse(HTML)
+        response['ETag'] = '"abc"'
+        response = get(response, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['ETag'], 'W/"abc"')
+
+    def test_streaming(self) -> None:
+        """Проверяет сжатие потокового ответа по частям."""
+        consumed = []
+
+        def rows():
+            for number in range(200):
+                consumed.append(number)
+                yield f'{{"id": {number}, "text": "пост"}},'
+
+        response = get(
+            StreamingHttpResponse(rows(), content_type='application/json'),
+            HTTP_ACCEPT_ENCODING='gzip',
+        )
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertNotIn('Content-Length', response)
+        self.assertEqual(consumed, [])
+        chunks = []
+        for chunk in response.streaming_content:
+            chunks.append(chunk)
+            # Тело не собирается целиком до отдачи первой части.
+            self.assertLess(len(consumed), 200)
+            break
+        chunks.extend(response.streaming_content)
+        expected = ''.join(
+            f'{{"id": {number}, "text": "пост"}},' for number in range(200)
+        )
+        self.assertEqual(gzip.decompress(b''.join(chunks)).decode(), expected)
+
+    def test_compress_sequence_flushes(self) -> None:
+        """Проверяет сброс сжатых данных после flush_bytes байт."""
+        chunks = [b'x' * 100] * 50
+        compressed = list(compress_sequence(chunks, 6, flush_bytes=1000))
+        self.assertGreaterEqual(len(compressed), 5)
+        self.assertEqual(
+            gzip.decompress(b''.join(compressed)), b''.join(chunks)
+        )
@@ -0,0 +1,64 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from mixer.backend.django import mixer
+
+from posts.models import Post
+
+User = get_user_model()
+
+
+class PerformanceMiddlewareTest(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = mixer.blend(User, username='auth')
+        cls.post = mixer.blend(Post, author=cls.user)
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def timings(self, response) -> dict:
+        metrics = {}
+        for metric in response['Server-Timing'].split(', '):
+            name, *params = metric.split(';')
+            metrics[name] = dict(param.split('=', 1) for param in params)
+        return metrics
+
+    @override_settings(
+        PERFORMANCE_LOG_THRESHOLD_MS=0, PERFORMANCE_SAMPLE_RATE=1.0
+    )
+    def test_metrics_in_header_and_log(self) -> None:
+        """Проверяет заголовок Server-Timing и строку лога запроса."""
+        url = reverse('posts:post_detail', kwargs={'post_id': self.post.pk})
+        with self.assertLogs('core.performance', 'INFO') as logs:
+            with self.assertNumQueries(2):
+                response = self.client.get(url)
+        metrics = self.timings(response)
+        self.assertEqual(set(metrics), {'db', 'tpl', 'view'})
+        self.assertEqual(metrics['db']['desc'], '"2 queries"')
+        self.assertGreater(float(metrics['tpl']['dur']), 0)
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['view'], 'posts:post_detail')
+        self.assertEqual(record['status'], 200)
+        self.assertEqual(record['queries'], 2)
+        self.assertGreaterEqual(record['view_ms'], record['template_ms'])
+
+    @override_settings(
+        PERFORMANCE_LOG_THRESHOLD_MS=60000,
+        PERFORMANCE_LOG_QUERY_THRESHOLD=None,
+    )
+    def test_fast_request_is_not_logged(self) -> None:
+        """Проверяет, что запросы быстрее порога в лог не попадают."""
+        with self.assertRaises(AssertionError):
+            with self.assertLogs('core.performance', 'INFO'):
+                response = self.client.get(reverse('posts:index'))
+        self.assertIn('Server-Timing', response)
+
+    @override_settings(PERFORMANCE_SAMPLE_RATE=0)
+    def test_unsampled_request_is_not_measured(self) -> None:
+        """Проверяет, что вне выборки запрос не замеряется."""
+        response = self.client.get(reverse('posts:index'))
+        self.assertNotIn('Server-Timing', response)
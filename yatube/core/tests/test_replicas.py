@@ -0,0 +1,99 @@
+import time
+from unittest import mock
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.db import router
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.urls import resolve, reverse
+
+from posts.cache import cache_feed, global_scope
+from posts.models import Post
+
+from ..replicas import PIN_COOKIE, ReplicaMiddleware, primary_reads
+
+
+def read_database(request):
+    return HttpResponse(router.db_for_read(Post))
+
+
+def write_database(request):
+    return HttpResponse(router.db_for_write(Post))
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReplicaRoutingTest(SimpleTestCase):
+    def request(self, method, url, view=read_database, cookies=None):
+        request = getattr(RequestFactory(), method)(url)
+        request.COOKIES.update(cookies or {})
+        request.resolver_match = resolve(url)
+        request.user = AnonymousUser()
+
+        def get_response(request):
+            middleware.process_view(request, view, (), {})
+            return view(request)
+
+        middleware = ReplicaMiddleware(get_response)
+        return middleware(request)
+
+    def test_read_views_use_replica(self) -> None:
+        """Проверяет, что ленты читаются из реплики."""
+        for url in (reverse('posts:index'), reverse('about:tech')):
+            with self.subTest(url=url):
+                response = self.request('get', url)
+                self.assertEqual(response.content, b'replica')
+                self.assertNotIn(PIN_COOKIE, response.cookies)
+
+    def test_other_views_and_writes_use_primary(self) -> None:
+        """Проверяет, что создание поста и вход работают с основной базой."""
+        for url in (reverse('posts:post_create'), reverse('users:login')):
+            with self.subTest(url=url):
+                self.assertEqual(
+                    self.request('get', url).content, b'default'
+                )
+        response = self.request('get', reverse('posts:index'), write_database)
+        self.assertEqual(response.content, b'default')
+        self.assertEqual(router.db_for_read(Post), 'default')
+
+    def test_write_pins_reader_to_primary(self) -> None:
+        """Проверяет чтение своих записей сразу после POST."""
+        response = self.request('post', reverse('posts:post_create'))
+        self.assertIn(PIN_COOKIE, response.cookies)
+        cookies = {PIN_COOKIE: response.cookies[PIN_COOKIE].value}
+        response = self.request('get', reverse('posts:index'), cookies=cookies)
+        self.assertEqual(response.content, b'default')
+        expired = {PIN_COOKIE: str(time.time() - 1)}
+        response = self.request('get', reverse('posts:index'), cookies=expired)
+        self.assertEqual(response.content, b'replica')
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_without_replicas_everything_uses_primary(self) -> None:
+        """Проверяет, что без настроенных реплик все читают из основной."""
+        response = self.request('get', reverse('posts:index'))
+        self.assertEqual(response.content, b'default')
+
+    @override_settings(FEED_CACHE_TIMEOUT=60)
+    @mock.patch('posts.cache.scope_modified', return_value=None)
+    def test_feed_cache_miss_reads_primary(self, scope_modified) -> None:
+        """Проверяет, что в кеш лент не попадает страница из реплики."""
+        cache.clear()
+        self.addCleanup(cache.clear)
+        cached_view = cache_feed(global_scope)(read_database)
+        url = reverse('posts:index')
+        response = self.request('get', url, cached_view)
+        self.assertEqual(response.content, b'default')
+        # Повтор отдается из кеша: там страница из основной базы.
+        response = self.request('get', url, cached_view)
+        self.assertEqual(response.content, b'default')
+
+    def test_primary_reads_restores_replicas(self) -> None:
+        """Проверяет, что после primary_reads чтения снова идут в реплику."""
+
+        def view(request):
+            with primary_reads():
+                inside = router.db_for_read(Post)
+            return HttpResponse(f'{inside} {router.db_for_read(Post)}')
+
+        response = self.request('get', reverse('posts:index'), view)
+        self.assertEqual(response.content, b'default replica')
@@ -0,0 +1,61 @@
+from importlib import import_module
+from unittest import mock
+
+from django.conf import settings
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..checks import check_session_cache
+from ..context_processors.year import year
+
+
+class AnonymousFastPathTest(TestCase):
+    def test_year_is_computed_only_when_rendered(self) -> None:
+        """Проверяет, что год вычисляется только при выводе в шаблоне."""
+        with mock.patch(
+            'core.context_processors.year.current_year', return_value=2000
+        ) as current_year:
+            context = year(None)
+            current_year.assert_not_called()
+            self.assertEqual(str(context['year']), '2000')
+        current_year.assert_called_once()
+
+    def test_session_is_read_without_database(self) -> None:
+        """Проверяет, что сессия посетителя берется из кеша, а не из базы."""
+        store = import_module(settings.SESSION_ENGINE).SessionStore()
+        store['visited'] = True
+        store.save()
+        self.client.cookies[settings.SESSION_COOKIE_NAME] = store.session_key
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('about:author'))
+        self.assertFalse(response.wsgi_request.user.is_authenticated)
+        for query in queries.captured_queries:
+            self.assertNotIn('django_session', query['sql'])
+
+
+class SessionCacheCheckTest(SimpleTestCase):
+    def test_project_session_cache_is_shared(self) -> None:
+        """Проверяет, что настройки проекта проходят проверку."""
+        self.assertEqual(check_session_cache(None), [])
+
+    def test_tests_keep_session_cache_out_of_project(self) -> None:
+        """Проверяет, что тесты пишут кеш сессий во временный каталог."""
+        location = settings.CACHES['sessions']['LOCATION']
+        self.assertFalse(location.startswith(settings.BASE_DIR))
+
+    def test_local_session_cache_warns(self) -> None:
+        """Проверяет предупреждение для кеша сессий в памяти процесса."""
+        caches = {
+            **settings.CACHES,
+            'sessions': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'
+            },
+        }
+        with override_settings(CACHES=caches):
+            warnings = check_session_cache(None)
+        self.assertEqual([warning.id for warning in warnings], ['core.W001'])
+        signed = 'django.contrib.sessions.backends.signed_cookies'
+        with override_settings(CACHES=caches, SESSION_ENGINE=signed):
+            self.assertEqual(check_session_cache(None), [])
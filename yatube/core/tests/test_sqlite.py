@@ -0,0 +1,45 @@
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.db import connection, connections
+from django.db.backends.signals import connection_created
+from django.test import SimpleTestCase, override_settings
+
+from ..sqlite import apply_pragmas
+
+
+class SqlitePragmasTest(SimpleTestCase):
+    def test_new_connection_gets_production_pragmas(self) -> None:
+        """Проверяет, что PRAGMA применяются к каждому соединению."""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        wrapper = connections['default'].__class__(
+            {
+                **connection.settings_dict,
+                'NAME': os.path.join(directory, 'pragmas.sqlite3'),
+            },
+            alias='pragmas',
+        )
+        self.addCleanup(wrapper.close)
+        with wrapper.cursor() as cursor:
+            values = {}
+            for name in ('journal_mode', 'synchronous', 'busy_timeout'):
+                cursor.execute(f'PRAGMA {name}')
+                values[name] = cursor.fetchone()[0]
+        self.assertEqual(
+            values,
+            {
+                'journal_mode': 'wal',
+                # NORMAL
+                'synchronous': 1,
+                'busy_timeout': settings.SQLITE_PRAGMAS['busy_timeout'],
+            },
+        )
+
+    @override_settings(SQLITE_PRAGMAS={'journal_mode; DROP': 'wal'})
+    def test_bad_pragma_name_is_rejected(self) -> None:
+        """Проверяет, что имя PRAGMA не подставляется в SQL как есть."""
+        with self.assertRaises(ValueError):
+            apply_pragmas(connection_created, connection)
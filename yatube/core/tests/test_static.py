@@ -0,0 +1,125 @@
+import gzip
+import shutil
+import tempfile
+
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.templatetags.static import static
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from ..staticfiles import (
+    IMMUTABLE_CACHE_CONTROL,
+    StaticFilesMiddleware,
+    accepts_gzip,
+)
+
+STATIC_ROOT = tempfile.mkdtemp()
+
+
+def application(request):
+    return HttpResponse('view')
+
+
+@override_settings(STATIC_ROOT=STATIC_ROOT)
+class StaticFilesTest(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        call_command('collectstatic', interactive=False, verbosity=0)
+        cls.middleware = StaticFilesMiddleware(application)
+        cls.hashed_url = static('css/bootstrap.min.css')
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(STATIC_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def get(self, url, method='get', **extra):
+        request = getattr(RequestFactory(), method)(url, **extra)
+        return self.middleware(request)
+
+    def test_static_url_is_fingerprinted(self) -> None:
+        """Проверяет, что {% static %} ссылается на файл с хешем."""
+        self.assertRegex(
+            self.hashed_url, r'^/static/css/bootstrap\.min\.[0-9a-f]{12}\.css$'
+        )
+
+    def test_hashed_file_is_cached_forever(self) -> None:
+        """Проверяет кеширование файла с хешем на год."""
+        response = self.get(self.hashed_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Cache-Control'], IMMUTABLE_CACHE_CONTROL)
+        self.assertEqual(response['Content-Type'], 'text/css')
+
+    def test_plain_file_is_cached_briefly(self) -> None:
+        """Проверяет короткое кеширование файла без хеша."""
+        response = self.get('/static/css/bootstrap.min.css')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=3600')
+
+    def test_gzip_negotiation(self) -> None:
+        """Проверяет отдачу сжатой копии только тем, кто принимает gzip."""
+        plain = self.get(self.hashed_url)
+        compressed = self.get(
+            self.hashed_url, HTTP_ACCEPT_ENCODING='br, gzip;q=0.8'
+        )
+        self.assertNotIn('Content-Encoding', plain)
+        self.assertEqual(compressed['Content-Encoding'], 'gzip')
+        self.assertEqual(compressed['Vary'], 'Accept-Encoding')
+        body = b''.join(compressed.streaming_content)
+        self.assertEqual(len(body), int(compressed['Content-Length']))
+        self.assertEqual(
+            gzip.decompress(body), b''.join(plain.streaming_content)
+        )
+
+    def test_images_are_not_compressed(self) -> None:
+        """Проверяет, что для PNG сжатая копия не создается."""
+        response = self.get(
+            '/static/img/logo.png', HTTP_ACCEPT_ENCODING='gzip'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('Content-Encoding', response)
+        self.assertNotIn('Vary', response)
+
+    def test_not_modified(self) -> None:
+        """Проверяет ответ 304 на If-Modified-Since."""
+        response = self.get(self.hashed_url)
+        response = self.get(
+            self.hashed_url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['Cache-Control'], IMMUTABLE_CACHE_CONTROL)
+
+    def test_head(self) -> None:
+        """Проверяет, что HEAD возвращает заголовки без тела."""
+        response = self.get(self.hashed_url, method='head')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b'')
+        self.assertGreater(int(response['Content-Length']), 0)
+
+    def test_other_requests_reach_view(self) -> None:
+        """Проверяет, что прочие запросы проходят дальше."""
+        for method, url in (
+            ('get', '/static/missing.css'),
+            ('get', '/static/staticfiles.json'),
+            ('get', '/static/css/bootstrap.min.css.gz'),
+            ('post', self.hashed_url),
+            ('get', '/'),
+        ):
+            with self.subTest(method=method, url=url):
+                response = self.get(url, method=method)
+                self.assertEqual(response.content, b'view')
+
+    def test_accepts_gzip(self) -> None:
+        """Проверяет разбор Accept-Encoding."""
+        cases = {
+            'gzip': True,
+            'deflate, gzip;q=1.0, *;q=0.5': True,
+            'GZIP; q=0.1': True,
+            'gzip;q=0': False,
+            'x-gzip': False,
+            'br': False,
+            '': False,
+        }
+        for header, expected in cases.items():
+            with self.subTest(header=header):
+                self.assertIs(accepts_gzip(header), expected)
@@ -0,0 +1,194 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, OperationalError, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from mixer.backend.django import mixer
+
+from posts.cache import GLOBAL_SCOPE, get_count, set_count
+from posts.forms import PostForm
+from posts.models import Group, Post, get_post_count
+from posts.views import SavePost
+
+from ..writes import Job, WriteQueue, WriteQueueTimeout
+from .utils import capture_on_commit_callbacks
+
+User = get_user_model()
+
+
+def flaky(failures):
+    """Запись, которая failures раз застает базу занятой."""
+    calls = []
+
+    def write(slug):
+        calls.append(slug)
+        if len(calls) <= failures:
+            raise OperationalError('database is locked')
+        return Group.objects.create(title=slug, slug=slug, description='')
+
+    return write
+
+
+def locked_once(write):
+    """Запись, после первого выполнения которой база оказалась занята."""
+    calls = []
+
+    def job():
+        result = write()
+        calls.append(result)
+        if len(calls) == 1:
+            raise OperationalError('database is locked')
+        return result
+
+    return job
+
+
+@mock.patch('core.writes.time.sleep')
+class WriteQueueRetryTest(TestCase):
+    def test_locked_write_is_retried(self, sleep) -> None:
+        """Проверяет повтор записи, пока база занята."""
+        queue = WriteQueue()
+        group = queue.submit(flaky(2), 'cats')
+        self.assertTrue(Group.objects.filter(pk=group.pk).exists())
+        self.assertEqual(queue.metrics()['retries'], 2)
+        self.assertEqual(sleep.call_count, 2)
+
+    @override_settings(WRITE_QUEUE_RETRIES=2)
+    def test_retries_are_limited(self, sleep) -> None:
+        """Проверяет, что после всех попыток ошибка уходит вызывающему."""
+        queue = WriteQueue()
+        with self.assertRaises(OperationalError):
+            queue.submit(flaky(10), 'cats')
+        self.assertEqual(queue.metrics()['failures'], 1)
+        self.assertFalse(Group.objects.exists())
+
+    def test_retried_post_create_counts_once(self, sleep) -> None:
+        """Проверяет, что повтор создания поста не портит данные."""
+        user = mixer.blend(User)
+        group = mixer.blend(Group)
+        set_count(GLOBAL_SCOPE, 0)
+        # Пока очередь ждет, освобожденный откатом id занимает другой пост.
+        sleep.side_effect = lambda delay: mixer.blend(Post, text='Чужой')
+        form = PostForm({'text': 'Новый пост', 'group': group.pk})
+        self.assertTrue(form.is_valid())
+        with capture_on_commit_callbacks(execute=True):
+            post = WriteQueue().submit(locked_once(SavePost(form, user)))
+        self.assertEqual(
+            sorted(Post.objects.values_list('text', flat=True)),
+            ['Новый пост', 'Чужой'],
+        )
+        self.assertEqual(Post.objects.get(pk=post.pk).text, 'Новый пост')
+        self.assertEqual(get_post_count(user), 1)
+        self.assertEqual(Group.objects.get(pk=group.pk).post_count, 1)
+        self.assertEqual(get_count(GLOBAL_SCOPE), Post.objects.count())
+
+    def test_retried_post_edit_moves_counters_once(self, sleep) -> None:
+        """Проверяет счетчики групп после повтора переноса поста."""
+        old_group, new_group = mixer.cycle(2).blend(Group)
+        post = mixer.blend(Post, group=old_group)
+        form = PostForm(
+            {'text': 'Перенесенный пост', 'group': new_group.pk},
+            instance=Post.objects.get(pk=post.pk),
+        )
+        self.assertTrue(form.is_valid())
+        WriteQueue().submit(locked_once(SavePost(form)))
+        old_group.refresh_from_db()
+        new_group.refresh_from_db()
+        self.assertEqual(old_group.post_count, 0)
+        self.assertEqual(new_group.post_count, 1)
+
+    @override_settings(WRITE_QUEUE_RETRIES=0)
+    def test_post_create_answers_503_when_locked(self, sleep) -> None:
+        """Проверяет, что занятая база дает 503 с формой, а не 500."""
+        user = mixer.blend(User)
+        self.client.force_login(user)
+        with mock.patch.object(
+            Post, 'save', side_effect=OperationalError('database is locked')
+        ):
+            response = self.client.post(
+                reverse('posts:post_create'), {'text': 'Новый пост'}
+            )
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '1')
+        self.assertTrue(response.context['form'].non_field_errors())
+        self.assertFalse(Post.objects.exists())
+
+
+class WriteQueueBatchTest(TransactionTestCase):
+    def test_queued_writes_share_transaction(self) -> None:
+        """Проверяет, что накопившиеся записи уходят одной пачкой."""
+        queue = WriteQueue()
+        self.addCleanup(queue.stop)
+        jobs = []
+        # Пока блокировка занята, поток очереди не может начать
+        # транзакцию, и записи копятся.
+        with queue.lock:
+            for slug in ('one', 'two', 'three'):
+                job = Job(mock.Mock(return_value=slug), (), {})
+                jobs.append(job)
+                queue.enqueue(job)
+        results = [job.future.result(timeout=5) for job in jobs]
+        self.assertEqual(results, ['one', 'two', 'three'])
+        metrics = queue.metrics()
+        self.assertEqual(metrics['jobs'], 3)
+        self.assertEqual(metrics['batches'], 1)
+        self.assertEqual(metrics['depth'], 0)
+
+    def test_commit_error_does_not_stop_worker(self) -> None:
+        """Проверяет, что ошибка фиксации не останавливает очередь."""
+        queue = WriteQueue()
+        self.addCleanup(queue.stop)
+        commit = queue.commit
+        calls = []
+
+        def failing_commit(batch):
+            calls.append(batch)
+            if len(calls) == 1:
+                raise IntegrityError('FOREIGN KEY constraint failed')
+            return commit(batch)
+
+        with mock.patch.object(queue, 'commit', side_effect=failing_commit):
+            failed = Job(mock.Mock(return_value='one'), (), {})
+            queue.enqueue(failed)
+            with self.assertRaises(IntegrityError):
+                failed.future.result(timeout=5)
+            for slug in ('two', 'three'):
+                job = Job(mock.Mock(return_value=slug), (), {})
+                queue.enqueue(job)
+                self.assertEqual(job.future.result(timeout=5), slug)
+        self.assertEqual(queue.metrics()['failures'], 1)
+        self.assertTrue(queue.worker.is_alive())
+
+    def test_callback_error_does_not_fail_committed_batch(self) -> None:
+        """Проверяет, что ошибка on_commit не выдается за ошибку записи."""
+        queue = WriteQueue()
+        self.addCleanup(queue.stop)
+        after = mock.Mock()
+
+        def write():
+            transaction.on_commit(mock.Mock(side_effect=ValueError))
+            transaction.on_commit(after)
+            return Group.objects.create(
+                title='cats', slug='cats', description=''
+            )
+
+        job = Job(write, (), {})
+        with self.assertLogs('core.writes', 'ERROR'):
+            queue.enqueue(job)
+            group = job.future.result(timeout=5)
+        self.assertTrue(Group.objects.filter(pk=group.pk).exists())
+        after.assert_called_once_with()
+        self.assertEqual(queue.metrics()['failures'], 0)
+
+    @override_settings(WRITE_QUEUE_TIMEOUT=0.1)
+    def test_timeout_cancels_waiting_write(self) -> None:
+        """Проверяет таймаут ожидания и отмену записи из очереди."""
+        queue = WriteQueue()
+        self.addCleanup(queue.stop)
+        write = mock.Mock(return_value='one')
+        with queue.lock:
+            with self.assertRaises(WriteQueueTimeout):
+                queue.submit(write)
+        self.assertEqual(queue.submit(mock.Mock(return_value='two')), 'two')
+        write.assert_not_called()
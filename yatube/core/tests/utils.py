@@ -0,0 +1,54 @@
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import override_settings
+
+FILE_CACHE_BACKEND = 'django.core.cache.backends.filebased.FileBasedCache'
+
+
+@contextmanager
+def capture_on_commit_callbacks(using=DEFAULT_DB_ALIAS, execute=False):
+    """Собирает обработчики on_commit, добавленные внутри блока.
+
+    TestCase не фиксирует транзакцию теста, и обработчики сами не
+    вызываются. Аналог TestCase.captureOnCommitCallbacks из Django 3.2;
+    с execute=True обработчики выполняются при выходе из блока.
+    """
+    connection = connections[using]
+    start = len(connection.run_on_commit)
+    callbacks = []
+    try:
+        yield callbacks
+    finally:
+        callbacks.extend(
+            func for _, func in connection.run_on_commit[start:]
+        )
+        if execute:
+            for callback in callbacks:
+                callback()
+
+
+@contextmanager
+def temporary_file_caches():
+    """Переносит каталоги файловых кешей из CACHES во временный каталог.
+
+    Иначе тесты оставляют в каталоге проекта файлы кеша сессий.
+    """
+    directory = tempfile.mkdtemp()
+    caches = {
+        alias: (
+            {**options, 'LOCATION': os.path.join(directory, alias)}
+            if options['BACKEND'] == FILE_CACHE_BACKEND
+            else options
+        )
+        for alias, options in settings.CACHES.items()
+    }
+    try:
+        with override_settings(CACHES=caches):
+            yield directory
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
@@ -0,0 +1,270 @@
+"""Очередь записей в базу для view, которые создают и меняют посты.
+
+SQLite допускает одного писателя, и при всплеске запросов конкурирующие
+транзакции получают «database is locked». WriteQueue пропускает записи
+процесса через один поток: пока он фиксирует транзакцию, новые записи
+копятся в очереди и следующей транзакцией уходят пачкой, каждая в своей
+точке сохранения. Если база занята другим процессом, пачка повторяется
+с экспоненциальной задержкой со случайным разбросом, а после
+settings.WRITE_QUEUE_RETRIES попыток вызывающий получает
+OperationalError. Любая другая ошибка фиксации достается записям своей
+пачки, а поток продолжает работу. Если очередь не ответила за
+settings.WRITE_QUEUE_TIMEOUT секунд, вызывающий получает
+WriteQueueTimeout (тоже OperationalError).
+
+При повторе пачки каждая запись выполняется заново, поэтому функция
+записи должна сама возвращать свои объекты к исходному состоянию
+(см. posts.views.SavePost). Обработчики on_commit пачки выполняются
+уже после фиксации: их ошибки только пишутся в лог, а записи пачки
+считаются выполненными.
+
+Если вызывающий уже внутри транзакции (например, в тестах), запись
+выполняется сразу в его потоке: другой поток не увидел бы его данных.
+"""
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from functools import partial
+
+from django.conf import settings
+from django.db import (
+    DEFAULT_DB_ALIAS,
+    OperationalError,
+    connections,
+    transaction,
+)
+
+logger = logging.getLogger('core.writes')
+
+STOP = object()
+
+
+class WriteQueueTimeout(OperationalError):
+    """Запись не выполнена за settings.WRITE_QUEUE_TIMEOUT секунд."""
+
+
+def is_locked(error):
+    message = str(error).lower()
+    return 'locked' in message or 'busy' in message
+
+
+def backoff_delay(attempt):
+    """Задержка перед попыткой attempt: full jitter от 0 до предела."""
+    base = getattr(settings, 'WRITE_QUEUE_BACKOFF', 0.05)
+    cap = getattr(settings, 'WRITE_QUEUE_MAX_BACKOFF', 1.0)
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def run_callback(func):
+    """Выполняет обработчик on_commit пачки, не выпуская его ошибку.
+
+    Данные уже зафиксированы: ошибка не должна ни достаться записям
+    как ошибка сохранения, ни отменить следующие обработчики.
+    """
+    try:
+        func()
+    except Exception:
+        logger.exception('Ошибка обработчика on_commit очереди записей')
+
+
+class Job:
+    __slots__ = ('func', 'args', 'kwargs', 'future')
+
+    def __init__(self, func, args, kwargs):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.future = Future()
+
+    def __call__(self):
+        return self.func(*self.args, **self.kwargs)
+
+
+class WriteQueue:
+    def __init__(self, using=DEFAULT_DB_ALIAS):
+        self.using = using
+        self.lock = threading.Lock()
+        self.start_lock = threading.Lock()
+        self.stats_lock = threading.Lock()
+        self.stats = {
+            'jobs': 0,
+            'batches': 0,
+            'retries': 0,
+            'failures': 0,
+            'max_depth': 0,
+        }
+        self._reset()
+
+    def _reset(self):
+        self.pid = os.getpid()
+        self.jobs = queue.Queue()
+        self.worker = None
+
+    def metrics(self):
+        with self.stats_lock:
+            return {'depth': self.jobs.qsize(), **self.stats}
+
+    def count(self, name, value=1):
+        with self.stats_lock:
+            self.stats[name] += value
+
+    def submit(self, func, *args, **kwargs):
+        """Выполняет func(*args, **kwargs) в очереди и ждет результата."""
+        job = Job(func, args, kwargs)
+        if connections[self.using].in_atomic_block:
+            self.execute([job])
+        else:
+            self.enqueue(job)
+        timeout = getattr(settings, 'WRITE_QUEUE_TIMEOUT', 30)
+        try:
+            return job.future.result(timeout=timeout)
+        except FutureTimeoutError:
+            # Запись, которая еще ждет в очереди, отменяется; начатая
+            # может зафиксироваться уже после ответа вызывающему.
+            job.future.cancel()
+            raise WriteQueueTimeout(
+                f'Очередь записей не ответила за {timeout} с'
+            )
+
+    def enqueue(self, job):
+        # После fork (предварительно запущенные воркеры сервера) поток
+        # родителя в дочернем процессе не работает: нужна своя очередь.
+        if self.pid != os.getpid():
+            self._reset()
+        self.jobs.put(job)
+        with self.stats_lock:
+            self.stats['max_depth'] = max(
+                self.stats['max_depth'], self.jobs.qsize()
+            )
+        with self.start_lock:
+            if self.worker is None or not self.worker.is_alive():
+                self.worker = threading.Thread(
+                    target=self.run, name='write-queue', daemon=True
+                )
+                self.worker.start()
+
+    def stop(self):
+        if self.worker is not None:
+            self.jobs.put(STOP)
+            self.worker.join()
+            self.worker = None
+
+    def run(self):
+        try:
+            while True:
+                job = self.jobs.get()
+                if job is STOP:
+                    return
+                batch = [job]
+                with self.lock:
+                    batch_size = getattr(settings, 'WRITE_QUEUE_BATCH_SIZE', 1)
+                    while len(batch) < batch_size:
+                        try:
+                            job = self.jobs.get_nowait()
+                        except queue.Empty:
+                            break
+                        if job is STOP:
+                            self.jobs.put(STOP)
+                            break
+                        batch.append(job)
+                try:
+                    self.execute(batch)
+                except Exception:
+                    # Поток не должен умереть: иначе все следующие
+                    # записи процесса ждали бы ответа до таймаута.
+                    logger.exception('Сбой очереди записей')
+                connections[self.using].close_if_unusable_or_obsolete()
+        finally:
+            connections[self.using].close()
+
+    def execute(self, batch):
+        # Отмененные по таймауту записи не выполняются.
+        batch = [
+            job for job in batch if job.future.set_running_or_notify_cancel()
+        ]
+        if not batch:
+            return
+        retries = getattr(settings, 'WRITE_QUEUE_RETRIES', 5)
+        attempt = 0
+        while True:
+            try:
+                with self.lock:
+                    results = self.commit(batch)
+            except OperationalError as error:
+                if not is_locked(error) or attempt >= retries:
+                    self.fail(batch, attempt, error)
+                    return
+                attempt += 1
+                self.count('retries')
+                self.log('retry', batch, attempt, error)
+                time.sleep(backoff_delay(attempt))
+                continue
+            except Exception as error:
+                # Ошибка фиксации (отложенная проверка внешнего ключа)
+                # относится ко всей пачке.
+                self.fail(batch, attempt, error)
+                return
+            self.count('jobs', len(batch))
+            self.count('batches')
+            for job, (ok, value) in zip(batch, results):
+                if ok:
+                    job.future.set_result(value)
+                else:
+                    job.future.set_exception(value)
+            return
+
+    def fail(self, batch, attempt, error):
+        self.count('failures', len(batch))
+        self.log('failure', batch, attempt, error)
+        for job in batch:
+            job.future.set_exception(error)
+
+    def commit(self, batch):
+        """Выполняет пачку одной транзакцией, каждую запись — в savepoint.
+
+        Ошибка одной записи откатывает только ее; блокировка базы
+        откатывает всю пачку, чтобы повторить ее целиком.
+        """
+        results = []
+        connection = connections[self.using]
+        with transaction.atomic(using=self.using):
+            start = len(connection.run_on_commit)
+            for job in batch:
+                try:
+                    with transaction.atomic(using=self.using):
+                        results.append((True, job()))
+                except OperationalError as error:
+                    if is_locked(error):
+                        raise
+                    results.append((False, error))
+                except Exception as error:
+                    results.append((False, error))
+            connection.run_on_commit[start:] = [
+                (sids, partial(run_callback, func))
+                for sids, func in connection.run_on_commit[start:]
+            ]
+        return results
+
+    def log(self, event, batch, attempt, error):
+        level = logging.ERROR if event == 'failure' else logging.WARNING
+        logger.log(
+            level,
+            json.dumps(
+                {
+                    'event': event,
+                    'batch': len(batch),
+                    'attempt': attempt,
+                    'error': str(error),
+                    **self.metrics(),
+                }
+            ),
+        )
+
+
+write_queue = WriteQueue()
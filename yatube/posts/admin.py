@@ -1,6 +1,208 @@
+import datetime
+
+from django.conf import settings
 from django.contrib import admin
+from django.contrib.admin import helpers
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.db import models
+from django.forms import BaseModelFormSet, HiddenInput
+from django.forms.utils import flatatt
+from django.utils import timezone
+from django.utils.functional import cached_property
+from django.utils.html import format_html
+from django.utils.safestring import mark_safe
+
+from .cache import GLOBAL_SCOPE
+from .models import Group, Post, PostQuerySet
+from .search import is_available, matching_ids
+from .utils import CachedCountPaginator
+
+
+def next_period(date, kind):
+    if kind == 'year':
+        return datetime.date(date.year + 1, 1, 1)
+    if kind == 'month':
+        if date.month == 12:
+            return datetime.date(date.year + 1, 1, 1)
+        return datetime.date(date.year, date.month + 1, 1)
+    return date + datetime.timedelta(days=1)
+
+
+def truncate_date(date, kind):
+    if kind == 'year':
+        return date.replace(month=1, day=1)
+    if kind == 'month':
+        return date.replace(day=1)
+    return date
+
+
+class ChangeListQuerySet(PostQuerySet):
+    """Посты для списка в админке с быстрыми запросами date_hierarchy.
+
+    Переопределения нужны только шаблону date_hierarchy, поэтому
+    подключаются в PostAdmin.get_queryset, а не в менеджере модели.
+    """
+
+    def aggregate(self, *args, **kwargs):
+        """Считает несколько MIN/MAX отдельными запросами.
+
+        SQLite находит MIN или MAX по индексу за один переход, но
+        запрос с MIN и MAX сразу (его делает date_hierarchy админки)
+        читает всю таблицу.
+        """
+        extremes = (models.Min, models.Max)
+        if args or len(kwargs) < 2 or not all(
+            type(value) in extremes and value.filter is None
+            for value in kwargs.values()
+        ):
+            return super().aggregate(*args, **kwargs)
+        result = {}
+        for name, value in kwargs.items():
+            result.update(super().aggregate(**{name: value}))
+        return result
+
+    def dates(self, field_name, kind, order='ASC'):
+        """Список периодов без DISTINCT по всей таблице.
+
+        Django считает date_trunc для каждой строки, что на больших
+        лентах (например, в date_hierarchy админки) занимает секунды.
+        Здесь каждый следующий период находится одним MIN по индексу,
+        поэтому число запросов равно числу периодов.
+        """
+        field = self.model._meta.get_field(field_name)
+        if not isinstance(field, models.DateTimeField) or kind not in (
+            'year', 'month', 'day'
+        ):
+            return super().dates(field_name, kind, order)
+        queryset = self.order_by()
+        periods = []
+        current = queryset.aggregate(first=models.Min(field_name))['first']
+        while current is not None:
+            if settings.USE_TZ:
+                current = timezone.localtime(current)
+            period = truncate_date(current.date(), kind)
+            periods.append(period)
+            start = datetime.datetime.combine(
+                next_period(period, kind), datetime.time.min
+            )
+            if settings.USE_TZ:
+                start = timezone.make_aware(start)
+            # Новая граница должна идти в WHERE первой: из нескольких
+            # нижних границ SQLite ищет по индексу только по первой.
+            following = self.model._default_manager.filter(
+                **{f'{field_name}__gte': start}
+            ) & queryset
+            current = following.aggregate(
+                first=models.Min(field_name)
+            )['first']
+        if order == 'DESC':
+            periods.reverse()
+        return periods
+
+
+class PostAdminPaginator(CachedCountPaginator):
+    """Пагинатор списка постов в админке.
+
+    Без фильтров число постов берется из кеша пагинатора ленты. С
+    фильтрами посты считаются не дальше count_limit: точное число
+    в большой выборке стоит полного прохода по индексу, а листать
+    дальше нескольких сотен страниц в админке незачем.
+    """
+
+    count_limit = 10000
+
+    @cached_property
+    def count(self):
+        if self.scope is not None:
+            return super().count
+        # Порядок на число не влияет, а сортировка выборки перед LIMIT
+        # стоит дороже самого подсчета.
+        return self.object_list.order_by()[:self.count_limit].count()
+
+
+class PageAutocompleteSelect(AutocompleteSelect):
+    """Автодополнение, которое берет выбранные объекты из selected.
+
+    Обычный AutocompleteSelect ищет выбранное значение отдельным
+    запросом при отрисовке, то есть в списке постов — запрос на строку.
+    PostChangeListFormSet загружает выбранные группы всех строк одним
+    запросом и передает их сюда вместе с общими для всех строк
+    атрибутами select; без selected виджет работает как обычно (форма
+    изменения поста).
+    """
 
-from .models import Group, Post
+    selected = None
+    flat_attrs = ''
+
+    def render(self, name, value, attrs=None, renderer=None):
+        # Шаблоны select и option, как и атрибуты автодополнения,
+        # отрисовывались бы для каждой строки списка и занимали
+        # заметную часть времени страницы.
+        if self.selected is None:
+            return super().render(name, value, attrs, renderer)
+        options = []
+        if not self.is_required:
+            options.append(mark_safe('<option value=""></option>'))
+        obj = self.selected.get(str(value)) if value else None
+        if obj is not None:
+            options.append(
+                format_html(
+                    '<option value="{}" selected>{}</option>',
+                    obj.pk,
+                    self.choices.field.label_from_instance(obj),
+                )
+            )
+        return format_html(
+            '<select name="{}"{}{}>{}</select>',
+            name,
+            flatatt(attrs or {}),
+            self.flat_attrs,
+            mark_safe(''.join(options)),
+        )
+
+
+class RowPkInput(HiddenInput):
+    """Скрытый pk строки списка, отрисованный без шаблона виджета."""
+
+    def render(self, name, value, attrs=None, renderer=None):
+        return format_html(
+            '<input type="hidden" name="{}" value="{}"{}>',
+            name,
+            self.format_value(value) or '',
+            flatatt(self.build_attrs(self.attrs, attrs)),
+        )
+
+
+class PostChangeListFormSet(BaseModelFormSet):
+    """Формы list_editable, которые получают группы строк одним запросом."""
+
+    def selected_group_ids(self):
+        ids = {post.group_id for post in self.get_queryset()}
+        if self.is_bound:
+            # Форма с ошибками показывает группы, выбранные в запросе.
+            ids.update(
+                self.data.get(self.add_prefix(index) + '-group')
+                for index in range(self.total_form_count())
+            )
+        return {pk for pk in ids if pk}
+
+    @cached_property
+    def selected_groups(self):
+        groups = Group.objects.filter(pk__in=self.selected_group_ids())
+        return {str(group.pk): group for group in groups}
+
+    @cached_property
+    def group_attrs(self):
+        widget = self.form.base_fields['group'].widget
+        return flatatt(widget.build_attrs(widget.attrs))
+
+    def _construct_form(self, i, **kwargs):
+        form = super()._construct_form(i, **kwargs)
+        field = form.fields['group']
+        if isinstance(field.widget, PageAutocompleteSelect):
+            field.widget.selected = self.selected_groups
+            field.widget.flat_attrs = self.group_attrs
+        return form
 
 
 class PostAdmin(admin.ModelAdmin):
@@ -11,11 +213,96 @@ class PostAdmin(admin.ModelAdmin):
         'author',
         'group',
     )
+    list_select_related = ('author', 'group')
     list_editable = ('group',)
+    # Группу и автора выбираем через автодополнение: выпадающий список
+    # всех групп в каждой строке списка (list_editable) грузил бы их
+    # заново для каждой. Выбранные группы строк загружает один запрос
+    # (PostChangeListFormSet).
+    autocomplete_fields = ('author', 'group')
     search_fields = ('text',)
     list_filter = ('pub_date',)
+    date_hierarchy = 'pub_date'
+    show_full_result_count = False
+    # Основное время страницы уходит на отрисовку строк с чекбоксами.
+    list_per_page = 50
+    paginator = PostAdminPaginator
     empty_value_display = '-пусто-'
 
+    def action_checkbox(self, obj):
+        # То же, что helpers.checkbox, но без шаблона на каждую строку.
+        return format_html(
+            '<input type="checkbox" name="{}" value="{}" '
+            'class="action-select">',
+            helpers.ACTION_CHECKBOX_NAME,
+            obj.pk,
+        )
+
+    action_checkbox.short_description = (
+        admin.ModelAdmin.action_checkbox.short_description
+    )
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.name == 'group' and 'widget' not in kwargs:
+            kwargs['widget'] = PageAutocompleteSelect(
+                db_field.remote_field,
+                self.admin_site,
+                using=kwargs.get('using'),
+            )
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+    def get_changelist_formset(self, request, **kwargs):
+        kwargs.setdefault('formset', PostChangeListFormSet)
+        kwargs.setdefault('widgets', {self.model._meta.pk.name: RowPkInput})
+        formset = super().get_changelist_formset(request, **kwargs)
+        field = formset.form.base_fields['group']
+        # Ссылки «добавить», «изменить» и «удалить» у группы каждой строки
+        # стоят разворота адресов и проверки прав на строку, а в списке
+        # не нужны: оставляем только сам виджет.
+        field.widget = getattr(field.widget, 'widget', field.widget)
+        # Пустой limit_choices_to все равно фильтрует queryset поля
+        # в каждой строке.
+        if not field.limit_choices_to:
+            field.limit_choices_to = None
+        return formset
+
+    def get_queryset(self, request):
+        # Готовый HTML текста нужен только страницам сайта.
+        queryset = ChangeListQuerySet(self.model).defer(
+            'text_html', 'excerpt_html'
+        )
+        ordering = self.get_ordering(request)
+        if ordering:
+            queryset = queryset.order_by(*ordering)
+        return queryset
+
+    def get_paginator(
+        self, request, queryset, per_page, orphans=0,
+        allow_empty_first_page=True,
+    ):
+        scope = None if queryset.query.has_filters() else GLOBAL_SCOPE
+        return self.paginator(
+            queryset,
+            per_page,
+            scope=scope,
+            orphans=orphans,
+            allow_empty_first_page=allow_empty_first_page,
+        )
+
+    def get_search_results(self, request, queryset, search_term):
+        # Вместо LIKE '%term%' по всей таблице ищем по индексу FTS5.
+        if not search_term.split() or not is_available():
+            return super().get_search_results(
+                request, queryset, search_term
+            )
+        return queryset.filter(pk__in=matching_ids(search_term)), False
+
+
+class GroupAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'title', 'slug', 'post_count')
+    search_fields = ('title', 'slug')
+    prepopulated_fields = {'slug': ('title',)}
+
 
 admin.site.register(Post, PostAdmin)
-admin.site.register(Group)
+admin.site.register(Group, GroupAdmin)
@@ -0,0 +1,169 @@
+"""Кеш отрисованных страниц ленты с версионированием по областям.
+
+Ключ страницы включает номер поколения каждой области, от которой
+зависит лента: общей ('global'), группы ('group:<slug>') и автора
+('author:<username>'). Сохранение или удаление поста увеличивает
+поколения только тех областей, в которых он показывается, и старые
+страницы перестают находиться по ключу, а затем вытесняются по TTL.
+
+Поколения живут в кеше, а у каждого процесса с LocMemCache он свой:
+пул миниатюр (posts/thumbnails.py) или другой процесс сервера меняют
+только собственные поколения. Поэтому в ключ входит и время изменения
+области из FeedVersion — то же, по которому строится ETag ленты
+(posts/conditional.py). Оно хранится в базе и меняется в одной
+транзакции с постами, так что страницу сбрасывает запись из любого
+процесса, а ETag и закешированная страница не расходятся.
+
+Здесь же хранятся закешированные числа постов в областях для
+пагинатора: при создании и удалении поста они корректируются на месте.
+"""
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+
+from core.replicas import primary_reads
+
+from .conditional import scope_modified
+
+GLOBAL_SCOPE = 'global'
+
+
+def get_cache():
+    return caches[getattr(settings, 'FEED_CACHE_ALIAS', 'default')]
+
+
+def get_timeout():
+    return getattr(settings, 'FEED_CACHE_TIMEOUT', 0)
+
+
+def global_scope():
+    return GLOBAL_SCOPE
+
+
+def group_scope(slug):
+    return f'group:{slug}'
+
+
+def author_scope(username):
+    return f'author:{username}'
+
+
+def generation_key(scope):
+    return 'feed:generation:' + hashlib.md5(scope.encode()).hexdigest()
+
+
+def new_generation():
+    # Поколение начинается с текущего времени, а не с единицы: если
+    # счетчик вытеснят из кеша, новое значение не совпадет со старыми.
+    return int(time.time() * 1000)
+
+
+def get_generations(scopes):
+    cache = get_cache()
+    keys = {scope: generation_key(scope) for scope in scopes}
+    found = cache.get_many(keys.values())
+    generations = {}
+    for scope, key in keys.items():
+        if key not in found:
+            found[key] = new_generation()
+            cache.add(key, found[key], None)
+        generations[scope] = found[key]
+    return [generations[scope] for scope in scopes]
+
+
+def bump_scopes(scopes):
+    """Инвалидирует все страницы, зависящие от перечисленных областей."""
+    cache = get_cache()
+    for scope in set(scopes):
+        key = generation_key(scope)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, new_generation(), None)
+
+
+def count_key(scope):
+    return 'feed:count:' + hashlib.md5(scope.encode()).hexdigest()
+
+
+def get_count(scope):
+    return get_cache().get(count_key(scope))
+
+
+def set_count(scope, count):
+    timeout = getattr(settings, 'PAGINATOR_COUNT_TIMEOUT', 0)
+    if timeout:
+        get_cache().set(count_key(scope), count, timeout)
+
+
+def adjust_counts(scopes, delta):
+    """Поправляет закешированные числа постов областей на delta."""
+    cache = get_cache()
+    for scope in scopes:
+        key = count_key(scope)
+        try:
+            if delta > 0:
+                cache.incr(key, delta)
+            else:
+                cache.decr(key, -delta)
+        except ValueError:
+            # Числа нет в кеше: оно будет посчитано при следующем чтении.
+            pass
+
+
+def reset_counts(scopes):
+    """Забывает закешированные числа постов областей."""
+    get_cache().delete_many([count_key(scope) for scope in set(scopes)])
+
+
+def page_key(view_name, kwargs, request, scopes):
+    parts = [
+        view_name,
+        repr(sorted(kwargs.items())),
+        request.GET.get('page', ''),
+        request.GET.get('cursor', ''),
+        repr(get_generations(scopes)),
+        repr([scope_modified(request, scope) for scope in scopes]),
+    ]
+    digest = hashlib.md5('|'.join(parts).encode()).hexdigest()
+    return f'feed:page:{view_name}:{digest}'
+
+
+def cache_feed(*scope_factories):
+    """Кеширует страницу ленты для анонимных GET-запросов.
+
+    Каждый аргумент — функция, которая по аргументам view возвращает
+    имя области, от которой зависит страница.
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            timeout = get_timeout()
+            if (
+                not timeout
+                or request.method != 'GET'
+                or request.user.is_authenticated
+            ):
+                return view(request, *args, **kwargs)
+            scopes = [factory(**kwargs) for factory in scope_factories]
+            key = page_key(view.__name__, kwargs, request, scopes)
+            cache = get_cache()
+            content = cache.get(key)
+            if content is not None:
+                return HttpResponse(content)
+            # Промах кеша читает из основной базы: реплика могла еще не
+            # получить запись, которая сменила поколение области.
+            with primary_reads():
+                response = view(request, *args, **kwargs)
+            if response.status_code == 200:
+                cache.set(key, response.content, timeout)
+            return response
+
+        return wrapper
+
+    return decorator
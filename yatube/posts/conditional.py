@@ -0,0 +1,64 @@
+"""Валидаторы условных GET (ETag и Last-Modified) для страниц постов.
+
+Каждый валидатор — один запрос по первичному ключу: для лент это
+время из FeedVersion, для поста — его поле updated и счетчик постов
+автора, который показывается на странице. Если клиент прислал
+совпадающий валидатор, view не вызывается и шаблон не отрисовывается.
+"""
+from django.views.decorators.http import condition
+
+from .models import FeedVersion, Post
+
+
+def user_tag(request):
+    # Страница авторизованного пользователя отличается шапкой.
+    return str(request.user.pk or 0)
+
+
+def scope_modified(request, scope):
+    cache = request.__dict__.setdefault('_scope_modified', {})
+    if scope not in cache:
+        cache[scope] = (
+            FeedVersion.objects.filter(scope=scope)
+            .values_list('modified', flat=True)
+            .first()
+        )
+    return cache[scope]
+
+
+def feed_condition(scope_factory):
+    """Условный GET для ленты области scope_factory(**kwargs)."""
+
+    def last_modified(request, *args, **kwargs):
+        return scope_modified(request, scope_factory(**kwargs))
+
+    def etag(request, *args, **kwargs):
+        modified = last_modified(request, *args, **kwargs)
+        if modified is None:
+            return None
+        return f'{modified.timestamp()}-{user_tag(request)}'
+
+    return condition(etag_func=etag, last_modified_func=last_modified)
+
+
+def post_state(request, post_id):
+    if '_post_state' not in request.__dict__:
+        request._post_state = (
+            Post.objects.filter(pk=post_id)
+            .values_list('updated', 'author__post_counter__post_count')
+            .first()
+        )
+    return request._post_state
+
+
+def post_etag(request, post_id):
+    state = post_state(request, post_id)
+    if state is None:
+        return None
+    updated, post_count = state
+    return f'{updated.timestamp()}-{post_count}-{user_tag(request)}'
+
+
+# Last-Modified у поста не отдается: страница меняется и от новых постов
+# автора (счетчик в шапке), а это видно только по ETag.
+post_condition = condition(etag_func=post_etag)
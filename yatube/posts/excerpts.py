@@ -0,0 +1,54 @@
+"""Выдержка и готовый HTML текста поста.
+
+Ленты показывают только выдержку, а страница поста — текст целиком.
+Оба варианта отрисовываются один раз при сохранении поста и хранятся
+в его строке, поэтому ленты не читают из базы полный текст, а шаблоны
+не обрезают и не экранируют его на каждом запросе.
+"""
+from django.db import transaction
+from django.template.defaultfilters import linebreaksbr
+from django.utils.text import Truncator
+
+EXCERPT_LENGTH = 300
+RENDERED_FIELDS = ('excerpt', 'excerpt_html', 'text_html')
+
+
+def render_html(text):
+    return str(linebreaksbr(text, autoescape=True))
+
+
+def render_text(text):
+    """Возвращает значения RENDERED_FIELDS для текста поста."""
+    excerpt = Truncator(text).chars(EXCERPT_LENGTH)
+    return {
+        'excerpt': excerpt,
+        'excerpt_html': render_html(excerpt),
+        'text_html': render_html(text),
+    }
+
+
+def backfill(queryset, batch_size):
+    """Заполняет RENDERED_FIELDS постов queryset пачками по id.
+
+    Каждая пачка читает только id и текст и записывается одной
+    транзакцией. После каждой пачки отдает число обработанных постов.
+    """
+    manager = queryset.model._base_manager.db_manager(queryset.db)
+    processed = 0
+    last_pk = 0
+    while True:
+        posts = list(
+            queryset.filter(pk__gt=last_pk)
+            .order_by('pk')
+            .only('pk', 'text')[:batch_size]
+        )
+        if not posts:
+            return
+        for post in posts:
+            for name, value in render_text(post.text).items():
+                setattr(post, name, value)
+        with transaction.atomic(using=queryset.db):
+            manager.bulk_update(posts, RENDERED_FIELDS)
+        processed += len(posts)
+        last_pk = posts[-1].pk
+        yield processed
@@ -0,0 +1,99 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+
+from core.benchmark import benchmark_database, measure, seed_posts
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет временную базу постами и сравнивает задержку '
+        'view приложения posts без индексов ленты и с ними.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=100000)
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            self.stdout.write(f'Заполнение базы: {options["posts"]} постов')
+            seed_posts(options['posts'])
+            urls = self.get_urls()
+            self.remove_indexes()
+            before = self.run(urls, options['repeat'])
+            self.add_indexes()
+            after = self.run(urls, options['repeat'])
+            self.report(before, after)
+            self.explain()
+
+    def get_urls(self):
+        author = User.objects.order_by('pk').first()
+        group = Group.objects.order_by('pk').first()
+        post = Post.objects.order_by('pk').first()
+        return {
+            'index': reverse('posts:index'),
+            'index_deep': reverse('posts:index') + '?page=1000',
+            'group_list': reverse(
+                'posts:group_list', kwargs={'slug': group.slug}
+            ),
+            'profile': reverse(
+                'posts:profile', kwargs={'username': author.username}
+            ),
+            'post_detail': reverse(
+                'posts:post_detail', kwargs={'post_id': post.pk}
+            ),
+            'post_create': reverse('posts:post_create'),
+            'post_edit': reverse(
+                'posts:post_edit', kwargs={'post_id': post.pk}
+            ),
+        }
+
+    def run(self, urls, repeat):
+        client = Client()
+        client.force_login(Post.objects.order_by('pk').first().author)
+        return {
+            name: measure(client, url, repeat) for name, url in urls.items()
+        }
+
+    def remove_indexes(self):
+        with connection.schema_editor() as editor:
+            for index in Post._meta.indexes:
+                editor.remove_index(Post, index)
+
+    def add_indexes(self):
+        with connection.schema_editor() as editor:
+            for index in Post._meta.indexes:
+                editor.add_index(Post, index)
+
+    def report(self, before, after):
+        self.stdout.write(
+            f'{"view":<14}{"без индексов, мс":>18}{"с индексами, мс":>18}'
+        )
+        for name in before:
+            self.stdout.write(
+                f'{name:<14}{before[name]["p50"]:>18.2f}'
+                f'{after[name]["p50"]:>18.2f}'
+            )
+
+    def explain(self):
+        if connection.vendor != 'sqlite':
+            return
+        author = User.objects.order_by('pk').first()
+        group = Group.objects.order_by('pk').first()
+        querysets = {
+            'index': Post.objects.all(),
+            'group_list': Post.objects.filter(group=group),
+            'profile': Post.objects.filter(author=author),
+        }
+        for name, queryset in querysets.items():
+            sql, params = queryset[:10].query.sql_with_params()
+            with connection.cursor() as cursor:
+                cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+                plan = '; '.join(str(row[-1]) for row in cursor.fetchall())
+            self.stdout.write(f'{name}: {plan}')
@@ -0,0 +1,208 @@
+import csv
+import json
+import multiprocessing
+import os
+import time
+from datetime import datetime, time as day_time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import Max, Min
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from posts.models import Post
+
+FORMATS = ('jsonl', 'csv')
+# Поля в том же виде, в каком их принимает import_posts.
+FIELDS = ('id', 'text', 'author', 'group', 'pub_date')
+COLUMNS = ('pk', 'text', 'author__username', 'group__slug', 'pub_date')
+
+
+def parse_moment(value, end_of_day=False):
+    """Разбирает дату или дату со временем из аргумента командной строки."""
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise CommandError(f'Неверная дата: {value}')
+        moment = datetime.combine(
+            day, day_time.max if end_of_day else day_time.min
+        )
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def export_queryset(filters):
+    return Post.objects.filter(**filters).order_by('pk')
+
+
+def iterate_rows(filters, start_pk, stop_pk, batch_size):
+    """Отдает строки диапазона id пачками по первичному ключу.
+
+    Каждая пачка — отдельный запрос с pk > последнего выгруженного и
+    LIMIT batch_size, поэтому в памяти одновременно только одна пачка
+    и нет ни OFFSET, ни долгого курсора на стороне базы.
+    """
+    last_pk = start_pk - 1
+    while True:
+        rows = list(
+            export_queryset(filters)
+            .filter(pk__gt=last_pk, pk__lte=stop_pk)
+            .values_list(*COLUMNS)[:batch_size]
+        )
+        if not rows:
+            return
+        yield from rows
+        last_pk = rows[-1][0]
+
+
+def serialize(row):
+    pk, text, author, group, pub_date = row
+    return {
+        'id': pk,
+        'text': text,
+        'author': author,
+        'group': group or '',
+        'pub_date': pub_date.isoformat(),
+    }
+
+
+def export_shard(path, file_format, filters, start_pk, stop_pk, batch_size):
+    """Записывает посты с id из [start_pk, stop_pk] в файл path."""
+    exported = 0
+    with open(path, 'w', newline='', encoding='utf-8') as stream:
+        if file_format == 'csv':
+            writer = csv.DictWriter(stream, FIELDS)
+            writer.writeheader()
+            write = writer.writerow
+        else:
+            def write(record):
+                stream.write(json.dumps(record, ensure_ascii=False) + '\n')
+        for row in iterate_rows(filters, start_pk, stop_pk, batch_size):
+            write(serialize(row))
+            exported += 1
+    return exported
+
+
+def run_shard(arguments):
+    # Дочерний процесс не должен пользоваться соединением родителя.
+    connections.close_all()
+    return export_shard(*arguments)
+
+
+def split_range(first, last, parts):
+    """Делит [first, last] на parts примерно равных диапазонов id."""
+    size = -(-(last - first + 1) // parts)
+    return [
+        (start, min(start + size - 1, last))
+        for start in range(first, last + 1, size)
+    ]
+
+
+def shard_path(output, number, shards):
+    if shards == 1:
+        return output
+    root, extension = os.path.splitext(output)
+    return f'{root}-{number:03d}{extension}'
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает посты с автором и группой в JSON Lines или CSV. '
+        'Память не растет с числом постов; --shards делит выгрузку '
+        'на файлы по диапазонам id, которые пишутся параллельно.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('output')
+        parser.add_argument(
+            '--format',
+            choices=FORMATS,
+            help='Формат файла; по умолчанию определяется по расширению.',
+        )
+        parser.add_argument('--author', help='username автора.')
+        parser.add_argument('--group', help='slug группы.')
+        parser.add_argument('--since', help='Не раньше даты.')
+        parser.add_argument('--until', help='Не позже даты.')
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--shards', type=int, default=1)
+        parser.add_argument(
+            '--jobs',
+            type=int,
+            help='Число процессов; по умолчанию по процессу на файл.',
+        )
+
+    def handle(self, *args, **options):
+        output = options['output']
+        file_format = options['format'] or self.guess_format(output)
+        if options['batch_size'] < 1 or options['shards'] < 1:
+            raise CommandError(
+                '--batch-size и --shards должны быть больше нуля.'
+            )
+        filters = self.get_filters(options)
+        started = time.monotonic()
+        bounds = export_queryset(filters).aggregate(
+            first=Min('pk'), last=Max('pk')
+        )
+        if bounds['first'] is None:
+            ranges = [(1, 0)]
+        else:
+            ranges = split_range(
+                bounds['first'], bounds['last'], options['shards']
+            )
+        tasks = [
+            (
+                shard_path(output, number, len(ranges)),
+                file_format,
+                filters,
+                start_pk,
+                stop_pk,
+                options['batch_size'],
+            )
+            for number, (start_pk, stop_pk) in enumerate(ranges, start=1)
+        ]
+        jobs = min(options['jobs'] or len(tasks), len(tasks))
+        if jobs > 1:
+            # Закрываем соединения до fork: каждый процесс откроет свое.
+            connections.close_all()
+            context = multiprocessing.get_context('fork')
+            with context.Pool(jobs) as pool:
+                counts = pool.map(run_shard, tasks)
+        else:
+            counts = [export_shard(*task) for task in tasks]
+        for task, count in zip(tasks, counts):
+            self.stdout.write(f'{task[0]}: {count} постов')
+        exported = sum(counts)
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            f'Готово: выгружено {exported} постов за {elapsed:.1f} с '
+            f'({exported / max(elapsed, 0.001):.0f} постов/с)'
+        )
+
+    @staticmethod
+    def guess_format(path):
+        extension = os.path.splitext(path)[1].lower().lstrip('.')
+        if extension in ('jsonl', 'ndjson', 'json'):
+            return 'jsonl'
+        if extension == 'csv':
+            return 'csv'
+        raise CommandError(
+            'Не удалось определить формат файла, укажите --format.'
+        )
+
+    @staticmethod
+    def get_filters(options):
+        filters = {}
+        if options['author']:
+            filters['author__username'] = options['author']
+        if options['group']:
+            filters['group__slug'] = options['group']
+        if options['since']:
+            filters['pub_date__gte'] = parse_moment(options['since'])
+        if options['until']:
+            filters['pub_date__lte'] = parse_moment(
+                options['until'], end_of_day=True
+            )
+        return filters
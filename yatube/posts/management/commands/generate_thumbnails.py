@@ -0,0 +1,82 @@
+import multiprocessing
+import time
+from functools import partial
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from posts.models import Post
+from posts.thumbnails import generate_thumbnails
+
+
+def iterate_images(batch_size):
+    """Отдает имена картинок постов пачками по первичному ключу."""
+    last_pk = 0
+    while True:
+        rows = list(
+            Post.objects.exclude(image='')
+            .filter(pk__gt=last_pk)
+            .order_by('pk')
+            .values_list('pk', 'image')[:batch_size]
+        )
+        if not rows:
+            return
+        for _, name in rows:
+            yield name
+        last_pk = rows[-1][0]
+
+
+def run_image(name, force):
+    try:
+        generate_thumbnails(name, force=force)
+    except Exception as error:
+        return name, repr(error)
+    return name, None
+
+
+def close_connections():
+    # Дочерний процесс не должен пользоваться соединением родителя.
+    connections.close_all()
+
+
+class Command(BaseCommand):
+    help = (
+        'Создает миниатюры всех размеров для картинок постов в пуле '
+        'процессов. Готовые миниатюры пропускаются; с --force '
+        'пересоздаются, например после смены размеров.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--jobs',
+            type=int,
+            default=multiprocessing.cpu_count(),
+            help='Число процессов; 1 — без пула.',
+        )
+        parser.add_argument('--force', action='store_true')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        names = iterate_images(options['batch_size'])
+        work = partial(run_image, force=options['force'])
+        processed = failed = 0
+        if options['jobs'] > 1:
+            # Закрываем соединения до fork: каждый процесс откроет свое.
+            connections.close_all()
+            context = multiprocessing.get_context('fork')
+            with context.Pool(
+                options['jobs'], initializer=close_connections
+            ) as pool:
+                results = list(pool.imap_unordered(work, names, 16))
+        else:
+            results = map(work, names)
+        for name, error in results:
+            processed += 1
+            if error is not None:
+                failed += 1
+                self.stderr.write(f'{name}: {error}')
+        self.stdout.write(
+            f'Готово: {processed} картинок, ошибок: {failed}, за '
+            f'{time.monotonic() - started:.1f} с'
+        )
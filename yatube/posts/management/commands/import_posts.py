@@ -0,0 +1,303 @@
+import csv
+import json
+import os
+import time
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from posts.cache import author_scope, group_scope, global_scope, reset_counts
+from posts.excerpts import render_text
+from posts.models import Group, ImportProgress, Post
+from posts.search import is_available
+from posts.signals import touch_scopes
+
+User = get_user_model()
+
+FORMATS = ('jsonl', 'csv')
+
+
+class InvalidRecord:
+    """Строка файла, из которой не удалось прочитать запись.
+
+    Читатель отдает ее вместо записи, чтобы нумерация записей не
+    сбилась, а импорт отклонил ее с причиной, как и другие записи.
+    """
+
+    def __init__(self, reason):
+        self.reason = reason
+
+
+def read_jsonl(stream):
+    for number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            yield None
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as error:
+            yield InvalidRecord(f'строка {number}: неверный JSON ({error})')
+            continue
+        if not isinstance(record, dict):
+            yield InvalidRecord(f'строка {number}: запись не объект JSON')
+            continue
+        yield record
+
+
+def is_record(record):
+    return bool(record) and not isinstance(record, InvalidRecord)
+
+
+def read_csv(stream):
+    yield from csv.DictReader(stream)
+
+
+def insert_posts(posts):
+    """Вставляет посты пачками, как bulk_create, но с датами из объектов.
+
+    bulk_create вызывает pre_save полей, и auto_now_add заменил бы
+    pub_date каждого поста временем импорта. Вставка в режиме raw берет
+    значения всех полей из объектов как есть.
+    """
+    fields = [
+        field for field in Post._meta.concrete_fields
+        if not field.primary_key
+    ]
+    using = Post.objects.db
+    batch_size = max(connections[using].ops.bulk_batch_size(fields, posts), 1)
+    for start in range(0, len(posts), batch_size):
+        Post.objects._insert(
+            posts[start:start + batch_size],
+            fields=fields,
+            using=using,
+            raw=True,
+        )
+
+
+class Lookup:
+    """Таблица «имя → id» для авторов или групп.
+
+    Незнакомые имена пачки ищутся в базе одним запросом, найденные
+    запоминаются, поэтому на каждую запись запросов не тратится.
+    """
+
+    def __init__(self, queryset, field, factory=None):
+        self.queryset = queryset
+        self.field = field
+        self.factory = factory
+        self.ids = {}
+
+    def load(self, names):
+        missing = set(names) - self.ids.keys() - {None}
+        if not missing:
+            return
+        self.ids.update(
+            self.queryset.filter(**{f'{self.field}__in': missing})
+            .values_list(self.field, 'pk')
+        )
+        missing -= self.ids.keys()
+        if missing and self.factory is not None:
+            self.queryset.model.objects.bulk_create(
+                [self.factory(name) for name in sorted(missing)],
+                ignore_conflicts=True,
+            )
+            self.ids.update(
+                self.queryset.filter(**{f'{self.field}__in': missing})
+                .values_list(self.field, 'pk')
+            )
+
+    def get(self, name):
+        return self.ids.get(name)
+
+
+def new_author(username):
+    user = User(username=username)
+    user.set_unusable_password()
+    return user
+
+
+def new_group(slug):
+    return Group(title=slug, slug=slug, description='')
+
+
+class Command(BaseCommand):
+    help = (
+        'Импортирует посты из файла JSON Lines или CSV с полями text, '
+        'author (username), group (slug) и pub_date. Прерванный импорт '
+        'продолжается с места остановки при запуске с --resume.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument(
+            '--format',
+            choices=FORMATS,
+            help='Формат файла; по умолчанию определяется по расширению.',
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            help='Продолжить прерванный импорт этого файла.',
+        )
+        parser.add_argument(
+            '--create-authors',
+            action='store_true',
+            help='Создавать незнакомых авторов без пароля.',
+        )
+        parser.add_argument(
+            '--create-groups',
+            action='store_true',
+            help='Создавать незнакомые группы.',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or self.guess_format(path)
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size должен быть больше нуля.')
+        source = os.path.abspath(path)
+        progress = ImportProgress.objects.filter(source=source).first()
+        if progress is not None and not options['resume']:
+            raise CommandError(
+                f'Файл уже импортировался до записи {progress.processed}. '
+                'Запустите команду с --resume, чтобы продолжить.'
+            )
+        skip = progress.processed if progress is not None else 0
+        self.authors = Lookup(
+            User.objects.all(),
+            'username',
+            new_author if options['create_authors'] else None,
+        )
+        self.groups = Lookup(
+            Group.objects.all(),
+            'slug',
+            new_group if options['create_groups'] else None,
+        )
+        self.scopes = {global_scope()}
+        self.imported = 0
+        self.rejected = 0
+        started = time.monotonic()
+        reader = read_csv if file_format == 'csv' else read_jsonl
+        with open(path, newline='', encoding='utf-8') as stream:
+            records = reader(stream)
+            self.remember_scopes(islice(records, skip))
+            processed = skip
+            while True:
+                batch = list(islice(records, options['batch_size']))
+                if not batch:
+                    break
+                processed += len(batch)
+                with transaction.atomic():
+                    self.import_batch(batch, processed - len(batch))
+                    ImportProgress.objects.update_or_create(
+                        source=source, defaults={'processed': processed}
+                    )
+                elapsed = time.monotonic() - started
+                self.stdout.write(
+                    f'Обработано записей: {processed}, '
+                    f'импортировано: {self.imported}, '
+                    f'{self.imported / elapsed:.0f} постов/с'
+                )
+        self.finish(source)
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            f'Готово: импортировано {self.imported} постов, '
+            f'отклонено {self.rejected} записей за {elapsed:.1f} с'
+        )
+
+    @staticmethod
+    def guess_format(path):
+        extension = os.path.splitext(path)[1].lower().lstrip('.')
+        if extension in ('jsonl', 'ndjson', 'json'):
+            return 'jsonl'
+        if extension == 'csv':
+            return 'csv'
+        raise CommandError(
+            'Не удалось определить формат файла, укажите --format.'
+        )
+
+    def remember_scopes(self, records):
+        # Посты пропущенных записей уже в базе, но их ленты тоже нужно
+        # обновить в конце: прерванный запуск до этого не дошел.
+        for record in records:
+            if is_record(record):
+                self.note_scopes(record.get('author'), record.get('group'))
+
+    def note_scopes(self, username, slug):
+        self.scopes.add(author_scope(username))
+        if slug:
+            self.scopes.add(group_scope(slug))
+
+    def import_batch(self, batch, offset):
+        records = [record for record in batch if is_record(record)]
+        self.authors.load(record.get('author') for record in records)
+        self.groups.load(record.get('group') or None for record in records)
+        posts = []
+        for number, record in enumerate(batch, start=offset + 1):
+            post = self.build_post(record, number)
+            if post is None:
+                self.rejected += 1
+                continue
+            posts.append(post)
+        insert_posts(posts)
+        self.imported += len(posts)
+
+    def build_post(self, record, number):
+        if isinstance(record, InvalidRecord):
+            return self.reject(number, record.reason)
+        if not record:
+            return self.reject(number, 'пустая запись')
+        text = record.get('text')
+        if not text:
+            return self.reject(number, 'нет текста')
+        username = record.get('author')
+        author_id = self.authors.get(username)
+        if author_id is None:
+            return self.reject(number, f'неизвестный автор {username!r}')
+        slug = record.get('group') or None
+        group_id = None
+        if slug is not None:
+            group_id = self.groups.get(slug)
+            if group_id is None:
+                return self.reject(number, f'неизвестная группа {slug!r}')
+        pub_date = timezone.now()
+        if record.get('pub_date'):
+            pub_date = parse_datetime(record['pub_date'])
+            if pub_date is None:
+                return self.reject(number, 'неверная дата')
+            if timezone.is_naive(pub_date):
+                pub_date = timezone.make_aware(pub_date)
+        self.note_scopes(username, slug)
+        # Пакетная вставка не вызывает Post.save и pre_save полей, поэтому
+        # выдержку, HTML и дату изменения заполняем сразу.
+        return Post(
+            text=text,
+            author_id=author_id,
+            group_id=group_id,
+            pub_date=pub_date,
+            updated=timezone.now(),
+            **render_text(text),
+        )
+
+    def reject(self, number, reason):
+        self.stderr.write(f'Запись {number} пропущена: {reason}')
+
+    def finish(self, source):
+        """Один раз перестраивает то, что пакетная вставка не обновила.
+
+        Сигналы при пакетной вставке не срабатывают, поэтому счетчики,
+        поисковый индекс и кеш лент приводятся в порядок после импорта.
+        """
+        call_command('recount_posts', stdout=self.stdout)
+        if is_available():
+            call_command('rebuild_search_index', stdout=self.stdout)
+        touch_scopes(self.scopes)
+        reset_counts(self.scopes)
+        ImportProgress.objects.filter(source=source).delete()
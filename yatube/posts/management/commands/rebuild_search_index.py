@@ -0,0 +1,49 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from posts.models import Post
+from posts.search import FTS_TABLE, create_index, is_available
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает полнотекстовый индекс постов пачками.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        if not is_available():
+            raise CommandError('Полнотекстовый индекс есть только в SQLite.')
+        batch_size = options['batch_size']
+        started = time.monotonic()
+        create_index()
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        indexed = 0
+        last_pk = 0
+        while True:
+            rows = list(
+                Post.objects.filter(pk__gt=last_pk)
+                .order_by('pk')
+                .values_list('pk', 'text')[:batch_size]
+            )
+            if not rows:
+                break
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.executemany(
+                    f'INSERT INTO {FTS_TABLE} (rowid, text) VALUES (%s, %s)',
+                    rows,
+                )
+            indexed += len(rows)
+            last_pk = rows[-1][0]
+            self.stdout.write(f'Проиндексировано постов: {indexed}')
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')"
+            )
+        self.stdout.write(
+            f'Готово: {indexed} постов за '
+            f'{time.monotonic() - started:.1f} с'
+        )
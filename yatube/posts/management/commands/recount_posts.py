@@ -0,0 +1,69 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from posts.models import AuthorCounter, Group, Post
+
+User = get_user_model()
+
+
+def actual_count(field):
+    """Подзапрос с реальным числом постов для OuterRef('pk')."""
+    counts = (
+        Post.objects.filter(**{field: OuterRef('pk')})
+        .order_by()
+        .values(field)
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+def repair(queryset, field, batch_size):
+    """Исправляет расходящиеся счетчики, возвращает их число."""
+    broken = list(
+        queryset.annotate(actual=actual_count(field))
+        .exclude(post_count=F('actual'))
+        .values_list('pk', flat=True)
+    )
+    for start in range(0, len(broken), batch_size):
+        queryset.filter(pk__in=broken[start:start + batch_size]).update(
+            post_count=actual_count(field)
+        )
+    return len(broken)
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает и исправляет счетчики постов авторов и групп.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        missing = User.objects.filter(
+            posts__isnull=False, post_counter__isnull=True
+        ).distinct()
+        created = AuthorCounter.objects.bulk_create(
+            [
+                AuthorCounter(author_id=pk)
+                for pk in missing.values_list('pk', flat=True)
+            ],
+            batch_size=options['batch_size'],
+        )
+        authors = repair(
+            AuthorCounter.objects.all(), 'author', options['batch_size']
+        )
+        groups = repair(Group.objects.all(), 'group', options['batch_size'])
+        with connection.cursor() as cursor:
+            # Обновляет статистику, по которой пагинатор оценивает
+            # число постов в больших лентах.
+            cursor.execute(
+                'ANALYZE ' + connection.ops.quote_name(Post._meta.db_table)
+            )
+        self.stdout.write(
+            f'Создано счетчиков авторов: {len(created)}, '
+            f'исправлено авторов: {authors}, групп: {groups}'
+        )
@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts.excerpts import backfill
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет выдержку и готовый HTML постов пачками. По умолчанию '
+        'только у постов, где они пусты (например, после вставки в обход '
+        'Post.save); с --all — у всех постов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Перерисовать все посты, например после смены шаблона.',
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        queryset = Post.objects.all()
+        if not options['all']:
+            queryset = queryset.filter(excerpt='')
+        processed = 0
+        for processed in backfill(queryset, options['batch_size']):
+            self.stdout.write(f'Обработано постов: {processed}')
+        self.stdout.write(
+            f'Готово: {processed} постов за '
+            f'{time.monotonic() - started:.1f} с'
+        )
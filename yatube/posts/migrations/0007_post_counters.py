@@ -0,0 +1,61 @@
+# Generated by Django 2.2.16 on 2026-10-18 17:52
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_counters(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    Group = apps.get_model('posts', 'Group')
+    AuthorCounter = apps.get_model('posts', 'AuthorCounter')
+    db = schema_editor.connection.alias
+    authors = (
+        Post.objects.using(db).order_by().values('author').annotate(
+            total=models.Count('pk')
+        )
+    )
+    AuthorCounter.objects.using(db).bulk_create(
+        [
+            AuthorCounter(author_id=row['author'], post_count=row['total'])
+            for row in authors
+        ],
+        batch_size=1000,
+    )
+    groups = (
+        Post.objects.using(db).filter(group__isnull=False).order_by()
+        .values('group')
+        .annotate(total=models.Count('pk'))
+    )
+    for row in groups:
+        Group.objects.using(db).filter(pk=row['group']).update(
+            post_count=row['total']
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0006_post_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthorCounter',
+            fields=[
+                ('author', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='post_counter', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Автор')),
+                ('post_count', models.PositiveIntegerField(default=0, verbose_name='Число постов')),
+            ],
+            options={
+                'verbose_name': 'Счетчик автора',
+                'verbose_name_plural': 'Счетчики авторов',
+            },
+        ),
+        migrations.AddField(
+            model_name='group',
+            name='post_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Число постов'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:06
+
+from django.db import migrations, models
+
+
+def fill_updated(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    Post.objects.using(schema_editor.connection.alias).update(
+        updated=models.F('pub_date')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0008_post_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedVersion',
+            fields=[
+                ('scope', models.CharField(max_length=255, primary_key=True, serialize=False)),
+                ('modified', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Версия ленты',
+                'verbose_name_plural': 'Версии лент',
+            },
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='updated',
+            field=models.DateTimeField(auto_now=True, verbose_name='Дата изменения'),
+        ),
+        migrations.RunPython(fill_updated, migrations.RunPython.noop),
+    ]
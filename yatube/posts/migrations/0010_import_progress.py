@@ -0,0 +1,25 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0009_post_conditional_get'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportProgress',
+            fields=[
+                ('source', models.CharField(max_length=255, primary_key=True, serialize=False)),
+                ('processed', models.PositiveIntegerField(default=0)),
+                ('updated', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Прогресс импорта',
+                'verbose_name_plural': 'Прогресс импорта',
+            },
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:32
+
+from django.db import migrations, models
+from django.template.defaultfilters import linebreaksbr
+from django.utils.text import Truncator
+
+# Копия posts.excerpts на момент миграции: изменения приложения не должны
+# менять уже примененную историю.
+EXCERPT_LENGTH = 300
+BATCH_SIZE = 1000
+
+
+def render_html(text):
+    return str(linebreaksbr(text, autoescape=True))
+
+
+def fill_rendered_text(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    db = schema_editor.connection.alias
+    last_pk = 0
+    while True:
+        posts = list(
+            Post.objects.using(db).filter(pk__gt=last_pk).order_by('pk')
+            .only('pk', 'text')[:BATCH_SIZE]
+        )
+        if not posts:
+            return
+        for post in posts:
+            post.excerpt = Truncator(post.text).chars(EXCERPT_LENGTH)
+            post.excerpt_html = render_html(post.excerpt)
+            post.text_html = render_html(post.text)
+        Post.objects.using(db).bulk_update(
+            posts, ('excerpt', 'excerpt_html', 'text_html')
+        )
+        last_pk = posts[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0010_import_progress'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=models.TextField(blank=True, default='', editable=False, verbose_name='Выдержка'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='excerpt_html',
+            field=models.TextField(blank=True, default='', editable=False, verbose_name='Выдержка в HTML'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='text_html',
+            field=models.TextField(blank=True, default='', editable=False, verbose_name='Текст в HTML'),
+        ),
+        migrations.RunPython(fill_rendered_text, migrations.RunPython.noop),
+    ]
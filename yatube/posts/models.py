@@ -1,13 +1,26 @@
 from django.contrib.auth import get_user_model
 from django.db import models
 
+from .excerpts import RENDERED_FIELDS, render_text
+
 User = get_user_model()
 
 
+class PostQuerySet(models.QuerySet):
+    def for_feed(self):
+        """Посты для лент: с автором и группой, но без полного текста."""
+        return self.select_related('author', 'group').defer(
+            'text', 'text_html'
+        )
+
+
 class Group(models.Model):
     title = models.CharField(max_length=200, verbose_name='Название')
     slug = models.SlugField(max_length=50, unique=True)
     description = models.TextField(verbose_name='Описание')
+    post_count = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name='Число постов'
+    )
 
     class Meta:
         verbose_name = 'Группа'
@@ -21,9 +34,24 @@ class Post(models.Model):
     text = models.TextField(
         verbose_name='Текст поста', help_text='Текст нового поста'
     )
+    excerpt = models.TextField(
+        blank=True, default='', editable=False, verbose_name='Выдержка'
+    )
+    excerpt_html = models.TextField(
+        blank=True,
+        default='',
+        editable=False,
+        verbose_name='Выдержка в HTML',
+    )
+    text_html = models.TextField(
+        blank=True, default='', editable=False, verbose_name='Текст в HTML'
+    )
     pub_date = models.DateTimeField(
         auto_now_add=True, verbose_name='Дата публикации'
     )
+    updated = models.DateTimeField(
+        auto_now=True, verbose_name='Дата изменения'
+    )
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -39,11 +67,120 @@ class Post(models.Model):
         verbose_name='Группа',
         help_text='Группа, к которой будет относиться пост',
     )
+    image = models.ImageField(
+        'Картинка',
+        upload_to='posts/',
+        blank=True,
+        default='',
+        help_text='Картинка к посту',
+    )
+    thumbnails_ready = models.BooleanField(
+        default=False, editable=False, verbose_name='Миниатюры готовы'
+    )
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         ordering = ['-pub_date']
+        indexes = [
+            models.Index(fields=['-pub_date'], name='post_pub_date_idx'),
+            models.Index(
+                fields=['author', '-pub_date'], name='post_author_pub_date_idx'
+            ),
+            models.Index(
+                fields=['group', '-pub_date'], name='post_group_pub_date_idx'
+            ),
+        ]
         verbose_name = 'Пост'
         verbose_name_plural = 'Посты'
 
     def __str__(self):
+        # В лентах текст не загружается: тогда хватает выдержки, которая
+        # с него и начинается.
+        if 'text' in self.get_deferred_fields():
+            return self.excerpt[:15]
         return self.text[:15]
+
+    def save(self, *args, **kwargs):
+        # Отрисованные поля зависят только от текста: если он не загружен
+        # (лента с defer), он и не менялся.
+        if 'text' not in self.get_deferred_fields():
+            for name, value in render_text(self.text).items():
+                setattr(self, name, value)
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None and 'text' in update_fields:
+                kwargs['update_fields'] = {*update_fields, *RENDERED_FIELDS}
+        super().save(*args, **kwargs)
+
+
+class AuthorCounter(models.Model):
+    """Денормализованный счетчик постов автора.
+
+    Поддерживается сигналами из posts/signals.py, пересчитывается
+    командой recount_posts.
+    """
+
+    author = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='post_counter',
+        verbose_name='Автор',
+    )
+    post_count = models.PositiveIntegerField(
+        default=0, verbose_name='Число постов'
+    )
+
+    class Meta:
+        verbose_name = 'Счетчик автора'
+        verbose_name_plural = 'Счетчики авторов'
+
+    def __str__(self):
+        return f'{self.author}: {self.post_count}'
+
+
+class FeedVersion(models.Model):
+    """Время последнего изменения ленты (области) для условных GET.
+
+    Области те же, что и в кеше лент (posts/cache.py): 'global',
+    'group:<slug>' и 'author:<username>'. Время обновляют сигналы
+    posts/signals.py при любом изменении постов области, в том числе
+    при удалении, которое по MAX(pub_date) не заметить.
+    """
+
+    scope = models.CharField(max_length=255, primary_key=True)
+    modified = models.DateTimeField()
+
+    class Meta:
+        verbose_name = 'Версия ленты'
+        verbose_name_plural = 'Версии лент'
+
+    def __str__(self):
+        return self.scope
+
+
+class ImportProgress(models.Model):
+    """Сколько записей источника уже импортировано командой import_posts.
+
+    Обновляется в той же транзакции, что и пачка постов, поэтому после
+    сбоя импорт продолжается ровно с первой незаписанной записи.
+    """
+
+    source = models.CharField(max_length=255, primary_key=True)
+    processed = models.PositiveIntegerField(default=0)
+    updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Прогресс импорта'
+        verbose_name_plural = 'Прогресс импорта'
+
+    def __str__(self):
+        return f'{self.source}: {self.processed}'
+
+
+def get_post_count(author):
+    """Возвращает число постов автора по денормализованному счетчику."""
+    try:
+        return author.post_counter.post_count
+    except AuthorCounter.DoesNotExist:
+        return 0
@@ -0,0 +1,142 @@
+"""Полнотекстовый поиск по постам на SQLite FTS5.
+
+Индекс хранится в виртуальной таблице FTS_TABLE, rowid которой
+совпадает с id поста. Таблицу создает миграция, в актуальном
+состоянии ее держат сигналы posts/signals.py, а целиком перестраивает
+команда rebuild_search_index. На других СУБД поиск откатывается
+к icontains.
+"""
+from django.db import connection
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .models import Post
+
+FTS_TABLE = 'posts_post_fts'
+# Служебные символы вокруг совпадений в snippet(): их не бывает в тексте
+# постов, поэтому текст можно экранировать целиком, а затем заменить их
+# на теги подсветки.
+MATCH_START = '\x02'
+MATCH_END = '\x03'
+SNIPPET_TOKENS = 24
+
+
+def is_available(using=connection):
+    return using.vendor == 'sqlite'
+
+
+def create_index(using=connection):
+    with using.cursor() as cursor:
+        cursor.execute(
+            f'CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} '
+            "USING fts5(text, tokenize='unicode61')"
+        )
+
+
+def match_query(query):
+    """Превращает пользовательский запрос в безопасный запрос FTS5.
+
+    Каждое слово берется в кавычки, поэтому операторы FTS5 во вводе
+    не интерпретируются; слова объединяются через неявное AND.
+    """
+    words = query.split()
+    return ' '.join('"{}"'.format(word.replace('"', '""')) for word in words)
+
+
+def index_post(post):
+    if not is_available() or 'text' not in post.__dict__:
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT OR REPLACE INTO {FTS_TABLE} (rowid, text) '
+            'VALUES (%s, %s)',
+            [post.pk, post.text],
+        )
+
+
+def unindex_post(post_id):
+    if not is_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [post_id])
+
+
+def matching_ids(query):
+    """Подзапрос с id постов, подходящих под запрос, для filter(pk__in=)."""
+    return RawSQL(
+        f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+        [match_query(query)],
+    )
+
+
+def highlight(snippet):
+    return mark_safe(
+        escape(snippet)
+        .replace(MATCH_START, '<mark>')
+        .replace(MATCH_END, '</mark>')
+    )
+
+
+class SearchResults:
+    """Ленивый список найденных постов для Paginator.
+
+    count() выполняет один COUNT по индексу, срез — один запрос к
+    индексу с ранжированием и один запрос за постами страницы.
+    У каждого поста появляется атрибут snippet с подсветкой.
+    """
+
+    def __init__(self, query):
+        self.query = match_query(query)
+
+    def count(self):
+        if not self.query:
+            return 0
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT count(*) FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+                [self.query],
+            )
+            return cursor.fetchone()[0]
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, page):
+        if not self.query:
+            return []
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid, snippet({FTS_TABLE}, 0, %s, %s, %s, %s) '
+                f'FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+                'ORDER BY rank LIMIT %s OFFSET %s',
+                [
+                    MATCH_START,
+                    MATCH_END,
+                    '…',
+                    SNIPPET_TOKENS,
+                    self.query,
+                    page.stop - page.start,
+                    page.start,
+                ],
+            )
+            rows = cursor.fetchall()
+        posts = Post.objects.for_feed().in_bulk(
+            [post_id for post_id, _ in rows]
+        )
+        results = []
+        for post_id, snippet in rows:
+            if post_id in posts:
+                post = posts[post_id]
+                post.snippet = highlight(snippet)
+                results.append(post)
+        return results
+
+
+def search_posts(query):
+    """Возвращает найденные посты в порядке релевантности."""
+    if is_available():
+        return SearchResults(query)
+    if not query.split():
+        return Post.objects.none()
+    return Post.objects.filter(text__icontains=query).for_feed()
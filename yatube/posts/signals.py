@@ -0,0 +1,193 @@
+from functools import partial
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import (
+    post_delete,
+    post_init,
+    post_save,
+    pre_save,
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .cache import (
+    GLOBAL_SCOPE,
+    adjust_counts,
+    author_scope,
+    bump_scopes,
+    group_scope,
+)
+from .models import AuthorCounter, FeedVersion, Group, Post
+from .search import index_post, unindex_post
+from .thumbnails import thumbnail_pool
+
+User = get_user_model()
+
+# Значение связи, которое не было загружено из базы (отложенное поле).
+UNKNOWN = object()
+
+
+def change_count(queryset, delta):
+    # Не уводим счетчик ниже нуля, даже если он уже рассинхронизирован:
+    # поправит его команда recount_posts.
+    if delta < 0:
+        queryset = queryset.filter(post_count__gte=-delta)
+    queryset.update(post_count=F('post_count') + delta)
+
+
+def change_author_count(author_id, delta):
+    if author_id is None:
+        return
+    if delta > 0:
+        AuthorCounter.objects.get_or_create(author_id=author_id)
+    change_count(AuthorCounter.objects.filter(author_id=author_id), delta)
+
+
+def change_group_count(group_id, delta):
+    if group_id is None:
+        return
+    change_count(Group.objects.filter(pk=group_id), delta)
+
+
+def remember_relations(instance):
+    # Читаем из __dict__, чтобы не подгружать отложенные поля.
+    instance._counted_relations = (
+        instance.__dict__.get('author_id', UNKNOWN),
+        instance.__dict__.get('group_id', UNKNOWN),
+    )
+
+
+def image_name(instance):
+    value = instance.__dict__.get('image', UNKNOWN)
+    return getattr(value, 'name', value)
+
+
+def post_scopes(*relations):
+    """Возвращает множества областей лент для пар (author_id, group_id)."""
+    author_ids = {author_id for author_id, _ in relations}
+    group_ids = {group_id for _, group_id in relations} - {None}
+    usernames = dict(
+        User.objects.filter(pk__in=author_ids).values_list('pk', 'username')
+    )
+    slugs = dict(
+        Group.objects.filter(pk__in=group_ids).values_list('pk', 'slug')
+    )
+    result = []
+    for author_id, group_id in relations:
+        scopes = {GLOBAL_SCOPE}
+        if author_id in usernames:
+            scopes.add(author_scope(usernames[author_id]))
+        if group_id in slugs:
+            scopes.add(group_scope(slugs[group_id]))
+        result.append(scopes)
+    return result
+
+
+def touch_scopes(scopes):
+    """Отмечает изменение лент для валидаторов условных GET и кеша.
+
+    Поколения кеша лент меняются только после фиксации: иначе промах
+    кеша, пока транзакция открыта, записал бы старую страницу под новым
+    поколением, а откат оставил бы сброшенным кеш неизменных лент.
+    """
+    scopes = set(scopes)
+    now = timezone.now()
+    for scope in scopes:
+        if not FeedVersion.objects.filter(scope=scope).update(modified=now):
+            FeedVersion.objects.get_or_create(
+                scope=scope, defaults={'modified': now}
+            )
+    transaction.on_commit(partial(bump_scopes, scopes))
+
+
+def count_scopes(old_scopes, new_scopes):
+    """После фиксации поправляет закешированные числа постов областей."""
+    transaction.on_commit(partial(adjust_counts, old_scopes - new_scopes, -1))
+    transaction.on_commit(partial(adjust_counts, new_scopes - old_scopes, 1))
+
+
+def schedule_thumbnails(instance, name):
+    """Ставит миниатюры в очередь и запоминает картинку как учтенную.
+
+    Имя запоминается только здесь: если транзакцию откатили (повтор в
+    очереди записей) или постановка не удалась, следующее сохранение
+    поста снова увидит новую картинку и запланирует миниатюры.
+    """
+    thumbnail_pool.submit(name)
+    instance._image_name = name
+
+
+@receiver(post_init, sender=Post)
+def post_initialized(sender, instance, **kwargs):
+    remember_relations(instance)
+    instance._image_name = image_name(instance)
+
+
+@receiver(pre_save, sender=Post)
+def post_saving(sender, instance, **kwargs):
+    # Миниатюры старой картинки новой не подходят.
+    name = image_name(instance)
+    if name is not UNKNOWN and name != instance._image_name:
+        instance.thumbnails_ready = False
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, **kwargs):
+    """Обновляет счетчики и кеш лент при сохранении поста."""
+    new = (instance.author_id, instance.group_id)
+    old_author, old_group = instance._counted_relations
+    if old_author is UNKNOWN:
+        old_author = instance.author_id
+    if old_group is UNKNOWN:
+        old_group = instance.group_id
+    if created:
+        change_author_count(instance.author_id, 1)
+        change_group_count(instance.group_id, 1)
+        new_scopes, = post_scopes(new)
+        old_scopes = set()
+    else:
+        if old_author != instance.author_id:
+            change_author_count(old_author, -1)
+            change_author_count(instance.author_id, 1)
+        if old_group != instance.group_id:
+            change_group_count(old_group, -1)
+            change_group_count(instance.group_id, 1)
+        old_scopes, new_scopes = post_scopes((old_author, old_group), new)
+    touch_scopes(old_scopes | new_scopes)
+    count_scopes(old_scopes, new_scopes)
+    index_post(instance)
+    remember_relations(instance)
+    name = image_name(instance)
+    if name and name is not UNKNOWN and name != instance._image_name:
+        # Процесс пула увидит файл и пост только после фиксации.
+        transaction.on_commit(partial(schedule_thumbnails, instance, name))
+    elif name is not UNKNOWN:
+        instance._image_name = name
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    # Строка уже удалена, поэтому незагруженные связи не дочитываем.
+    author_id, group_id = (
+        None if value is UNKNOWN else value
+        for value in instance._counted_relations
+    )
+    change_author_count(author_id, -1)
+    change_group_count(group_id, -1)
+    scopes, = post_scopes((author_id, group_id))
+    touch_scopes(scopes)
+    count_scopes(scopes, set())
+    unindex_post(instance.pk)
+
+
+@receiver(post_save, sender=Group)
+def group_saved(sender, instance, **kwargs):
+    touch_scopes([group_scope(instance.slug)])
+
+
+@receiver(post_delete, sender=Group)
+def group_deleted(sender, instance, **kwargs):
+    # Посты группы остаются в общей ленте, но уже без ссылки на нее.
+    touch_scopes([GLOBAL_SCOPE, group_scope(instance.slug)])
@@ -0,0 +1,76 @@
+"""Статистика автора для шапки страницы профиля.
+
+Число постов, группы, в которых автор писал, с числом постов в каждой,
+даты первого и последнего поста считаются одним агрегатным запросом с
+группировкой по группе. Результат кешируется под ключом с поколением
+области автора ('author:<username>', см. posts/cache.py): любое
+сохранение или удаление поста автора увеличивает поколение, и следующий
+показ профиля считает статистику заново. Остальное время профиль не
+обращается к постам автора, сколько бы их ни было.
+"""
+import hashlib
+
+from django.conf import settings
+from django.db.models import Count, Max, Min
+
+from core.replicas import primary_reads
+
+from .cache import author_scope, get_cache, get_generations
+from .models import Post
+
+
+def stats_key(username):
+    scope = author_scope(username)
+    generation, = get_generations([scope])
+    digest = hashlib.md5(f'{scope}|{generation}'.encode()).hexdigest()
+    return f'profile:stats:{digest}'
+
+
+def query_author_stats(author):
+    """Считает статистику автора одним запросом к базе."""
+    rows = list(
+        Post.objects.filter(author=author)
+        .values('group_id', 'group__slug', 'group__title')
+        .annotate(
+            posts=Count('pk'),
+            first_pub_date=Min('pub_date'),
+            last_pub_date=Max('pub_date'),
+        )
+        .order_by('-posts', 'group__title')
+    )
+    groups = [
+        {
+            'slug': row['group__slug'],
+            'title': row['group__title'],
+            'posts': row['posts'],
+        }
+        for row in rows
+        if row['group_id'] is not None
+    ]
+    return {
+        'post_count': sum(row['posts'] for row in rows),
+        'group_count': len(groups),
+        'first_pub_date': min(
+            (row['first_pub_date'] for row in rows), default=None
+        ),
+        'last_pub_date': max(
+            (row['last_pub_date'] for row in rows), default=None
+        ),
+        'groups': groups,
+    }
+
+
+def get_author_stats(author):
+    """Возвращает статистику автора из кеша или считает ее."""
+    timeout = getattr(settings, 'PROFILE_STATS_TIMEOUT', 0)
+    if not timeout:
+        return query_author_stats(author)
+    cache = get_cache()
+    key = stats_key(author.username)
+    stats = cache.get(key)
+    if stats is None:
+        # Как и страницы лент, кешируемое читается из основной базы.
+        with primary_reads():
+            stats = query_author_stats(author)
+        cache.set(key, stats, timeout)
+    return stats
@@ -0,0 +1,11 @@
+from django import template
+
+from .. import thumbnails
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_thumbnail(post, size):
+    """Миниатюра картинки поста размера size из THUMBNAIL_SIZES."""
+    return thumbnails.get_thumbnail(post, size)
@@ -0,0 +1,144 @@
+import datetime
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models import Max, Min, QuerySet
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from mixer.backend.django import mixer
+
+from ..admin import ChangeListQuerySet
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+class ChangeListQuerySetTest(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = mixer.blend(User, username='auth')
+        for day in ('2021-12-31', '2022-01-01', '2022-01-15', '2022-03-01'):
+            post = mixer.blend(Post, author=cls.user)
+            Post.objects.filter(pk=post.pk).update(
+                pub_date=timezone.make_aware(
+                    datetime.datetime.fromisoformat(day + 'T12:00')
+                )
+            )
+
+    def test_dates_match_default_implementation(self) -> None:
+        """Проверяет, что dates() совпадает с реализацией Django."""
+        for kind in ('year', 'month', 'day'):
+            for order in ('ASC', 'DESC'):
+                with self.subTest(kind=kind, order=order):
+                    self.assertEqual(
+                        list(
+                            ChangeListQuerySet(Post).dates(
+                                'pub_date', kind, order
+                            )
+                        ),
+                        list(
+                            QuerySet(Post).dates('pub_date', kind, order)
+                        ),
+                    )
+
+    def test_min_and_max_are_split(self) -> None:
+        """Проверяет, что MIN и MAX считаются отдельными запросами."""
+        with self.assertNumQueries(2):
+            result = ChangeListQuerySet(Post).aggregate(
+                first=Min('pub_date'), last=Max('pub_date')
+            )
+        self.assertEqual(
+            result,
+            QuerySet(Post).aggregate(
+                first=Min('pub_date'), last=Max('pub_date')
+            ),
+        )
+
+    def test_model_manager_is_not_patched(self) -> None:
+        """Проверяет, что менеджер модели ведет себя как в Django."""
+        self.assertIsInstance(Post.objects.dates('pub_date', 'year'), QuerySet)
+        with self.assertNumQueries(1):
+            Post.objects.aggregate(first=Min('pub_date'), last=Max('pub_date'))
+
+
+class PostAdminTest(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.admin = mixer.blend(User, is_staff=True, is_superuser=True)
+        cls.group = mixer.blend(Group)
+        cls.post = mixer.blend(Post, author=cls.admin, group=None)
+
+    def test_group_is_editable_in_list(self) -> None:
+        """Проверяет, что группу можно сменить прямо в списке постов."""
+        self.client.force_login(self.admin)
+        url = reverse('admin:posts_post_changelist')
+        response = self.client.get(url)
+        self.assertIsInstance(
+            response.context['cl'].queryset, ChangeListQuerySet
+        )
+        self.assertContains(response, 'name="form-0-group"')
+        response = self.client.post(
+            url,
+            {
+                'form-TOTAL_FORMS': 1,
+                'form-INITIAL_FORMS': 1,
+                'form-0-id': self.post.pk,
+                'form-0-group': self.group.pk,
+                '_save': 'Сохранить',
+            },
+        )
+        self.assertEqual(response.status_code, 302)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.group, self.group)
+
+    def test_list_queries_do_not_grow_with_rows(self) -> None:
+        """Проверяет, что группы строк списка грузятся одним запросом."""
+        Post.objects.filter(pk=self.post.pk).update(group=self.group)
+        self.client.force_login(self.admin)
+        url = reverse('admin:posts_post_changelist')
+        with CaptureQueriesContext(connection) as one_row:
+            self.client.get(url)
+        for group in mixer.cycle(5).blend(Group):
+            mixer.blend(Post, author=self.admin, group=group)
+        with CaptureQueriesContext(connection) as many_rows:
+            self.client.get(url)
+        self.assertEqual(len(many_rows), len(one_row))
+
+    def test_selected_group_is_rendered(self) -> None:
+        """Проверяет, что в строке списка выбрана группа поста."""
+        Post.objects.filter(pk=self.post.pk).update(group=self.group)
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse('admin:posts_post_changelist'))
+        self.assertContains(
+            response,
+            f'<option value="{self.group.pk}" selected>'
+            f'{self.group.title}</option>',
+            html=True,
+        )
+
+    def test_invalid_group_is_reported(self) -> None:
+        """Проверяет, что список с ошибкой в группе снова отрисовывается."""
+        self.client.force_login(self.admin)
+        response = self.client.post(
+            reverse('admin:posts_post_changelist'),
+            {
+                'form-TOTAL_FORMS': 1,
+                'form-INITIAL_FORMS': 1,
+                'form-0-id': self.post.pk,
+                'form-0-group': self.group.pk + 1,
+                '_save': 'Сохранить',
+            },
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['cl'].formset.errors[0])
+
+    def test_rendered_html_is_deferred(self) -> None:
+        """Проверяет, что список не загружает готовый HTML постов."""
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse('admin:posts_post_changelist'))
+        post = response.context['cl'].result_list[0]
+        self.assertEqual(
+            post.get_deferred_fields(), {'text_html', 'excerpt_html'}
+        )
@@ -0,0 +1,121 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from mixer.backend.django import mixer
+
+from core.tests.utils import capture_on_commit_callbacks
+
+from ..cache import GLOBAL_SCOPE, get_generations
+from ..models import Group, Post
+from ..signals import touch_scopes
+
+User = get_user_model()
+
+
+class FeedCacheTest(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = mixer.blend(User, username='auth')
+        cls.other = mixer.blend(User, username='other')
+        cls.group = mixer.blend(Group)
+        cls.other_group = mixer.blend(Group)
+        cls.post = mixer.blend(Post, author=cls.user, group=cls.group)
+        cls.urls = {
+            'index': reverse('posts:index'),
+            'group': reverse(
+                'posts:group_list', kwargs={'slug': cls.group.slug}
+            ),
+            'other_group': reverse(
+                'posts:group_list', kwargs={'slug': cls.other_group.slug}
+            ),
+            'profile': reverse(
+                'posts:profile', kwargs={'username': cls.user.username}
+            ),
+            'other_profile': reverse(
+                'posts:profile', kwargs={'username': cls.other.username}
+            ),
+        }
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def is_cached(self, name) -> bool:
+        """Страница отдана из кеша, если шаблон не отрисовывался."""
+        return self.client.get(self.urls[name]).context is None
+
+    def test_anonymous_pages_are_cached(self) -> None:
+        """Проверяет, что повторный запрос ленты отдается из кеша."""
+        for name, url in self.urls.items():
+            with self.subTest(name=name):
+                first = self.client.get(url)
+                second = self.client.get(url)
+                self.assertIsNotNone(first.context)
+                self.assertIsNone(second.context)
+                self.assertEqual(first.content, second.content)
+
+    def test_authorized_pages_are_not_cached(self) -> None:
+        """Проверяет, что авторизованному пользователю кеш не отдается."""
+        client = Client()
+        client.force_login(self.user)
+        client.get(self.urls['index'])
+        self.assertIsNotNone(client.get(self.urls['index']).context)
+
+    def test_new_post_invalidates_only_its_feeds(self) -> None:
+        """Проверяет, что новый пост сбрасывает только свои ленты."""
+        for url in self.urls.values():
+            self.client.get(url)
+        with capture_on_commit_callbacks(execute=True):
+            mixer.blend(Post, author=self.user, group=self.group)
+        self.assertFalse(self.is_cached('index'))
+        self.assertFalse(self.is_cached('group'))
+        self.assertFalse(self.is_cached('profile'))
+        self.assertTrue(self.is_cached('other_group'))
+        self.assertTrue(self.is_cached('other_profile'))
+
+    def test_moved_post_invalidates_old_and_new_feeds(self) -> None:
+        """Проверяет, что перенос поста сбрасывает старые и новые ленты."""
+        for url in self.urls.values():
+            self.client.get(url)
+        post = Post.objects.get(pk=self.post.pk)
+        post.author = self.other
+        post.group = self.other_group
+        with capture_on_commit_callbacks(execute=True):
+            post.save()
+        for name in self.urls:
+            with self.subTest(name=name):
+                self.assertFalse(self.is_cached(name))
+
+    def test_write_from_other_process_invalidates_feeds(self) -> None:
+        """Проверяет, что ленты сбрасывает запись с чужим кешем поколений.
+
+        Так пишет пул миниатюр: у его процесса свой LocMemCache.
+        """
+        self.client.get(self.urls['index'])
+        with mock.patch('posts.signals.bump_scopes'):
+            touch_scopes([GLOBAL_SCOPE])
+        self.assertFalse(self.is_cached('index'))
+
+    def test_generations_change_after_commit(self) -> None:
+        """Проверяет, что поколения меняются только после фиксации.
+
+        Промах кеша из другого соединения, пока транзакция открыта, видит
+        старые данные и должен записать страницу под старым поколением.
+        """
+        before = get_generations([GLOBAL_SCOPE])
+        with capture_on_commit_callbacks(execute=True):
+            mixer.blend(Post, author=self.user, group=self.group)
+            self.assertEqual(get_generations([GLOBAL_SCOPE]), before)
+        self.assertNotEqual(get_generations([GLOBAL_SCOPE]), before)
+        self.assertFalse(self.is_cached('index'))
+
+    def test_deleted_post_disappears_from_feeds(self) -> None:
+        """Проверяет, что удаленный пост пропадает из закешированных лент."""
+        post = mixer.blend(Post, author=self.user, group=self.group)
+        self.client.get(self.urls['group'])
+        with capture_on_commit_callbacks(execute=True):
+            post.delete()
+        response = self.client.get(self.urls['group'])
+        self.assertNotIn(post, response.context['page_obj'])
@@ -0,0 +1,92 @@
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from mixer.backend.django import mixer
+
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+class ConditionalGetTest(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = mixer.blend(User, username='auth')
+        cls.group = mixer.blend(Group)
+        cls.other_group = mixer.blend(Group)
+        cls.post = mixer.blend(Post, author=cls.user, group=cls.group)
+        cls.urls = {
+            'index': reverse('posts:index'),
+            'group_list': reverse(
+                'posts:group_list', kwargs={'slug': cls.group.slug}
+            ),
+            'other_group': reverse(
+                'posts:group_list', kwargs={'slug': cls.other_group.slug}
+            ),
+            'profile': reverse(
+                'posts:profile', kwargs={'username': cls.user.username}
+            ),
+            'post_detail': reverse(
+                'posts:post_detail', kwargs={'post_id': cls.post.id}
+            ),
+        }
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def revalidate(self, name, client=None):
+        client = client or self.client
+        etag = client.get(self.urls[name])['ETag']
+        return client.get(self.urls[name], HTTP_IF_NONE_MATCH=etag)
+
+    def test_unchanged_pages_return_not_modified(self) -> None:
+        """Проверяет, что без изменений страница отдает 304 без шаблона."""
+        for name in ('index', 'group_list', 'profile', 'post_detail'):
+            with self.subTest(name=name):
+                response = self.revalidate(name)
+                self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+                self.assertIsNone(response.context)
+
+    def test_feed_last_modified(self) -> None:
+        """Проверяет ответ 304 по If-Modified-Since для ленты."""
+        last_modified = self.client.get(self.urls['index'])['Last-Modified']
+        response = self.client.get(
+            self.urls['index'], HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+
+    def test_changes_invalidate_validators(self) -> None:
+        """Проверяет, что новый пост меняет валидаторы своих лент."""
+        etags = {
+            name: self.client.get(url)['ETag']
+            for name, url in self.urls.items()
+            if name != 'other_group'
+        }
+        mixer.blend(Post, author=self.user, group=self.group)
+        for name, etag in etags.items():
+            with self.subTest(name=name):
+                response = self.client.get(
+                    self.urls[name], HTTP_IF_NONE_MATCH=etag
+                )
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_deleted_post_invalidates_feed(self) -> None:
+        """Проверяет, что удаление поста меняет валидатор ленты."""
+        post = mixer.blend(Post, author=self.user, group=self.other_group)
+        etag = self.client.get(self.urls['other_group'])['ETag']
+        post.delete()
+        response = self.client.get(
+            self.urls['other_group'], HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_validators_differ_per_user(self) -> None:
+        """Проверяет, что ETag гостя не подходит авторизованному."""
+        etag = self.client.get(self.urls['index'])['ETag']
+        client = Client()
+        client.force_login(self.user)
+        response = client.get(self.urls['index'], HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
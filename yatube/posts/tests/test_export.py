@@ -0,0 +1,89 @@
+import csv
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from mixer.backend.django import mixer
+
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+class ExportPostsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = mixer.blend(User, username='auth')
+        cls.other = mixer.blend(User, username='other')
+        cls.group = mixer.blend(Group, slug='cats')
+        for day in range(1, 6):
+            post = mixer.blend(
+                Post, author=cls.user, group=cls.group, text=f'Пост {day}'
+            )
+            Post.objects.filter(pk=post.pk).update(
+                pub_date=timezone.make_aware(datetime(2021, 3, day, 12))
+            )
+        mixer.blend(Post, author=cls.other, text='Чужой пост')
+
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def export(self, name, **options) -> str:
+        path = os.path.join(self.directory, name)
+        call_command('export_posts', path, stdout=StringIO(), **options)
+        return path
+
+    def read_jsonl(self, path) -> list:
+        with open(path, encoding='utf-8') as stream:
+            return [json.loads(line) for line in stream]
+
+    def test_export_jsonl_with_filters(self) -> None:
+        """Проверяет выгрузку с фильтрами по автору, группе и датам."""
+        path = self.export(
+            'posts.jsonl',
+            author='auth',
+            group='cats',
+            since='2021-03-02',
+            until='2021-03-04',
+            batch_size=2,
+        )
+        records = self.read_jsonl(path)
+        self.assertEqual(
+            [record['text'] for record in records],
+            ['Пост 2', 'Пост 3', 'Пост 4'],
+        )
+        self.assertEqual(records[0]['author'], 'auth')
+        self.assertEqual(records[0]['group'], 'cats')
+
+    def test_export_csv_shards_cover_all_posts(self) -> None:
+        """Проверяет, что файлы-шарды вместе содержат все посты ровно раз."""
+        self.export('posts.csv', shards=3, jobs=1)
+        ids = []
+        for number in range(1, 4):
+            path = os.path.join(self.directory, f'posts-{number:03d}.csv')
+            with open(path, newline='', encoding='utf-8') as stream:
+                ids.extend(int(row['id']) for row in csv.DictReader(stream))
+        self.assertEqual(
+            sorted(ids), sorted(Post.objects.values_list('pk', flat=True))
+        )
+
+    def test_export_can_be_imported(self) -> None:
+        """Проверяет, что выгрузку принимает import_posts."""
+        path = self.export('posts.jsonl')
+        Post.objects.all().delete()
+        call_command(
+            'import_posts', path, stdout=StringIO(), stderr=StringIO()
+        )
+        self.assertEqual(Post.objects.count(), 6)
+        self.assertEqual(
+            Post.objects.get(text='Пост 1').pub_date,
+            timezone.make_aware(datetime(2021, 3, 1, 12)),
+        )
@@ -0,0 +1,138 @@
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.utils import timezone
+from mixer.backend.django import mixer
+
+from ..models import Group, ImportProgress, Post, get_post_count
+from ..search import search_posts
+
+User = get_user_model()
+
+
+class ImportPostsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = mixer.blend(User, username='auth')
+        cls.group = mixer.blend(Group, slug='cats')
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def write(self, name, content) -> str:
+        path = os.path.join(self.directory, name)
+        with open(path, 'w', encoding='utf-8') as stream:
+            stream.write(content)
+        return path
+
+    def write_jsonl(self, records) -> str:
+        return self.write(
+            'posts.jsonl',
+            ''.join(
+                json.dumps(record, ensure_ascii=False) + '\n'
+                for record in records
+            ),
+        )
+
+    def import_posts(self, path, **options) -> str:
+        stdout = StringIO()
+        self.stderr = StringIO()
+        call_command(
+            'import_posts', path, stdout=stdout, stderr=self.stderr, **options
+        )
+        return stdout.getvalue()
+
+    def test_import_jsonl(self) -> None:
+        """Проверяет импорт с датами, счетчиками и поисковым индексом."""
+        path = self.write_jsonl(
+            [
+                {
+                    'text': 'Кот на крыше',
+                    'author': 'auth',
+                    'group': 'cats',
+                    'pub_date': '2020-01-02T03:04:05',
+                },
+                {'text': 'Без группы', 'author': 'auth'},
+                {'text': 'Чужой пост', 'author': 'stranger'},
+                {'author': 'auth'},
+            ]
+        )
+        self.import_posts(path, batch_size=2)
+        self.assertEqual(Post.objects.count(), 2)
+        post = Post.objects.get(text='Кот на крыше')
+        self.assertEqual(post.group, self.group)
+        self.assertEqual(
+            post.pub_date,
+            timezone.make_aware(datetime(2020, 1, 2, 3, 4, 5)),
+        )
+        self.assertEqual(get_post_count(self.user), 2)
+        self.assertEqual(Group.objects.get(pk=self.group.pk).post_count, 1)
+        results = search_posts('крыше')
+        self.assertEqual(list(results[0:results.count()]), [post])
+        self.assertFalse(ImportProgress.objects.exists())
+
+    def test_import_csv_creates_missing_authors_and_groups(self) -> None:
+        """Проверяет CSV и создание незнакомых авторов и групп."""
+        path = self.write(
+            'posts.csv',
+            'text,author,group,pub_date\n'
+            'Первый,newbie,dogs,\n'
+            'Второй,auth,,2021-05-06T07:08:09+00:00\n',
+        )
+        self.import_posts(path, create_authors=True, create_groups=True)
+        newbie = User.objects.get(username='newbie')
+        self.assertFalse(newbie.has_usable_password())
+        self.assertEqual(
+            Post.objects.get(text='Первый').group.slug, 'dogs'
+        )
+        self.assertIsNone(Post.objects.get(text='Второй').group)
+
+    def test_interrupted_import_resumes(self) -> None:
+        """Проверяет, что --resume продолжает импорт с места остановки."""
+        path = self.write_jsonl(
+            [
+                {'text': f'Пост {number}', 'author': 'auth'}
+                for number in range(5)
+            ]
+        )
+        ImportProgress.objects.create(
+            source=os.path.abspath(path), processed=3
+        )
+        with self.assertRaises(CommandError):
+            self.import_posts(path)
+        self.import_posts(path, resume=True)
+        self.assertEqual(
+            sorted(Post.objects.values_list('text', flat=True)),
+            ['Пост 3', 'Пост 4'],
+        )
+        self.assertFalse(ImportProgress.objects.exists())
+
+    def test_malformed_lines_are_rejected(self) -> None:
+        """Проверяет, что битые строки JSON пропускаются с номером строки."""
+        path = self.write(
+            'posts.jsonl',
+            '{"text": "Первый", "author": "auth"}\n'
+            '{"text": "оборван\n'
+            '["text", "author"]\n'
+            '\n'
+            '{"text": "Последний", "author": "auth"}\n',
+        )
+        self.import_posts(path, batch_size=2)
+        self.assertEqual(
+            sorted(Post.objects.values_list('text', flat=True)),
+            ['Первый', 'Последний'],
+        )
+        errors = self.stderr.getvalue()
+        self.assertIn('строка 2: неверный JSON', errors)
+        self.assertIn('строка 3: запись не объект JSON', errors)
@@ -1,8 +1,16 @@
+from io import StringIO
+
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 from mixer.backend.django import mixer
 
-from ..models import Group, Post
+from ..excerpts import EXCERPT_LENGTH
+from ..models import AuthorCounter, Group, Post, get_post_count
 
 User = get_user_model()
 
@@ -23,3 +31,123 @@ class PostModelTest(TestCase):
         """Проверяет, правильно ли отображается значение поля __str__
         в объектах модели Group"""
         self.assertEqual(self.post.text[:15], str(self.post))
+
+    def test_unsaved_post_string_representation(self) -> None:
+        """Проверяет __str__ поста, который еще не сохранен."""
+        post = Post(text='Несохраненный пост')
+        self.assertEqual(str(post), 'Несохраненный п')
+
+
+class PostRenderedTextTest(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = mixer.blend(User, username='auth')
+        cls.text = 'Первая <строка>\n' + 'слово ' * 100
+
+    def test_save_renders_excerpt_and_html(self) -> None:
+        """Проверяет, что сохранение заполняет выдержку и готовый HTML."""
+        post = Post.objects.create(author=self.user, text=self.text)
+        self.assertEqual(len(post.excerpt), EXCERPT_LENGTH)
+        self.assertTrue(post.excerpt.endswith('…'))
+        self.assertTrue(
+            post.text_html.startswith('Первая &lt;строка&gt;<br>слово')
+        )
+        self.assertTrue(post.excerpt_html.endswith('…'))
+        post.text = 'Короткий текст'
+        post.save(update_fields=['text'])
+        post.refresh_from_db()
+        self.assertEqual(post.excerpt, 'Короткий текст')
+        self.assertEqual(post.text_html, 'Короткий текст')
+
+    def test_deferred_text_is_not_rerendered(self) -> None:
+        """Проверяет, что пост из ленты сохраняется без чтения текста."""
+        post = Post.objects.create(author=self.user, text=self.text)
+        post = Post.objects.for_feed().get(pk=post.pk)
+        with self.assertNumQueries(0):
+            str(post)
+        post.group = mixer.blend(Group)
+        post.save()
+        post.refresh_from_db()
+        self.assertEqual(post.text, self.text)
+        self.assertEqual(len(post.excerpt), EXCERPT_LENGTH)
+
+    def test_feeds_do_not_load_full_text(self) -> None:
+        """Проверяет, что ленты не читают из базы полный текст."""
+        post = Post.objects.create(author=self.user, text=self.text)
+        column = '{}.{}'.format(
+            connection.ops.quote_name(Post._meta.db_table),
+            connection.ops.quote_name('text'),
+        )
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, post.excerpt_html)
+        self.assertNotContains(response, post.text_html)
+        for query in queries.captured_queries:
+            self.assertNotIn(column, query['sql'])
+
+    def test_render_posts_fills_missing(self) -> None:
+        """Проверяет, что render_posts заполняет пустые поля пачками."""
+        posts = Post.objects.bulk_create(
+            Post(author=self.user, text=f'Пост {number}')
+            for number in range(5)
+        )
+        self.assertFalse(Post.objects.exclude(excerpt=''))
+        call_command('render_posts', batch_size=2, stdout=StringIO())
+        excerpts = Post.objects.order_by('pk').values_list(
+            'excerpt', flat=True
+        )
+        self.assertEqual(list(excerpts), [post.text for post in posts])
+
+
+class PostCounterTest(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = mixer.blend(User, username='auth')
+        cls.other = mixer.blend(User, username='other')
+        cls.group = mixer.blend(Group)
+        cls.other_group = mixer.blend(Group)
+
+    def assertCounts(self, user, user_count, group, group_count) -> None:
+        user.refresh_from_db()
+        group.refresh_from_db()
+        self.assertEqual(get_post_count(user), user_count)
+        self.assertEqual(group.post_count, group_count)
+
+    def test_counters_follow_create_and_delete(self) -> None:
+        """Проверяет счетчики при создании и удалении поста."""
+        post = mixer.blend(Post, author=self.user, group=self.group)
+        mixer.blend(Post, author=self.user, group=self.group)
+        self.assertCounts(self.user, 2, self.group, 2)
+        post.delete()
+        self.assertCounts(self.user, 1, self.group, 1)
+
+    def test_counters_follow_author_and_group_change(self) -> None:
+        """Проверяет счетчики при смене автора и группы поста."""
+        post = mixer.blend(Post, author=self.user, group=self.group)
+        post = Post.objects.get(pk=post.pk)
+        post.author = self.other
+        post.group = self.other_group
+        post.save()
+        self.assertCounts(self.user, 0, self.group, 0)
+        self.assertCounts(self.other, 1, self.other_group, 1)
+        post.group = None
+        post.save()
+        self.assertCounts(self.other, 1, self.other_group, 0)
+
+    def test_group_deletion_keeps_author_counter(self) -> None:
+        """Проверяет, что удаление группы не меняет счетчик автора."""
+        group = mixer.blend(Group)
+        mixer.blend(Post, author=self.user, group=group)
+        group.delete()
+        self.assertEqual(Post.objects.get().group, None)
+        self.assertCounts(self.user, 1, self.group, 0)
+
+    def test_recount_repairs_counters(self) -> None:
+        """Проверяет, что recount_posts исправляет сбитые счетчики."""
+        mixer.cycle(3).blend(Post, author=self.user, group=self.group)
+        AuthorCounter.objects.all().delete()
+        Group.objects.update(post_count=7)
+        call_command('recount_posts', stdout=StringIO())
+        self.assertCounts(self.user, 3, self.group, 3)
+        self.assertCounts(self.other, 0, self.other_group, 0)
@@ -0,0 +1,95 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from mixer.backend.django import mixer
+from yatube.settings import NOTES_NUMBER
+
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+class PostQueryBudgetTest(TestCase):
+    """Ограничивает число SQL-запросов для каждого URL приложения posts.
+
+    Бюджет задан для полной страницы ленты, в которой у каждого поста
+    свой автор и своя группа, поэтому N+1 на шаблоне сразу его превысит.
+    Два запроса авторизованного клиента уходят на сессию и пользователя,
+    по одному на ленту и пост — на валидатор условного GET. Профилю
+    с пустым кешем нужен еще агрегатный запрос статистики автора.
+    """
+
+    QUERY_BUDGETS = {
+        'index': 3,
+        'group_list': 3,
+        'profile': 4,
+        'post_detail': 2,
+        'search': 3,
+        'post_create': 3,
+        'post_edit': 4,
+    }
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = mixer.blend(User, username='auth')
+        cls.group = mixer.blend(Group)
+        cls.post = mixer.blend(Post, author=cls.user, group=cls.group)
+        for _ in range(NOTES_NUMBER):
+            mixer.blend(
+                Post, author=mixer.blend(User), group=mixer.blend(Group)
+            )
+        mixer.cycle(NOTES_NUMBER).blend(
+            Post, author=cls.user, group=cls.group
+        )
+        cls.authorized_client = Client()
+        cls.authorized_client.force_login(cls.user)
+        cls.urls = {
+            'index': (reverse('posts:index'), False),
+            'group_list': (
+                reverse('posts:group_list', kwargs={'slug': cls.group.slug}),
+                False,
+            ),
+            'profile': (
+                reverse(
+                    'posts:profile', kwargs={'username': cls.user.username}
+                ),
+                False,
+            ),
+            'post_detail': (
+                reverse('posts:post_detail', kwargs={'post_id': cls.post.id}),
+                False,
+            ),
+            'search': (reverse('posts:search') + '?q=' + cls.post.text, False),
+            'post_create': (reverse('posts:post_create'), True),
+            'post_edit': (
+                reverse('posts:post_edit', kwargs={'post_id': cls.post.id}),
+                True,
+            ),
+        }
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def test_every_url_has_budget(self) -> None:
+        """Проверяет, что бюджет задан для каждого URL из posts/urls.py."""
+        from ..urls import urlpatterns
+
+        names = {pattern.name for pattern in urlpatterns}
+        self.assertEqual(names, set(self.QUERY_BUDGETS))
+
+    def test_query_budgets(self) -> None:
+        """Проверяет, что страницы укладываются в бюджет SQL-запросов."""
+        for name, budget in self.QUERY_BUDGETS.items():
+            url, needs_login = self.urls[name]
+            client = self.authorized_client if needs_login else self.client
+            with self.subTest(name=name):
+                with CaptureQueriesContext(connection) as queries:
+                    client.get(url)
+                self.assertLessEqual(
+                    len(queries),
+                    budget,
+                    '\n'.join(query['sql'] for query in queries),
+                )
@@ -0,0 +1,79 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase
+from django.urls import reverse
+from mixer.backend.django import mixer
+
+from ..models import Post
+from ..search import FTS_TABLE, search_posts
+
+User = get_user_model()
+
+
+class PostSearchTest(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = mixer.blend(User, username='auth')
+        cls.post = mixer.blend(
+            Post, author=cls.user, text='Кот гуляет по крыше <b>ночью</b>'
+        )
+        cls.other = mixer.blend(
+            Post, author=cls.user, text='Собака спит во дворе'
+        )
+
+    def found(self, query) -> list:
+        results = search_posts(query)
+        return list(results[0:results.count()])
+
+    def test_search_finds_matching_posts(self) -> None:
+        """Проверяет, что поиск находит посты по словам без учета регистра."""
+        self.assertEqual(self.found('кот крыше'), [self.post])
+        self.assertEqual(self.found('собака'), [self.other])
+        self.assertEqual(self.found('кот собака'), [])
+
+    def test_search_query_syntax_is_escaped(self) -> None:
+        """Проверяет, что операторы FTS5 во вводе не ломают запрос."""
+        self.assertEqual(self.found('"кот OR NEAR('), [])
+
+    def test_index_follows_edit_and_delete(self) -> None:
+        """Проверяет, что индекс обновляется при правке и удалении поста."""
+        post = Post.objects.get(pk=self.post.pk)
+        post.text = 'Попугай болтает'
+        post.save()
+        self.assertEqual(self.found('кот'), [])
+        self.assertEqual(self.found('попугай'), [post])
+        post.delete()
+        self.assertEqual(self.found('попугай'), [])
+
+    def test_search_page_highlights_snippet(self) -> None:
+        """Проверяет, что страница поиска подсвечивает совпадения."""
+        response = self.client.get(reverse('posts:search'), {'q': 'крыше'})
+        page = response.context['page_obj']
+        self.assertEqual(list(page), [self.post])
+        self.assertIn('<mark>крыше</mark>', page[0].snippet)
+        self.assertIn('&lt;b&gt;', page[0].snippet)
+
+    def test_admin_search_uses_index(self) -> None:
+        """Проверяет, что поиск в админке идет через индекс FTS5."""
+        admin = mixer.blend(User, is_staff=True, is_superuser=True)
+        client = Client()
+        client.force_login(admin)
+        response = client.get(
+            reverse('admin:posts_post_changelist'), {'q': 'собака'}
+        )
+        self.assertEqual(
+            list(response.context['cl'].result_list), [self.other]
+        )
+
+    def test_rebuild_command_restores_index(self) -> None:
+        """Проверяет, что rebuild_search_index перестраивает индекс."""
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        self.assertEqual(self.found('кот'), [])
+        call_command(
+            'rebuild_search_index', batch_size=1, stdout=StringIO()
+        )
+        self.assertEqual(self.found('кот'), [self.post])
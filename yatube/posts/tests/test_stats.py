@@ -0,0 +1,116 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import router
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from mixer.backend.django import mixer
+
+from core import replicas
+from core.tests.utils import capture_on_commit_callbacks
+
+from .. import stats as author_stats
+from ..models import Group, Post
+from ..stats import get_author_stats
+
+User = get_user_model()
+
+
+@override_settings(PROFILE_STATS_TIMEOUT=60)
+class AuthorStatsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = mixer.blend(User, username='auth')
+        cls.other = mixer.blend(User, username='other')
+        cls.group = mixer.blend(Group, title='Бета')
+        cls.other_group = mixer.blend(Group, title='Альфа')
+        mixer.cycle(3).blend(Post, author=cls.user, group=cls.group)
+        mixer.blend(Post, author=cls.user, group=cls.other_group)
+        mixer.blend(Post, author=cls.user, group=None)
+        mixer.blend(Post, author=cls.other, group=cls.group)
+        now = timezone.now()
+        posts = Post.objects.filter(author=cls.user).order_by('pk')
+        for number, pk in enumerate(posts.values_list('pk', flat=True)):
+            posts.filter(pk=pk).update(pub_date=now + timedelta(days=number))
+        cls.first = posts.first().pub_date
+        cls.last = posts.last().pub_date
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def test_stats(self) -> None:
+        """Проверяет число постов, групп, даты и посты по группам."""
+        stats = get_author_stats(self.user)
+        self.assertEqual(stats['post_count'], 5)
+        self.assertEqual(stats['group_count'], 2)
+        self.assertEqual(stats['first_pub_date'], self.first)
+        self.assertEqual(stats['last_pub_date'], self.last)
+        self.assertEqual(
+            stats['groups'],
+            [
+                {'slug': self.group.slug, 'title': 'Бета', 'posts': 3},
+                {'slug': self.other_group.slug, 'title': 'Альфа', 'posts': 1},
+            ],
+        )
+
+    def test_author_without_posts(self) -> None:
+        """Проверяет статистику автора без постов."""
+        stats = get_author_stats(mixer.blend(User))
+        self.assertEqual(stats['post_count'], 0)
+        self.assertIsNone(stats['first_pub_date'])
+        self.assertEqual(stats['groups'], [])
+
+    def test_single_query_then_cached(self) -> None:
+        """Проверяет один запрос на промахе и ни одного из кеша."""
+        with self.assertNumQueries(1):
+            get_author_stats(self.user)
+        with self.assertNumQueries(0):
+            get_author_stats(self.user)
+
+    def test_author_writes_invalidate_stats(self) -> None:
+        """Проверяет, что кеш сбрасывают только записи самого автора."""
+        get_author_stats(self.user)
+        with capture_on_commit_callbacks(execute=True):
+            mixer.blend(Post, author=self.other, group=self.other_group)
+        self.assertEqual(get_author_stats(self.user)['post_count'], 5)
+        with capture_on_commit_callbacks(execute=True):
+            post = mixer.blend(
+                Post, author=self.user, group=self.other_group
+            )
+        stats = get_author_stats(self.user)
+        self.assertEqual(stats['post_count'], 6)
+        self.assertEqual(stats['groups'][1]['posts'], 2)
+        with capture_on_commit_callbacks(execute=True):
+            post.delete()
+        self.assertEqual(get_author_stats(self.user)['post_count'], 5)
+
+    @override_settings(DATABASE_REPLICAS=['replica'])
+    def test_cached_stats_are_read_from_primary(self) -> None:
+        """Проверяет, что кешируемая статистика не читается из реплики."""
+        replicas._state.use_replicas = True
+        self.addCleanup(setattr, replicas._state, 'use_replicas', False)
+        with mock.patch.object(
+            author_stats,
+            'query_author_stats',
+            side_effect=lambda author: router.db_for_read(Post),
+        ):
+            self.assertEqual(get_author_stats(self.user), 'default')
+        self.assertEqual(router.db_for_read(Post), 'replica')
+
+    def test_profile_shows_stats(self) -> None:
+        """Проверяет статистику в контексте и шапке профиля."""
+        client = Client()
+        client.force_login(self.other)
+        response = client.get(
+            reverse('posts:profile', kwargs={'username': self.user.username})
+        )
+        self.assertEqual(response.context['stats']['group_count'], 2)
+        self.assertEqual(response.context['post_count'], 5)
+        self.assertContains(response, 'Групп: 2')
+        self.assertContains(
+            response,
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+        )
@@ -0,0 +1,147 @@
+import os
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from mixer.backend.django import mixer
+
+from core.tests.utils import capture_on_commit_callbacks
+from core.writes import run_callback
+
+from ..models import Post
+from ..signals import schedule_thumbnails
+from ..thumbnails import THUMBNAIL_SIZES, get_thumbnail
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp()
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C\x0A\x00\x3B'
+)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, THUMBNAIL_WORKERS=0)
+class PostThumbnailTest(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = mixer.blend(User, username='auth')
+        cls.authorized_client = Client()
+        cls.authorized_client.force_login(cls.user)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self) -> None:
+        # Хранилище ключей sorl кеширует миниатюры в общем кеше.
+        cache.clear()
+        shutil.rmtree(
+            os.path.join(TEMP_MEDIA_ROOT, 'cache'), ignore_errors=True
+        )
+
+    def upload(self) -> Post:
+        with capture_on_commit_callbacks() as callbacks:
+            self.authorized_client.post(
+                reverse('posts:post_create'),
+                {
+                    'text': 'Пост с картинкой',
+                    'image': SimpleUploadedFile(
+                        'small.gif', SMALL_GIF, content_type='image/gif'
+                    ),
+                },
+            )
+        self.callbacks = callbacks
+        return Post.objects.get()
+
+    def scheduled(self, callbacks) -> list:
+        """Обработчики on_commit, которые ставят миниатюры в очередь."""
+        result = []
+        for callback in callbacks:
+            # Очередь записей оборачивает обработчики своей пачки.
+            if getattr(callback, 'func', None) is run_callback:
+                callback, = callback.args
+            if getattr(callback, 'func', None) is schedule_thumbnails:
+                result.append(callback)
+        return result
+
+    def thumbnails(self) -> list:
+        directory = os.path.join(TEMP_MEDIA_ROOT, 'cache')
+        return [
+            name for _, _, names in os.walk(directory) for name in names
+        ]
+
+    def test_upload_schedules_thumbnails_after_commit(self) -> None:
+        """Проверяет, что миниатюры рисуются после фиксации загрузки."""
+        post = self.upload()
+        self.assertTrue(post.image.name.startswith('posts/small'))
+        self.assertEqual(len(self.scheduled(self.callbacks)), 1)
+        self.assertEqual(self.thumbnails(), [])
+        for callback in self.callbacks:
+            callback()
+        self.assertEqual(len(self.thumbnails()), len(THUMBNAIL_SIZES))
+        post.refresh_from_db()
+        for size in THUMBNAIL_SIZES:
+            with self.subTest(size=size):
+                path = os.path.join(
+                    TEMP_MEDIA_ROOT, get_thumbnail(post, size).name
+                )
+                self.assertTrue(os.path.isfile(path))
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, get_thumbnail(post, 'feed').url)
+        self.assertNotContains(response, post.image.url)
+
+    def test_rolled_back_save_schedules_again(self) -> None:
+        """Проверяет, что откаченное сохранение не теряет миниатюры."""
+        post = mixer.blend(Post, author=self.user)
+        post.image = 'posts/small.gif'
+        with capture_on_commit_callbacks() as callbacks:
+            # Первая попытка откачена: on_commit не вызывается.
+            post.save()
+            post.save()
+        scheduled = self.scheduled(callbacks)
+        self.assertEqual(len(scheduled), 2)
+        with mock.patch('posts.signals.thumbnail_pool') as pool:
+            scheduled[-1]()
+        pool.submit.assert_called_once_with('posts/small.gif')
+        with capture_on_commit_callbacks() as callbacks:
+            post.save()
+        self.assertEqual(self.scheduled(callbacks), [])
+
+    def test_pages_do_not_render_thumbnails(self) -> None:
+        """Проверяет, что страница без готовой миниатюры отдает оригинал."""
+        post = self.upload()
+        pages = (
+            reverse('posts:index'),
+            reverse('posts:post_detail', kwargs={'post_id': post.pk}),
+        )
+        for page in pages:
+            with self.subTest(page=page):
+                response = self.client.get(page)
+                self.assertContains(response, post.image.url)
+        self.assertEqual(self.thumbnails(), [])
+
+    def test_generate_thumbnails_command(self) -> None:
+        """Проверяет, что команда рисует миниатюры для готовых картинок."""
+        post = self.upload()
+        call_command('generate_thumbnails', jobs=1, stdout=StringIO())
+        self.assertEqual(len(self.thumbnails()), len(THUMBNAIL_SIZES))
+        response = self.client.get(
+            reverse('posts:post_detail', kwargs={'post_id': post.pk})
+        )
+        self.assertNotContains(response, post.image.url)
+        call_command(
+            'generate_thumbnails', jobs=1, force=True, stdout=StringIO()
+        )
+        self.assertEqual(len(self.thumbnails()), len(THUMBNAIL_SIZES))
+        post.refresh_from_db()
+        self.assertTrue(post.thumbnails_ready)
@@ -2,6 +2,7 @@ from http import HTTPStatus
 
 from django.contrib.auth import get_user_model
 from django.contrib.auth.views import redirect_to_login
+from django.core.cache import cache
 from django.test import Client, TestCase
 from django.urls import reverse
 from mixer.backend.django import mixer
@@ -37,6 +38,9 @@ class PostUrlTest(TestCase):
             'missing': '/missing/',
         }
 
+    def setUp(self) -> None:
+        cache.clear()
+
     def test_http_statuses(self) -> None:
         """Проверяет доступность URL-адреса."""
         httpstatuses = (
@@ -0,0 +1,190 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from mixer.backend.django import mixer
+from yatube.settings import NOTES_NUMBER
+
+from core.tests.utils import capture_on_commit_callbacks
+
+from ..models import Post
+from ..cache import GLOBAL_SCOPE
+from ..utils import (
+    ELLIPSIS,
+    CachedCountPaginator,
+    KeysetPaginator,
+    decode_cursor,
+    encode_cursor,
+)
+
+User = get_user_model()
+
+
+@override_settings(KEYSET_PAGINATION_VIEWS=('index',))
+class KeysetPaginatorTest(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = mixer.blend(User, username='auth')
+        mixer.cycle(NOTES_NUMBER * 2 + 3).blend(Post, author=cls.user)
+        cls.expected = list(Post.objects.order_by('-pub_date', '-pk'))
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def test_pages_walk_forward_and_back(self) -> None:
+        """Проверяет, что курсоры обходят ленту без пропусков и повторов."""
+        paginator = KeysetPaginator(Post.objects.all(), NOTES_NUMBER)
+        pages = [paginator.get_page(None)]
+        while pages[-1].has_next():
+            pages.append(paginator.get_page(pages[-1].next_cursor))
+        walked = [post for page in pages for post in page]
+        self.assertEqual(walked, self.expected)
+        self.assertFalse(pages[0].has_previous())
+        previous = paginator.get_page(pages[-1].previous_cursor)
+        self.assertEqual(list(previous), list(pages[-2]))
+
+    def test_broken_cursor_returns_first_page(self) -> None:
+        """Проверяет, что испорченный курсор открывает первую страницу."""
+        self.assertIsNone(decode_cursor('not-a-cursor'))
+        page = KeysetPaginator(Post.objects.all(), NOTES_NUMBER).get_page(
+            'not-a-cursor'
+        )
+        self.assertEqual(list(page), self.expected[:NOTES_NUMBER])
+
+    def test_cursor_past_the_end_returns_first_page(self) -> None:
+        """Проверяет курсоры, за которыми не осталось постов."""
+        oldest = self.expected[-1]
+        newest = self.expected[0]
+        cursors = {
+            'next': encode_cursor(oldest.pub_date, oldest.pk, 'next'),
+            'prev': encode_cursor(newest.pub_date, newest.pk, 'prev'),
+        }
+        paginator = KeysetPaginator(Post.objects.all(), NOTES_NUMBER)
+        for direction, cursor in cursors.items():
+            with self.subTest(direction=direction):
+                page = paginator.get_page(cursor)
+                self.assertEqual(list(page), self.expected[:NOTES_NUMBER])
+                self.assertFalse(page.has_previous())
+                self.assertIsNone(page.previous_cursor)
+                response = self.client.get(
+                    reverse('posts:index'), {'cursor': cursor}
+                )
+                self.assertEqual(response.status_code, 200)
+
+    def test_next_page_does_not_restart(self) -> None:
+        """Проверяет, что обход ленты кончается, если хвост удален."""
+        paginator = KeysetPaginator(Post.objects.all(), NOTES_NUMBER)
+        page = paginator.get_page(None)
+        Post.objects.exclude(pk__in=[post.pk for post in page]).delete()
+        page = paginator.next_page(page)
+        self.assertEqual(list(page), [])
+        self.assertFalse(page.has_next())
+        self.assertIsNone(page.next_cursor)
+
+    def test_view_uses_keyset_without_count(self) -> None:
+        """Проверяет, что выбранная view не выполняет COUNT(*)."""
+        first = self.client.get(reverse('posts:index'))
+        cursor = first.context['page_obj'].next_cursor
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                reverse('posts:index'), {'cursor': cursor}
+            )
+        self.assertTrue(response.context['page_obj'].is_keyset)
+        self.assertEqual(
+            list(response.context['page_obj']),
+            self.expected[NOTES_NUMBER:NOTES_NUMBER * 2],
+        )
+        for query in queries.captured_queries:
+            self.assertNotIn('COUNT(', query['sql'].upper())
+
+
+class CachedCountPaginatorTest(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = mixer.blend(User, username='auth')
+        mixer.cycle(5).blend(Post, author=cls.user)
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def get_count(self) -> int:
+        return CachedCountPaginator(
+            Post.objects.all(), NOTES_NUMBER, scope=GLOBAL_SCOPE
+        ).count
+
+    def test_count_is_cached_per_scope(self) -> None:
+        """Проверяет, что COUNT(*) выполняется один раз на область."""
+        self.assertEqual(self.get_count(), 5)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get_count(), 5)
+
+    def test_cache_hit_does_not_extend_timeout(self) -> None:
+        """Проверяет, что число из кеша не записывается заново."""
+        self.get_count()
+        with mock.patch('posts.utils.set_count') as set_count:
+            self.assertEqual(self.get_count(), 5)
+        set_count.assert_not_called()
+
+    def test_cached_count_follows_create_and_delete(self) -> None:
+        """Проверяет, что закешированное число меняется вместе с постами."""
+        self.get_count()
+        with capture_on_commit_callbacks(execute=True):
+            post = mixer.blend(Post, author=self.user)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get_count(), 6)
+        with capture_on_commit_callbacks(execute=True):
+            post.delete()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get_count(), 5)
+
+    @override_settings(PAGINATOR_APPROXIMATE_COUNT_FROM=1)
+    def test_large_scope_uses_table_statistics(self) -> None:
+        """Проверяет, что для большой ленты берется оценка без COUNT(*)."""
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE posts_post')
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.get_count(), 5)
+        for query in queries.captured_queries:
+            self.assertNotIn('COUNT(', query['sql'].upper())
+
+
+class PageWindowTest(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = mixer.blend(User, username='auth')
+        mixer.cycle(NOTES_NUMBER * 12).blend(Post, author=cls.user)
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def test_window_around_current_page(self) -> None:
+        """Проверяет края и окно вокруг текущей страницы."""
+        paginator = CachedCountPaginator(list(range(1000)), 10)
+        self.assertEqual(
+            paginator.get_page(50).page_window,
+            [1, ELLIPSIS, 48, 49, 50, 51, 52, ELLIPSIS, 100],
+        )
+        self.assertEqual(
+            paginator.get_page(2).page_window,
+            [1, 2, 3, 4, ELLIPSIS, 100],
+        )
+        self.assertEqual(
+            CachedCountPaginator(list(range(30)), 10).get_page(1).page_window,
+            [1, 2, 3],
+        )
+
+    def test_template_renders_only_window(self) -> None:
+        """Проверяет, что страница ленты ссылается только на окно."""
+        response = self.client.get(reverse('posts:index'), {'page': 6})
+        page = response.context['page_obj']
+        self.assertEqual(
+            page.page_window, [1, ELLIPSIS, 4, 5, 6, 7, 8, ELLIPSIS, 12]
+        )
+        content = response.content.decode()
+        self.assertIn('href="?page=12"', content)
+        self.assertNotIn('href="?page=10"', content)
+        self.assertEqual(content.count('class="page-link"'), 13)
@@ -1,5 +1,6 @@
 from django import forms
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test import Client, TestCase
 from django.urls import reverse
 from mixer.backend.django import mixer
@@ -19,6 +20,9 @@ class PostUrlTest(TestCase):
         cls.authorized_client = Client()
         cls.authorized_client.force_login(cls.user)
 
+    def setUp(self) -> None:
+        cache.clear()
+
     def test_pages_uses_correct_template(self) -> None:
         """Проверяет, что view-функция использует соответствующий шаблон."""
         pages_names_templates = {
@@ -0,0 +1,132 @@
+"""Миниатюры картинок постов.
+
+Миниатюры всех размеров из THUMBNAIL_SIZES создаются заранее в пуле
+процессов, как только транзакция с загруженной картинкой зафиксирована,
+после чего у поста ставится thumbnails_ready. Страницы миниатюры не
+рисуют и не ищут: имя файла миниатюры в sorl-thumbnail однозначно
+вычисляется по картинке и параметрам, поэтому шаблон получает ссылку
+без обращения к хранилищу, а пока миниатюр нет — ссылку на оригинал.
+"""
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.utils import timezone
+from sorl.thumbnail import default
+from sorl.thumbnail.base import ThumbnailBackend as BaseThumbnailBackend
+from sorl.thumbnail.conf import defaults as default_settings
+from sorl.thumbnail.conf import settings as thumbnail_settings
+from sorl.thumbnail.images import ImageFile
+
+logger = logging.getLogger('posts.thumbnails')
+
+# Размеры, которые нужны шаблонам: имя → (геометрия, параметры sorl).
+THUMBNAIL_SIZES = {
+    'feed': ('960x339', {'crop': 'center', 'upscale': True}),
+    'detail': ('960', {'upscale': False}),
+}
+
+
+class ThumbnailBackend(BaseThumbnailBackend):
+    def get_cached(self, file_, geometry_string, **options):
+        """Возвращает файл миниатюры, не проверяя, что он создан."""
+        source = ImageFile(file_)
+        name = self._get_thumbnail_filename(
+            source, geometry_string, self.get_options(source, options)
+        )
+        return ImageFile(name, default.storage)
+
+    def get_options(self, source, options):
+        # Те же значения по умолчанию, что подставляет
+        # BaseThumbnailBackend.get_thumbnail: от них зависит имя файла.
+        options = dict(options)
+        if thumbnail_settings.THUMBNAIL_PRESERVE_FORMAT:
+            options.setdefault('format', self._get_format(source))
+        for key, value in self.default_options.items():
+            options.setdefault(key, value)
+        for key, attr in self.extra_options:
+            value = getattr(thumbnail_settings, attr)
+            if value != getattr(default_settings, attr):
+                options.setdefault(key, value)
+        return options
+
+
+def get_thumbnail(post, size):
+    """Миниатюра картинки поста или сама картинка, пока миниатюр нет."""
+    if not post.thumbnails_ready:
+        return post.image
+    geometry, options = THUMBNAIL_SIZES[size]
+    return default.backend.get_cached(post.image, geometry, **options)
+
+
+def mark_ready(name, ready):
+    from .models import Post
+    from .signals import post_scopes, touch_scopes
+
+    posts = Post.objects.filter(image=name)
+    relations = list(posts.values_list('author_id', 'group_id'))
+    # Новое время изменения меняет ETag страницы поста, а touch_scopes —
+    # FeedVersion лент, закешированных еще с оригиналом. Поколения в
+    # кеше процесса пула процессы сервера не видят, но время из
+    # FeedVersion входит в ключ их страниц (posts/cache.py).
+    posts.update(thumbnails_ready=ready, updated=timezone.now())
+    touch_scopes(set().union(*post_scopes(*relations)))
+
+
+def generate_thumbnails(name, force=False):
+    """Создает все миниатюры картинки name; force пересоздает готовые."""
+    source = ImageFile(name, default.storage)
+    if force:
+        mark_ready(name, False)
+        default.kvstore.delete_thumbnails(source)
+    for geometry, options in THUMBNAIL_SIZES.values():
+        default.backend.get_thumbnail(source, geometry, **options)
+    mark_ready(name, True)
+    return name
+
+
+def setup_worker():
+    import django
+
+    django.setup()
+
+
+class ThumbnailPool:
+    """Пул процессов, общий для всех запросов процесса сервера.
+
+    Процессы запускаются через spawn: fork процесса с потоками (очередь
+    записей, потоки сервера) может унаследовать захваченные блокировки.
+    """
+
+    def __init__(self):
+        self.pid = None
+        self.executor = None
+
+    def get_executor(self):
+        if self.executor is None or self.pid != os.getpid():
+            self.pid = os.getpid()
+            self.executor = ProcessPoolExecutor(
+                max_workers=settings.THUMBNAIL_WORKERS,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=setup_worker,
+            )
+        return self.executor
+
+    def submit(self, name):
+        """Ставит картинку в очередь; без воркеров рисует сразу."""
+        if not getattr(settings, 'THUMBNAIL_WORKERS', 0):
+            generate_thumbnails(name)
+            return
+        future = self.get_executor().submit(generate_thumbnails, name)
+        future.add_done_callback(log_failure)
+
+
+def log_failure(future):
+    error = future.exception()
+    if error is not None:
+        logger.error('Не удалось создать миниатюры: %r', error)
+
+
+thumbnail_pool = ThumbnailPool()
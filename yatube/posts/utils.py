@@ -1,8 +1,308 @@
-from django.core.paginator import Paginator
+import base64
+import binascii
+import json
 
+from django.conf import settings
+from django.core.paginator import Page, Paginator
+from django.db import DatabaseError, connections
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
 
-def connect_paginator(request, object, page_number):
-    paginator = Paginator(object, page_number)
+from .cache import get_count, set_count
+
+
+def encode_cursor(pub_date, pk, direction):
+    """Упаковывает позицию (pub_date, id) поста в непрозрачную строку."""
+    payload = json.dumps(
+        [pub_date.isoformat(), pk, direction],
+        separators=(',', ':'),
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Распаковывает курсор; для испорченного курсора возвращает None."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        pub_date, pk, direction = json.loads(
+            base64.urlsafe_b64decode(padded.encode()).decode()
+        )
+        pub_date = parse_datetime(pub_date)
+    except (TypeError, ValueError, binascii.Error):
+        return None
+    if pub_date is None or not isinstance(pk, int):
+        return None
+    if direction not in ('next', 'prev'):
+        return None
+    return pub_date, pk, direction
+
+
+class KeysetPage:
+    """Страница курсорной пагинации.
+
+    Повторяет ту часть интерфейса Page, которой пользуются шаблоны,
+    но вместо номеров страниц отдает курсоры соседних страниц.
+    """
+
+    is_keyset = True
+
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self):
+        return '<KeysetPage of %s posts>' % len(self)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    @property
+    def next_cursor(self):
+        if not self.has_next() or not self.object_list:
+            return None
+        return encode_cursor(
+            *self.paginator.key(self.object_list[-1]), 'next'
+        )
+
+    @property
+    def previous_cursor(self):
+        if not self.has_previous() or not self.object_list:
+            return None
+        return encode_cursor(*self.paginator.key(self.object_list[0]), 'prev')
+
+
+class KeysetPaginator:
+    """Курсорная пагинация по ключу (pub_date, id).
+
+    Не выполняет COUNT(*) и OFFSET: каждая страница — это один запрос
+    с условием на ключ последнего показанного поста и LIMIT per_page + 1,
+    поэтому стоимость страницы не зависит от глубины прокрутки.
+    key достает (pub_date, id) из элемента страницы, что позволяет
+    листать и queryset.values().
+    """
+
+    ordering = ('-pub_date', '-pk')
+
+    def __init__(self, object_list, per_page, key=None):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        if key is not None:
+            self.key = key
+
+    @staticmethod
+    def key(post):
+        return post.pub_date, post.pk
+
+    def get_page(self, cursor):
+        position = decode_cursor(cursor) if cursor else None
+        if position is None:
+            return self._first_page()
+        pub_date, pk, direction = position
+        if direction == 'next':
+            page = self._page_after(pub_date, pk)
+        else:
+            page = self._page_before(pub_date, pk)
+        if not page:
+            # Курсор за концом ленты (посты после него удалены или курсор
+            # собран вручную): показываем начало ленты.
+            return self._first_page()
+        return page
+
+    def next_page(self, page):
+        """Следующая страница без возврата к началу ленты.
+
+        Для обхода всей ленты: если посты после page удалили, обход
+        заканчивается пустой страницей, а не начинается заново.
+        """
+        if not page:
+            return page
+        return self._page_after(*self.key(page.object_list[-1]))
+
+    def _first_page(self):
+        posts = list(self.object_list.order_by(*self.ordering)[
+            :self.per_page + 1
+        ])
+        return KeysetPage(
+            posts[:self.per_page],
+            self,
+            has_next=len(posts) > self.per_page,
+            has_previous=False,
+        )
+
+    def _page_after(self, pub_date, pk):
+        posts = list(
+            self.object_list.filter(
+                Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, pk__lt=pk)
+            ).order_by(*self.ordering)[:self.per_page + 1]
+        )
+        return KeysetPage(
+            posts[:self.per_page],
+            self,
+            has_next=len(posts) > self.per_page,
+            has_previous=bool(posts),
+        )
+
+    def _page_before(self, pub_date, pk):
+        posts = list(
+            self.object_list.filter(
+                Q(pub_date__gt=pub_date) | Q(pub_date=pub_date, pk__gt=pk)
+            ).order_by('pub_date', 'pk')[:self.per_page + 1]
+        )
+        has_previous = len(posts) > self.per_page
+        posts = posts[:self.per_page]
+        posts.reverse()
+        return KeysetPage(
+            posts, self, has_next=bool(posts), has_previous=has_previous
+        )
+
+
+def estimated_count(queryset):
+    """Оценивает число строк таблицы по статистике планировщика.
+
+    Статистику обновляет ANALYZE (его запускает recount_posts).
+    Возвращает None, если оценки нет.
+    """
+    connection = connections[queryset.db]
+    table = queryset.model._meta.db_table
+    if connection.vendor == 'sqlite':
+        sql = 'SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1'
+    elif connection.vendor == 'postgresql':
+        sql = 'SELECT reltuples::bigint FROM pg_class WHERE relname = %s'
+    else:
+        return None
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [table])
+            row = cursor.fetchone()
+    except DatabaseError:
+        return None
+    if row is None:
+        return None
+    return int(str(row[0]).split()[0])
+
+
+# Пропуск в окне номеров страниц.
+ELLIPSIS = '…'
+
+
+class WindowedPage(Page):
+    ellipsis = ELLIPSIS
+
+    @property
+    def page_window(self):
+        """Номера страниц для навигации: края и окно вокруг текущей."""
+        return list(self.paginator.get_elided_page_range(self.number))
+
+
+class CachedCountPaginator(Paginator):
+    """Paginator, который хранит число объектов области в кеше.
+
+    Число кешируется на settings.PAGINATOR_COUNT_TIMEOUT секунд и
+    поправляется сигналами при создании и удалении постов. Для
+    queryset без фильтров, если статистика таблицы превышает
+    settings.PAGINATOR_APPROXIMATE_COUNT_FROM, берется оценка
+    вместо COUNT(*).
+    """
+
+    # Сколько номеров страниц показывать вокруг текущей и у краев.
+    on_each_side = 2
+    on_ends = 1
+
+    def __init__(self, object_list, per_page, scope=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.scope = scope
+
+    def _get_page(self, *args, **kwargs):
+        return WindowedPage(*args, **kwargs)
+
+    def get_elided_page_range(
+        self, number=1, on_each_side=None, on_ends=None
+    ):
+        """Номера страниц с пропусками ELLIPSIS вместо длинных отрезков.
+
+        Повторяет Paginator.get_elided_page_range из Django 3.2: число
+        ссылок не зависит от числа страниц в ленте.
+        """
+        if on_each_side is None:
+            on_each_side = self.on_each_side
+        if on_ends is None:
+            on_ends = self.on_ends
+        number = self.validate_number(number)
+        if self.num_pages <= (on_each_side + on_ends) * 2:
+            yield from self.page_range
+            return
+        if number > 1 + on_each_side + on_ends + 1:
+            yield from range(1, on_ends + 1)
+            yield ELLIPSIS
+            yield from range(number - on_each_side, number + 1)
+        else:
+            yield from range(1, number + 1)
+        if number < self.num_pages - on_each_side - on_ends - 1:
+            yield from range(number + 1, number + on_each_side + 1)
+            yield ELLIPSIS
+            yield from range(self.num_pages - on_ends + 1, self.num_pages + 1)
+        else:
+            yield from range(number + 1, self.num_pages + 1)
+
+    @cached_property
+    def count(self):
+        if self.scope is None:
+            return super().count
+        count = get_count(self.scope)
+        if count is not None:
+            # Срок жизни не продлеваем: иначе на популярной ленте число,
+            # разошедшееся из-за пропущенного сигнала, не истекло бы.
+            return count
+        count = self.approximate_count()
+        if count is None:
+            count = super().count
+        set_count(self.scope, count)
+        return count
+
+    def approximate_count(self):
+        threshold = getattr(settings, 'PAGINATOR_APPROXIMATE_COUNT_FROM', None)
+        if threshold is None or self.object_list.query.has_filters():
+            return None
+        estimate = estimated_count(self.object_list)
+        if estimate is None or estimate < threshold:
+            return None
+        return estimate
+
+
+def connect_paginator(request, object, page_number, count=None, scope=None):
+    """Разбивает queryset на страницы.
+
+    Для view, перечисленных в settings.KEYSET_PAGINATION_VIEWS,
+    используется курсорная пагинация, для остальных — постраничная.
+    Известное заранее число объектов count избавляет от COUNT(*),
+    а scope включает кеширование числа объектов области.
+    """
+    match = getattr(request, 'resolver_match', None)
+    keyset_views = getattr(settings, 'KEYSET_PAGINATION_VIEWS', ())
+    if match is not None and match.url_name in keyset_views:
+        paginator = KeysetPaginator(object, page_number)
+        return paginator.get_page(request.GET.get('cursor'))
+    paginator = CachedCountPaginator(object, page_number, scope=scope)
+    if count is not None:
+        paginator.count = count
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     return page_obj
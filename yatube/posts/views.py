@@ -1,73 +1,171 @@
+from urllib.parse import urlencode
+
 from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
+from django.db import OperationalError
 from django.shortcuts import get_object_or_404, redirect, render
+from core.writes import write_queue
 from yatube.settings import NOTES_NUMBER
 
+from .cache import author_scope, cache_feed, global_scope, group_scope
+from .conditional import feed_condition, post_condition
 from .forms import PostForm
-from .models import Group, Post
+from .models import Group, Post, get_post_count
+from .search import search_posts
+from .stats import get_author_stats
 from .utils import connect_paginator
 
 User = get_user_model()
 
+WRITE_FAILED_MESSAGE = (
+    'Сервер сейчас перегружен, пост не сохранен. '
+    'Попробуйте отправить его еще раз.'
+)
+
 
+@feed_condition(global_scope)
+@cache_feed(global_scope)
 def index(request):
-    post_list = Post.objects.all()
+    post_list = Post.objects.for_feed()
     context = {
-        'page_obj': connect_paginator(request, post_list, NOTES_NUMBER),
+        'page_obj': connect_paginator(
+            request, post_list, NOTES_NUMBER, scope=global_scope()
+        ),
     }
     return render(request, 'posts/index.html', context)
 
 
+@feed_condition(group_scope)
+@cache_feed(group_scope)
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
-    posts = Post.objects.filter(group=group)
+    posts = Post.objects.filter(group=group).for_feed()
     context = {
         'group': group,
-        'page_obj': connect_paginator(request, posts, NOTES_NUMBER),
+        'page_obj': connect_paginator(
+            request, posts, NOTES_NUMBER, count=group.post_count
+        ),
     }
     return render(request, 'posts/group_list.html', context)
 
 
+@feed_condition(author_scope)
+@cache_feed(author_scope)
 def profile(request, username):
     author = get_object_or_404(User, username=username)
-    author_posts = Post.objects.filter(author=author)
+    author_posts = Post.objects.filter(author=author).for_feed()
+    stats = get_author_stats(author)
     context = {
         'author': author,
-        'page_obj': connect_paginator(request, author_posts, NOTES_NUMBER),
+        'post_count': stats['post_count'],
+        'stats': stats,
+        'page_obj': connect_paginator(
+            request, author_posts, NOTES_NUMBER, count=stats['post_count']
+        ),
     }
     return render(request, 'posts/profile.html', context)
 
 
+def search(request):
+    query = request.GET.get('q', '').strip()
+    context = {
+        'query': query,
+        'page_query': urlencode({'q': query}) + '&',
+        'page_obj': connect_paginator(
+            request, search_posts(query), NOTES_NUMBER
+        ),
+    }
+    return render(request, 'posts/search.html', context)
+
+
+@post_condition
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
-    post_count = Post.objects.filter(author=post.author).count()
+    post = get_object_or_404(
+        Post.objects.select_related('author__post_counter', 'group').defer(
+            'text', 'excerpt_html'
+        ),
+        pk=post_id,
+    )
     context = {
         'post': post,
-        'post_count': post_count,
+        'post_count': get_post_count(post.author),
     }
     return render(request, 'posts/post_detail.html', context)
 
 
+class SavePost:
+    """Сохранение поста из формы, которое очередь записей может повторить.
+
+    Откаченная попытка уже изменила экземпляр формы: новый пост получил
+    pk откаченного INSERT, а сигналы запомнили связи как учтенные в
+    счетчиках. Перед каждой попыткой экземпляр возвращается к состоянию
+    на момент постановки в очередь.
+    """
+
+    def __init__(self, form, author=None):
+        self.form = form
+        self.author = author
+        post = form.instance
+        self.state = (
+            post.pk,
+            post._state.adding,
+            post._state.db,
+            post._counted_relations,
+        )
+
+    def __call__(self):
+        post = self.form.instance
+        (
+            post.pk,
+            post._state.adding,
+            post._state.db,
+            post._counted_relations,
+        ) = self.state
+        post = self.form.save(commit=False)
+        if self.author is not None:
+            post.author = self.author
+        post.save()
+        return post
+
+
+def write_failed(request, context):
+    """Снова показывает форму, если база так и не освободилась."""
+    context['form'].add_error(None, WRITE_FAILED_MESSAGE)
+    response = render(
+        request, 'posts/create_post.html', context, status=503
+    )
+    response['Retry-After'] = '1'
+    return response
+
+
 @login_required
 def post_create(request):
-    form = PostForm(request.POST or None)
+    form = PostForm(request.POST or None, files=request.FILES or None)
     if form.is_valid():
-        post = form.save(commit=False)
-        post.author = request.user
-        post.save()
+        try:
+            post = write_queue.submit(SavePost(form, request.user))
+        except OperationalError:
+            return write_failed(request, {'form': form})
         return redirect('posts:profile', post.author)
     return render(request, 'posts/create_post.html', {'form': form})
 
 
 @login_required
 def post_edit(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
+    post = get_object_or_404(
+        Post.objects.select_related('author'), pk=post_id
+    )
     is_edit = True
     if post.author != request.user:
         return redirect('posts:post_detail', post_id)
-    form = PostForm(request.POST or None, instance=post)
+    form = PostForm(
+        request.POST or None, files=request.FILES or None, instance=post
+    )
     if form.is_valid():
-        form.save()
+        try:
+            write_queue.submit(SavePost(form))
+        except OperationalError:
+            return write_failed(request, {'form': form, 'is_edit': is_edit})
         return redirect('posts:post_detail', post_id)
     return render(
         request,
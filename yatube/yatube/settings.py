@@ -37,20 +37,29 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'sorl.thumbnail',
     'posts.apps.PostsConfig',
     'users.apps.UsersConfig',
     'core.apps.CoreConfig',
     'about.apps.AboutConfig',
+    'api.apps.ApiConfig',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    # Статика из STATIC_ROOT отдается до сессий и остальных middleware.
+    'core.staticfiles.StaticFilesMiddleware',
+    # Сжимает ответы всех middleware ниже (core/compression.py).
+    'core.compression.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.replicas.ReplicaMiddleware',
+    # Должна быть последней: замеряет время view (core/middleware.py).
+    'core.middleware.PerformanceMiddleware',
 ]
 
 ROOT_URLCONF = 'yatube.urls'
@@ -75,16 +84,155 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'yatube.wsgi.application'
 
+# Тесты переносят файловые кеши (сессии) во временный каталог.
+TEST_RUNNER = 'core.tests.runner.TestRunner'
+
 
 # Database
 # https://docs.djangoproject.com/en/2.2/ref/settings/#databases
 NOTES_NUMBER = 10
+# Имена view (url_name), в которых вместо постраничной пагинации
+# используется курсорная по (pub_date, id), например ('index', 'profile').
+KEYSET_PAGINATION_VIEWS = ()
 
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
-    }
+        'CONN_MAX_AGE': 60,
+    },
+    # Локальная реплика: копию основной базы в нее кладет
+    # manage.py replicate_db (с --interval — поддерживает в актуальном виде).
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, 'db.replica.sqlite3'),
+        'CONN_MAX_AGE': 60,
+        'TEST': {'MIRROR': 'default'},
+    },
+}
+# PRAGMA, которые core/sqlite.py выполняет на каждом новом соединении
+# SQLite; пустой словарь оставляет настройки SQLite по умолчанию.
+# Сравнение под нагрузкой: manage.py stress_sqlite.
+SQLITE_PRAGMAS = {
+    # Первой, чтобы и переключение журнала ждало блокировку, в мс.
+    'busy_timeout': 5000,
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'mmap_size': 256 * 1024 * 1024,
+    # Отрицательное значение — размер кеша в КиБ.
+    'cache_size': -64000,
+    'temp_store': 'memory',
+}
+# Очередь записей постов (core/writes.py): сколько записей фиксировать
+# одной транзакцией, сколько раз повторять при «database is locked» и
+# задержка перед повтором в секундах (база и предел, растет вдвое).
+# WRITE_QUEUE_TIMEOUT — сколько секунд view ждет записи, прежде чем
+# ответить 503.
+WRITE_QUEUE_BATCH_SIZE = 20
+WRITE_QUEUE_RETRIES = 5
+WRITE_QUEUE_BACKOFF = 0.05
+WRITE_QUEUE_MAX_BACKOFF = 1.0
+WRITE_QUEUE_TIMEOUT = 30
+DATABASE_ROUTERS = ['core.replicas.ReplicaRouter']
+# Alias реплик, из которых читают view из DATABASE_REPLICA_VIEWS;
+# пустой список — все читают из основной базы. Для локальной проверки:
+# DATABASE_REPLICAS = ['replica'] после manage.py replicate_db.
+DATABASE_REPLICAS = []
+DATABASE_REPLICA_VIEWS = (
+    'posts:index',
+    'posts:group_list',
+    'posts:profile',
+    'posts:post_detail',
+    'about:author',
+    'about:tech',
+)
+# Сколько секунд после записи посетитель читает из основной базы.
+DATABASE_REPLICA_PIN_SECONDS = 10
+
+# Кеш отрисованных страниц лент для анонимных посетителей (posts/cache.py).
+# Подойдет любой бэкенд Django; время жизни страницы в секундах,
+# 0 отключает кеш.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Кеш сессий должен быть общим для всех процессов сервера: иначе
+    # выход в одном процессе не сбросит сессию, закешированную в другом.
+    # Файловый кеш общий для процессов одной машины; для нескольких
+    # машин подойдет memcached или redis. LocMemCache здесь нельзя
+    # (проверка core.W001).
+    'sessions': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(BASE_DIR, 'cache', 'sessions'),
+        # По умолчанию файловый кеш хранит 300 записей, а при переполнении
+        # удаляет треть файлов вместе с сессиями активных посетителей, и
+        # они снова читаются из базы. Лимит взят с запасом на число
+        # активных сессий; на каждой записи кеш перечисляет файлы
+        # каталога, поэтому при большем числе сессий нужен memcached
+        # или redis. Тесты переносят каталог во временный
+        # (core/tests/runner.py).
+        'OPTIONS': {'MAX_ENTRIES': 50000},
+    },
+}
+FEED_CACHE_ALIAS = 'default'
+FEED_CACHE_TIMEOUT = 60 * 5
+# Время жизни статистики автора в шапке профиля (posts/stats.py), в
+# секундах; запись автора сбрасывает ее раньше. 0 отключает кеш.
+PROFILE_STATS_TIMEOUT = 60 * 60
+# Время жизни закешированного числа постов для пагинатора, в секундах.
+PAGINATOR_COUNT_TIMEOUT = 60 * 10
+# Начиная с этого числа строк по статистике таблицы пагинатор общей ленты
+# использует оценку вместо COUNT(*); None — всегда считать точно.
+PAGINATOR_APPROXIMATE_COUNT_FROM = None
+
+# Сессии читаются из общего кеша 'sessions' и только при промахе из базы,
+# поэтому запрос посетителя с cookie сессии обычно не обращается к базе.
+# Если сессии не должны храниться на сервере вовсе, подойдет
+# 'django.contrib.sessions.backends.signed_cookies' (бенчмарк сравнения:
+# manage.py benchmark_sessions).
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+SESSION_CACHE_ALIAS = 'sessions'
+
+# Замер запросов (core/middleware.py): доля замеряемых запросов от 0 до 1,
+# заголовок Server-Timing и пороги, начиная с которых запрос попадает
+# в лог core.performance (по времени view в мс или по числу SQL-запросов).
+PERFORMANCE_SAMPLE_RATE = 1.0
+PERFORMANCE_SERVER_TIMING = True
+PERFORMANCE_LOG_THRESHOLD_MS = 500
+PERFORMANCE_LOG_QUERY_THRESHOLD = 50
+
+# Сжатие gzip ответов (core/compression.py): уровень zlib от 1 до 9,
+# типы содержимого, минимальный размер обычного ответа в байтах и через
+# сколько байт исходного тела потоковый ответ сбрасывается клиенту.
+# Время и размер по уровням: manage.py benchmark_compression.
+COMPRESSION_LEVEL = 6
+COMPRESSION_CONTENT_TYPES = ('text/html', 'application/json')
+COMPRESSION_MIN_LENGTH = 1024
+COMPRESSION_STREAM_FLUSH_BYTES = 16 * 1024
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'core.performance': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+        'core.writes': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+        'posts.thumbnails': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
 }
 
 
@@ -126,6 +274,21 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 STATICFILES_DIRS = (os.path.join(BASE_DIR, 'static'),)
+# collectstatic добавляет к именам файлов хеш содержимого и сжатые gzip
+# копии, а core.staticfiles.StaticFilesMiddleware отдает их сам: файлы с
+# хешем — с кешированием на год, остальные — на STATIC_MAX_AGE секунд.
+STATIC_ROOT = os.path.join(BASE_DIR, 'collected_static')
+STATICFILES_STORAGE = 'core.staticfiles.CompressedManifestStaticFilesStorage'
+STATIC_MAX_AGE = 60 * 60
+
+MEDIA_URL = '/media/'
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+
+# Миниатюры картинок постов (posts/thumbnails.py) рисует пул из стольких
+# процессов после фиксации загрузки; 0 — рисовать сразу в процессе
+# сервера. Страницы только берут готовые миниатюры.
+THUMBNAIL_BACKEND = 'posts.thumbnails.ThumbnailBackend'
+THUMBNAIL_WORKERS = 2
 
 LOGIN_URL = 'users:login'
 LOGIN_REDIRECT_URL = 'posts:index'